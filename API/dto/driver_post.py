@@ -1,6 +1,6 @@
 # API/dto/driver_post.py
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, Literal
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 class DriverPostDTO(BaseModel):
@@ -29,6 +29,8 @@ class DriverPostDTO(BaseModel):
 class UploadImageResponse(BaseModel):
     message: str
     image_url: str | None = None
+    thumbnail_url: str | None = None
+    display_url: str | None = None
 
 class DriverPostUpdateDTO(BaseModel):
     # 要不要讓 client_id 可改，看你業務需求：
@@ -60,9 +62,58 @@ class DriverPostUpdateDTO(BaseModel):
 class DriverPostReturnDTO(DriverPostDTO):
     id: str
     time_stamp: Optional[datetime] = Field(None, alias="timestamp")
+    thumbnail_url: Optional[str] = None
+    display_url: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    version: Optional[int] = None
 
     model_config = {
         "populate_by_name": True,
         "from_attributes": True,
     }
 
+
+class DriverPostNearbyDTO(DriverPostReturnDTO):
+    distance_km: float
+
+class DriverPostSearchDTO(DriverPostReturnDTO):
+    relevance: Optional[float] = None  # only for q= searches
+
+class DriverPostMatchDTO(DriverPostReturnDTO):
+    origin_km: float
+    destination_km: float
+    time_delta_minutes: float  # negative: the post leaves before the requested time
+    score: float  # lower is better, 0 = same place and time
+
+class DriverPostBulkUpdateItem(BaseModel):
+    post_id: str
+    changes: DriverPostUpdateDTO
+
+class BulkItemResult(BaseModel):
+    post_id: str
+    result: Literal["created", "updated", "deleted", "not_found"]
+
+class DashboardPostsDTO(BaseModel):
+    open: List[DriverPostReturnDTO] = []
+    matched: List[DriverPostReturnDTO] = []
+    closed: List[DriverPostReturnDTO] = []
+
+class DriverDashboardDTO(BaseModel):
+    user_id: str
+    counts: Dict[str, Dict[str, int]]  # role -> status -> number of posts
+    driver: Optional[DashboardPostsDTO] = None
+    client: Optional[DashboardPostsDTO] = None
+    next_cursor: Dict[str, Optional[str]] = {}  # role -> cursor for driver_cursor / client_cursor
+
+class CascadeItemResult(BaseModel):
+    post_id: str
+    role: Literal["driver", "client"]
+    previous_status: Literal["open", "matched", "closed"]
+    result: Literal["unmatched", "closed", "deleted"]
+
+class DeactivateUserResult(BaseModel):
+    user_id: str
+    unmatched: int
+    closed: int
+    deleted: int
+    posts: List[CascadeItemResult]
@@ -0,0 +1,38 @@
+# API/idempotency.py
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from repository.idempotency_repository import IdempotencyRepository, request_fingerprint
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+# set on responses that were replayed from an earlier request with the same key
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+async def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    operation: Callable[[], Awaitable[Any]],
+) -> Tuple[Any, bool]:
+    """
+    Run `operation` at most once per (scope, Idempotency-Key). Returns
+    (result, replayed). Without a key the operation simply runs.
+    The result must be JSON-serializable; a replayed one comes back in its JSON form.
+    """
+    if not key:
+        return await operation(), False
+    request_hash = request_fingerprint(payload)
+    replayed, response = await IdempotencyRepository.begin(scope, key, request_hash)
+    if replayed:
+        return response, True
+    try:
+        result = await operation()
+    except BaseException:
+        await IdempotencyRepository.release(scope, key)
+        raise
+    await IdempotencyRepository.complete(scope, key, request_hash, result)
+    return result, False
+
+
+def replay_headers(replayed: bool) -> dict:
+    return {IDEMPOTENT_REPLAYED_HEADER: "true"} if replayed else {}
@@ -0,0 +1,60 @@
+# API/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from API.dto.driver_post import DriverPostReturnDTO
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime | float | str, post_id: str) -> str:
+    # rows served from a shared cache carry datetimes as ISO strings
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, post_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime | float, str]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, post_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(sort_value, (int, float)):
+            return float(sort_value), str(post_id)  # relevance of a full-text search
+        return datetime.fromisoformat(sort_value), str(post_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def fetch_size(limit: Optional[int]) -> Optional[int]:
+    # one extra row tells us whether another page exists
+    return limit + 1 if limit is not None else None
+
+
+def paginate(rows: list, limit: Optional[int], sort_key: str) -> Tuple[list, Optional[str]]:
+    """Trim rows fetched with fetch_size() to a page and build the cursor for the next one."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[sort_key], last["id"])
+
+
+def cursor_headers(cursor: Optional[str]) -> Optional[dict]:
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else None
+
+
+async def ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    # same field names as the JSON response (by_alias, like FastAPI's response_model)
+    async for row in rows:
+        yield DriverPostReturnDTO.model_validate(row).model_dump_json(by_alias=True) + "\n"
@@ -1,11 +1,36 @@
-from fastapi import APIRouter, HTTPException, Query, UploadFile
-from fastapi.responses import PlainTextResponse
-from typing import List
-from API.dto.driver_post import DriverPostDTO, DriverPostUpdateDTO, UploadImageResponse, DriverPostReturnDTO
-from repository.driverPost_repository import DriverPostRepository
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, UploadFile, Body, Header, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import List, Dict, Literal
+from API.dto.driver_post import (
+    DriverPostDTO, DriverPostUpdateDTO, UploadImageResponse, DriverPostReturnDTO,
+    DriverPostBulkUpdateItem, BulkItemResult, DriverPostNearbyDTO, DriverDashboardDTO,
+    DeactivateUserResult, DriverPostMatchDTO, DriverPostSearchDTO
+)
+from API.pagination import (
+    MAX_PAGE_SIZE, decode_cursor, fetch_size, paginate, cursor_headers, ndjson_lines
+)
+from API.serialization import posts_response, post_response, row_response
+from API.conditional import (
+    make_etag, as_utc, validator_headers, is_not_modified, not_modified, post_etag, if_match_versions
+)
+from API.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent, replay_headers
+from repository.driverPost_repository import DriverPostRepository, DASHBOARD_ROLES
+from repository.match_index import match_index, MAX_TOLERANCE
+from infrastructure.image_processing import render_variants
+from rate_limiting import (
+    limiter, search_cost, POLL_LIMIT, WRITE_LIMIT, SEARCH_LIMIT, SCAN_LIMIT, BULK_LIMIT, ADMIN_LIMIT
+)
+from collections import Counter
+from datetime import datetime, timedelta
 import uuid
+import hashlib
 import filetype
+import asyncio
+import logging
+import orjson
+from infrastructure.cache import json_default
+
+logger = logging.getLogger(__name__)
 
 SUPPORTED_FILE_TYPES = {
     'jpeg': 'image/jpeg',
@@ -13,61 +38,250 @@ SUPPORTED_FILE_TYPES = {
     'jpg': 'image/jpg'
 }
 
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+SNIFF_HEADER_SIZE = 261  # enough for every signature filetype knows
+HASH_CHUNK_SIZE = 64 * 1024
+MAX_BULK_SIZE = 500
+SSE_KEEPALIVE_SECONDS = 15
+
 router = APIRouter()
 
+# POST /, PATCH /request and PATCH /upload_image accept an Idempotency-Key header:
+# a retry with the same key gets the first response back instead of running again.
+
+# Routes without a decorator below fall under the default limit (rate_limiting.DEFAULT_LIMIT),
+# applied by SlowAPIMiddleware; the decorated ones are limited per cost class.
+
 @router.post("/", response_model=str)
-async def create_driver_post(dto: DriverPostDTO):
+@limiter.limit(WRITE_LIMIT)
+async def create_driver_post(
+    request: Request,
+    dto: DriverPostDTO,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+):
     data = dto.model_dump()  # Pydantic v2
     data["id"] = str(uuid.uuid4())
     try:
-        driver_post_id = await DriverPostRepository.create_driver_post(data)
+        driver_post_id, replayed = await run_idempotent(
+            "create", idempotency_key, dto.model_dump(),
+            lambda: DriverPostRepository.create_driver_post(data),
+        )
+        response.headers.update(replay_headers(replayed))
         return driver_post_id
+    except HTTPException:
+        raise
     except Exception as e:
         # Catch actual exceptions (ValueError, DB errors, etc.)
         raise HTTPException(status_code=400, detail=str(e))
  
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Pagination is opt-in: without `limit` the routes return the full list as before.
+# The cursor for the next page is sent back in the X-Next-Cursor header.
+# `stream=true` writes one JSON object per line, read STREAM_PAGE_SIZE rows per statement.
+
+@router.post("/bulk", response_model=List[BulkItemResult])
+@limiter.limit(BULK_LIMIT)
+async def bulk_create_driver_posts(request: Request, response: Response, dtos: List[DriverPostDTO] = Body(..., min_length=1, max_length=MAX_BULK_SIZE)):
+    data = [dto.model_dump() | {"id": str(uuid.uuid4())} for dto in dtos]
+    post_ids = await DriverPostRepository.bulk_create_driver_posts(data)
+    return [BulkItemResult(post_id=post_id, result="created") for post_id in post_ids]
+
+@router.patch("/bulk", response_model=List[BulkItemResult])
+@limiter.limit(BULK_LIMIT)
+async def bulk_modify_driver_posts(request: Request, response: Response, items: List[DriverPostBulkUpdateItem] = Body(..., min_length=1, max_length=MAX_BULK_SIZE)):
+    # one item per post: with two, only the last changes would be written but both reported and counted
+    duplicates = sorted(post_id for post_id, n in Counter(item.post_id for item in items).items() if n > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate post_id in batch: {', '.join(duplicates)}")
+    updates = [(item.post_id, item.changes.model_dump(exclude_unset=True)) for item in items]
+    found = await DriverPostRepository.bulk_modify_driver_posts(updates)
+    return [
+        BulkItemResult(post_id=item.post_id, result="updated" if found[item.post_id] else "not_found")
+        for item in items
+    ]
+
+@router.post("/bulk/delete", response_model=List[BulkItemResult])
+@limiter.limit(BULK_LIMIT)
+async def bulk_delete_driver_posts(request: Request, response: Response, post_ids: List[str] = Body(..., min_length=1, max_length=MAX_BULK_SIZE)):
+    found = await DriverPostRepository.bulk_delete_driver_posts(post_ids)
+    return [
+        BulkItemResult(post_id=post_id, result="deleted" if found[post_id] else "not_found")
+        for post_id in post_ids
+    ]
+
+@router.post("/users/{user_id}/deactivate", response_model=DeactivateUserResult)
+@limiter.limit(BULK_LIMIT)
+async def deactivate_user(
+    request: Request,
+    user_id: str,
+    driver_action: Literal["close", "delete"] = Query("close"),
+):
+    """
+    One call instead of /unmatch/client + /delete/driver: unmatches the posts the
+    user holds as client and closes (or deletes) the posts they drive, atomically.
+    """
+    posts = await DriverPostRepository.deactivate_user(user_id, driver_action)
+    totals = {"unmatched": 0, "closed": 0, "deleted": 0}
+    for post in posts:
+        totals[post["result"]] += 1
+    return post_response({"user_id": user_id, **totals, "posts": posts}, DeactivateUserResult)
+
 @router.get("/all", response_model=List[DriverPostReturnDTO])
-async def get_all_driver_post():
+@limiter.limit(POLL_LIMIT)
+async def get_all_driver_post(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    stream: bool = Query(False),
+):
+    after = decode_cursor(cursor)
+    if stream:
+        rows = DriverPostRepository.stream_all_driver_posts(after, limit)
+        return StreamingResponse(ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE)
+
+    # the table change counter decides 304 before any row is read
+    generation, last_write = await DriverPostRepository.list_version()
+    etag = make_etag("all", generation, last_write, limit, cursor)
+    last_modified = as_utc(last_write)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
     try:
-        driver_post = await DriverPostRepository.get_all_driver_posts()
-        # validate and return plain dicts to satisfy FastAPI's response validation
-        return [DriverPostReturnDTO.model_validate(p).model_dump() for p in driver_post]
+        driver_post = await DriverPostRepository.get_all_driver_posts(after, fetch_size(limit))
+        driver_post, next_cursor = paginate(driver_post, limit, "departure_time")
+        # validated once and encoded by pydantic-core, see API/serialization.py
+        headers = (cursor_headers(next_cursor) or {}) | validator_headers(etag, last_modified)
+        return posts_response(driver_post, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/allpost", response_model=List[DriverPostReturnDTO])
-async def get_admin_driver_posts():
+@limiter.limit(SCAN_LIMIT)
+async def get_admin_driver_posts(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    stream: bool = Query(False),
+):
+    after = decode_cursor(cursor)
+    if stream:
+        rows = DriverPostRepository.stream_admin_driver_posts(after, limit)
+        return StreamingResponse(ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE)
     try:
-        driver_post = await DriverPostRepository.get_admin_driver_posts()
-        # validate and return plain dicts to satisfy FastAPI's response validation
-        return [DriverPostReturnDTO.model_validate(p).model_dump() for p in driver_post]
+        driver_post = await DriverPostRepository.get_admin_driver_posts(after, fetch_size(limit))
+        driver_post, next_cursor = paginate(driver_post, limit, "time_stamp")
+        # validated once and encoded by pydantic-core, see API/serialization.py
+        return posts_response(driver_post, headers=cursor_headers(next_cursor))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/getpost/{post_id}", response_model=DriverPostReturnDTO)
-async def get_post_by_id(post_id: str):
+@limiter.limit(POLL_LIMIT)
+async def get_post_by_id(post_id: str, request: Request):
     try:
         driver_post = await DriverPostRepository.get_post_by_id(post_id)
-        return DriverPostReturnDTO.model_validate(driver_post).model_dump()
+        # the row usually comes from the post cache, so a 304 costs neither a query nor serialization
+        last_modified = as_utc(driver_post["updated_at"])
+        etag = post_etag(driver_post)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+        return post_response(driver_post, headers=validator_headers(etag, last_modified))
     except HTTPException as http_exc:
         raise http_exc
     
+# declared before /search/{user_id} so "nearby" is not taken as a user id
+@router.get("/search/nearby", response_model=List[DriverPostNearbyDTO])
+@limiter.limit(SEARCH_LIMIT)
+async def search_nearby(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(2.0, gt=0, le=100),
+    dest_lat: float | None = Query(None, ge=-90, le=90),
+    dest_lng: float | None = Query(None, ge=-180, le=180),
+    dest_radius_km: float = Query(2.0, gt=0, le=100),
+    time: datetime | None = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    destination = None
+    if dest_lat is not None and dest_lng is not None:
+        destination = (dest_lat, dest_lng, dest_radius_km)
+    posts = await DriverPostRepository.search_nearby(lat, lng, radius_km, destination, time, limit)
+    return posts_response(posts, DriverPostNearbyDTO)
+
+@router.get("/recommend", response_model=List[DriverPostMatchDTO])
+@limiter.limit(SEARCH_LIMIT)
+async def recommend_posts(
+    request: Request,
+    origin_lat: float = Query(..., ge=-90, le=90),
+    origin_lng: float = Query(..., ge=-180, le=180),
+    dest_lat: float = Query(..., ge=-90, le=90),
+    dest_lng: float = Query(..., ge=-180, le=180),
+    time: datetime = Query(...),
+    tolerance_minutes: int = Query(30, ge=1, le=int(MAX_TOLERANCE.total_seconds() // 60)),
+    origin_radius_km: float = Query(3.0, gt=0, le=20),
+    dest_radius_km: float = Query(3.0, gt=0, le=20),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Open posts ranked for a rider by start distance, end distance and departure time, from the in-memory match index."""
+    posts = await match_index.recommend(
+        (origin_lat, origin_lng), (dest_lat, dest_lng), time, timedelta(minutes=tolerance_minutes),
+        origin_radius_km, dest_radius_km, limit,
+    )
+    return posts_response(posts, DriverPostMatchDTO)
+
 @router.get("/search/{user_id}", response_model=List[DriverPostReturnDTO])
-async def get_post_by_id(user_id: str):
+async def get_post_by_user_id(user_id: str):
     try:
         driver_post = await DriverPostRepository.get_post_by_user_id(user_id)
-        return [DriverPostReturnDTO.model_validate(p).model_dump() for p in driver_post]
+        return posts_response(driver_post)
     except HTTPException as http_exc:
         raise http_exc
     
 
-@router.get("/search", response_model=List[DriverPostReturnDTO])
+@router.get("/dashboard/{user_id}", response_model=DriverDashboardDTO)
+async def get_dashboard(
+    user_id: str,
+    role: Literal["driver", "client"] | None = Query(None),
+    post_status: Literal["open", "matched", "closed"] | None = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    driver_cursor: str | None = Query(None),
+    client_cursor: str | None = Query(None),
+):
+    """The user's posts as driver and as client grouped by status, with counts; `limit` posts per role."""
+    roles = (role,) if role else tuple(DASHBOARD_ROLES)
+    after = {"driver": decode_cursor(driver_cursor), "client": decode_cursor(client_cursor)}
+    result = await DriverPostRepository.get_dashboard(user_id, roles, post_status, after, fetch_size(limit))
+
+    body = {"user_id": user_id, "counts": result["counts"], "next_cursor": {}}
+    for r in roles:
+        page, next_cursor = paginate(result["posts"][r], limit, "departure_time")
+        grouped = {"open": [], "matched": [], "closed": []}
+        for post in page:
+            grouped[post["status"]].append(post)
+        body[r] = grouped
+        body["next_cursor"][r] = next_cursor
+    return post_response(body, DriverDashboardDTO)
+
+@router.get("/search", response_model=List[DriverPostSearchDTO])
+@limiter.limit(SEARCH_LIMIT, cost=search_cost)
 async def search_destination(
+    request: Request,
     start_point: str | None = Query(None),
     end_point: str | None = Query(None),
     time: datetime | None = Query(None), 
     partial: bool = Query(False),
+    q: str | None = Query(None, max_length=200),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    stream: bool = Query(False),
 ):
+    """
+    Open posts by start/end place and departure window. `q` additionally
+    searches notes, description and vehicle_info; results are then ordered by
+    relevance (best first) instead of departure time.
+    """
     # Normalize empty strings (e.g. ?start_point=) to None so repository treats them as omitted
     def _norm(s: str | None) -> str | None:
         if s is None:
@@ -77,12 +291,25 @@ async def search_destination(
 
     start_point = _norm(start_point)
     end_point = _norm(end_point)
+    q = _norm(q)
 
-    posts = await DriverPostRepository.search_destination(start_point, end_point, time, partial=partial)
-    return [DriverPostReturnDTO.model_validate(p).model_dump() for p in posts]
+    after = decode_cursor(cursor)
+    if stream:
+        rows = DriverPostRepository.stream_search_destination(
+            start_point, end_point, time, partial=partial, after=after, limit=limit, q=q
+        )
+        return StreamingResponse(ndjson_lines(rows), media_type=NDJSON_MEDIA_TYPE)
+
+    posts = await DriverPostRepository.search_destination(
+        start_point, end_point, time, partial=partial, after=after, limit=fetch_size(limit), q=q
+    )
+    ranked = bool(posts) and "relevance" in posts[0]
+    posts, next_cursor = paginate(posts, limit, "relevance" if ranked else "departure_time")
+    return posts_response(posts, DriverPostSearchDTO, headers=cursor_headers(next_cursor))
     
 @router.delete("/deleteall", response_class=PlainTextResponse)
-async def delete_all_post():
+@limiter.limit(ADMIN_LIMIT)
+async def delete_all_post(request: Request, response: Response):
     try:
         await DriverPostRepository.delete_all_post()
         return "All driver posts deleted successfully."
@@ -106,13 +333,19 @@ async def delete_post_by_driver_id(driver_id: str):
         raise http_exc
     
 @router.patch("/request", response_model=DriverPostReturnDTO)
+@limiter.limit(WRITE_LIMIT)
 async def request_driver_post(
+    request: Request,
     post_id: str = Query(None),
-    client_id: str = Query(None)
+    client_id: str = Query(None),
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
 ):
     try:
-        updated_post = await DriverPostRepository.request_driver_post(post_id, client_id)
-        return DriverPostReturnDTO.model_validate(updated_post).model_dump()
+        updated_post, replayed = await run_idempotent(
+            "request", idempotency_key, {"post_id": post_id, "client_id": client_id},
+            lambda: DriverPostRepository.request_driver_post(post_id, client_id),
+        )
+        return post_response(updated_post, headers=replay_headers(replayed))
     except HTTPException as http_exc:
         raise http_exc
 
@@ -134,44 +367,116 @@ async def unmatch_posts_by_client_id(client_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.patch("/upload_image", response_model=UploadImageResponse)
-async def upload_image(post_id: str, file: UploadFile | None = None):
+@limiter.limit(WRITE_LIMIT)
+async def upload_image(
+    request: Request,
+    post_id: str,
+    response: Response,
+    file: UploadFile | None = None,
+    idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+):
     if not file:
         return {"message": "No file uploaded."}
-    contents = await file.read()
-    size = len(contents)
+    size = file.size
+    if size is None:
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        file.file.seek(0)
 
-    if not 0 < size <= 5 * 1024 * 1024:
+    if not 0 < size <= MAX_IMAGE_SIZE:
         return {"message": "File size must be between 0 and 5MB."}
     
-    kind = filetype.guess(contents)
+    # the type is decided by the magic bytes in the header only
+    header = await file.read(SNIFF_HEADER_SIZE)
+    await file.seek(0)
+    kind = filetype.guess(header)
     if kind is None or kind.extension not in SUPPORTED_FILE_TYPES:
         return {"message": "Unsupported file type."}
     
+    # a retried upload of the same file for the same post is not sent to S3 again;
+    # the file is read an extra time to hash it, so only when there is a key to check against
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = {"post_id": post_id, "sha256": await asyncio.to_thread(_sha256, file.file)}
+    result, replayed = await run_idempotent(
+        "upload_image", idempotency_key, fingerprint,
+        lambda: _store_image(post_id, file, kind.extension),
+    )
+    response.headers.update(replay_headers(replayed))
+    return UploadImageResponse(**result)
+
+def _sha256(fileobj) -> str:
+    # hashed chunk by chunk from the spooled file, which may already be on disk
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+async def _store_image(post_id: str, file: UploadFile, extension: str) -> dict:
     folder = "driver_posts"
+    base_name = f'{folder}/{post_id}_{uuid.uuid4()}'
+
+    # thumbnail/display versions are rendered in the process pool while the original uploads.
+    # The worker process receives the image by value, so this is the one place the upload is
+    # read into memory (Pillow decodes all of it anyway); the original still streams from the
+    # spooled file, and a replayed request never gets here.
+    contents = await file.read()
+    await file.seek(0)
+    variants_task = asyncio.create_task(render_variants(contents))
+    del contents
 
-    file_name = f'{folder}/{post_id}_{uuid.uuid4()}.{kind.extension}'
     image_url = await DriverPostRepository.s3_upload(
-        contents=contents, 
-        key=file_name, 
+        contents=file.file, 
+        key=f'{base_name}.{extension}', 
         content_type=file.content_type, 
         acl='public-read'
     )
 
-    await DriverPostRepository.upload_image(post_id, image_url)
+    variant_urls = {}
+    try:
+        variants = await variants_task
+        urls = await asyncio.gather(*(
+            DriverPostRepository.s3_upload(
+                contents=v.data,
+                key=f'{base_name}_{v.name}.{v.extension}',
+                content_type=v.content_type,
+                acl='public-read'
+            )
+            for v in variants
+        ))
+        variant_urls = {f"{v.name}_url": url for v, url in zip(variants, urls)}
+    except Exception as e:
+        # the original is stored; clients fall back to image_url without variants
+        logger.error(f"Failed to create image variants for post {post_id}: {e}")
+
+    await DriverPostRepository.upload_image(post_id, image_url, **variant_urls)
 
-    return UploadImageResponse(message="Image uploaded successfully.", image_url=image_url)
+    return UploadImageResponse(
+        message="Image uploaded successfully.", image_url=image_url, **variant_urls
+    ).model_dump()
 
 @router.patch("/driver_posts/{post_id}")
-async def modify_driver_post(post_id: str, body: DriverPostUpdateDTO):
+async def modify_driver_post(post_id: str, body: DriverPostUpdateDTO, request: Request):
     # 只取有傳的欄位
+    # If-Match: "<version>" (the ETag of /getpost) turns the update into compare-and-set, 412 on conflict
     try:
         update_data = body.model_dump(exclude_unset=True)
-        return await DriverPostRepository.modify_driver_post(post_id, update_data)
+        post = await DriverPostRepository.modify_driver_post(post_id, update_data, if_match_versions(request))
+        # answers with the column names (start_point, contact, time_stamp), as it always has
+        return row_response(post, headers=validator_headers(post_etag(post), as_utc(post["updated_at"])))
     except HTTPException as http_exc:
         raise http_exc
     
+@router.get("/count", response_model=Dict[str, int])
+@limiter.limit(POLL_LIMIT)
+async def count_driver_posts_by_status(request: Request, response: Response):
+    return await DriverPostRepository.post_quantities()
+
 @router.get("/count/open", response_model=int)
-async def count_driver_posts():
+@limiter.limit(POLL_LIMIT)
+async def count_driver_posts(request: Request, response: Response):
     try:
         count = await DriverPostRepository.open_post_quantity()
         return count
@@ -179,9 +484,47 @@ async def count_driver_posts():
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/count/matched", response_model=int)
-async def count_matched_driver_posts():
+@limiter.limit(POLL_LIMIT)
+async def count_matched_driver_posts(request: Request, response: Response):
     try:
         count = await DriverPostRepository.matched_post_quantity()
         return count
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/cache/stats", response_model=dict)
+async def get_cache_stats():
+    return await DriverPostRepository.cache_stats()
+
+
+@router.get("/events/stats", response_model=dict)
+async def get_event_stats():
+    return DriverPostRepository.event_stats()
+
+@router.get("/events")
+async def post_events(
+    post_id: List[str] = Query([]),
+    driver_id: List[str] = Query([]),
+):
+    """Server-Sent Events stream of post changes, optionally filtered by post_id/driver_id."""
+    async def stream():
+        subscription = DriverPostRepository.subscribe(post_id, driver_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                data = orjson.dumps(event, default=json_default).decode()
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            DriverPostRepository.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
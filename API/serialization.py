@@ -0,0 +1,49 @@
+# API/serialization.py
+from typing import List, Mapping, Optional, Type
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from API.dto.driver_post import DriverPostReturnDTO
+
+JSON_MEDIA_TYPE = "application/json"
+
+_list_adapters: dict[type, TypeAdapter] = {}
+
+
+def _list_adapter(dto: Type[BaseModel]) -> TypeAdapter:
+    adapter = _list_adapters.get(dto)
+    if adapter is None:
+        adapter = _list_adapters[dto] = TypeAdapter(List[dto])
+    return adapter
+
+
+def posts_response(
+    rows: Optional[list[dict]],
+    dto: Type[BaseModel] = DriverPostReturnDTO,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Validate the rows once and encode them straight to JSON bytes in pydantic-core.
+    Returning a Response skips FastAPI's second validation against response_model,
+    which stays on the route for the OpenAPI schema only.
+    """
+    adapter = _list_adapter(dto)
+    body = adapter.dump_json(adapter.validate_python(rows or []), by_alias=True)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def post_response(row: dict, dto: Type[BaseModel] = DriverPostReturnDTO,
+                  headers: Optional[Mapping[str, str]] = None) -> Response:
+    body = dto.model_validate(row).model_dump_json(by_alias=True)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def row_response(row: dict, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    The row keyed by column name (start_point, contact, time_stamp), not by the
+    DTO aliases: the shape routes that return a raw row have always answered with.
+    """
+    return JSONResponse(content=jsonable_encoder(row), headers=headers)
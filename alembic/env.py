@@ -2,11 +2,16 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, pool
 from alembic import context
-from domain.product import Base
+from domain.driverPost import Base
 from logging.config import fileConfig
 
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")  # .env 裡面放這個
+# DATABASE_URL (blocking driver, e.g. mysql+pymysql://...) wins; otherwise migrate the
+# database the app talks to (DB_URL) through the matching blocking driver
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    from infrastructure.database import sync_url
+    DATABASE_URL = sync_url(os.getenv("DB_URL"))
 
 config = context.config
 if config.config_file_name is not None:
@@ -28,3 +33,8 @@ def run_migrations_offline():
                       compare_type=True, compare_server_default=True)
     with context.begin_transaction():
         context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
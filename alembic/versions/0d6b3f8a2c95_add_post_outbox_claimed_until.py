@@ -0,0 +1,29 @@
+"""add post_outbox.claimed_until so batches are claimed instead of locked
+
+Revision ID: 0d6b3f8a2c95
+Revises: e2a9f5c7b384
+Create Date: 2026-10-18 20:05:31.417902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6b3f8a2c95'
+down_revision: Union[str, Sequence[str], None] = 'e2a9f5c7b384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('post_outbox', sa.Column('claimed_until', mysql.DATETIME(fsp=6), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('post_outbox', 'claimed_until')
@@ -0,0 +1,36 @@
+"""add driver_posts.updated_at
+
+Revision ID: 3c9e5a7f1b24
+Revises: f1b7d4a9e362
+Create Date: 2026-10-18 16:47:03.281946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5a7f1b24'
+down_revision: Union[str, Sequence[str], None] = 'f1b7d4a9e362'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('driver_posts', sa.Column(
+        'updated_at', mysql.DATETIME(fsp=6), nullable=False,
+        server_default=sa.text('CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)'),
+    ))
+    # existing rows: last known change is their creation
+    op.execute('UPDATE driver_posts SET updated_at = time_stamp')
+    op.create_index('ix_driver_posts_updated_at', 'driver_posts', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_posts_updated_at', table_name='driver_posts')
+    op.drop_column('driver_posts', 'updated_at')
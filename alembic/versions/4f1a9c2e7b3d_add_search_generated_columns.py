@@ -0,0 +1,63 @@
+"""add generated start/destination search columns
+
+Revision ID: 4f1a9c2e7b3d
+Revises: cbbfc4046cbb
+Create Date: 2026-10-18 10:12:40.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a9c2e7b3d'
+down_revision: Union[str, Sequence[str], None] = 'cbbfc4046cbb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_COLUMNS = [
+    ("start_name", "start_point", "Name"),
+    ("start_address", "start_point", "Address"),
+    ("destination_name", "destination", "Name"),
+    ("destination_address", "destination", "Address"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED generated columns are filled by MySQL for the existing rows during ALTER TABLE
+    for name, source, key in SEARCH_COLUMNS:
+        op.add_column(
+            'driver_posts',
+            sa.Column(
+                name,
+                sa.String(length=512),
+                sa.Computed(
+                    f"left(json_unquote(json_extract(`{source}`, '$.{key}')), 512)",
+                    persisted=True,
+                ),
+                nullable=True,
+            ),
+        )
+        op.create_index(f'ix_driver_posts_{name}', 'driver_posts', [name])
+
+    op.create_index(
+        'ft_driver_posts_start', 'driver_posts', ['start_name', 'start_address'],
+        mysql_prefix='FULLTEXT', mysql_with_parser='ngram',
+    )
+    op.create_index(
+        'ft_driver_posts_destination', 'driver_posts', ['destination_name', 'destination_address'],
+        mysql_prefix='FULLTEXT', mysql_with_parser='ngram',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_driver_posts_destination', table_name='driver_posts')
+    op.drop_index('ft_driver_posts_start', table_name='driver_posts')
+    for name, _, _ in reversed(SEARCH_COLUMNS):
+        op.drop_index(f'ix_driver_posts_{name}', table_name='driver_posts')
+        op.drop_column('driver_posts', name)
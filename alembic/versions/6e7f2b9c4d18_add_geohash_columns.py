@@ -0,0 +1,65 @@
+"""add start/destination coordinates and geohash
+
+Revision ID: 6e7f2b9c4d18
+Revises: d83c51f0e2a4
+Create Date: 2026-10-18 14:58:52.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from domain import geo
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e7f2b9c4d18'
+down_revision: Union[str, Sequence[str], None] = 'd83c51f0e2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+PREFIXES = ("start", "destination")
+
+
+def _backfill() -> None:
+    # coordinates live in JSON with loosely named keys, so they are parsed in Python
+    bind = op.get_bind()
+    posts = sa.table(
+        'driver_posts',
+        sa.column('id', sa.String), sa.column('start_point', sa.JSON), sa.column('destination', sa.JSON),
+        *(sa.column(f'{p}_{c}') for p in PREFIXES for c in ('lat', 'lng', 'geohash')),
+    )
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(posts.c.id, posts.c.start_point, posts.c.destination)
+            .where(posts.c.id > last_id).order_by(posts.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for post_id, start_point, destination in rows:
+            values = geo.point_columns(start_point, 'start') | geo.point_columns(destination, 'destination')
+            bind.execute(sa.update(posts).where(posts.c.id == post_id).values(**values))
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for prefix in PREFIXES:
+        op.add_column('driver_posts', sa.Column(f'{prefix}_lat', sa.Float(), nullable=True))
+        op.add_column('driver_posts', sa.Column(f'{prefix}_lng', sa.Float(), nullable=True))
+        op.add_column('driver_posts', sa.Column(f'{prefix}_geohash', sa.String(length=12), nullable=True))
+    _backfill()
+    for prefix in PREFIXES:
+        op.create_index(f'ix_driver_posts_status_{prefix}_geohash', 'driver_posts', ['status', f'{prefix}_geohash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for prefix in reversed(PREFIXES):
+        op.drop_index(f'ix_driver_posts_status_{prefix}_geohash', table_name='driver_posts')
+        op.drop_column('driver_posts', f'{prefix}_geohash')
+        op.drop_column('driver_posts', f'{prefix}_lng')
+        op.drop_column('driver_posts', f'{prefix}_lat')
@@ -0,0 +1,28 @@
+"""add (client_id, status) index for the dashboard
+
+Revision ID: 7a4d2f8b6e10
+Revises: 3c9e5a7f1b24
+Create Date: 2026-10-18 17:21:55.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2f8b6e10'
+down_revision: Union[str, Sequence[str], None] = '3c9e5a7f1b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_driver_posts_client_status', 'driver_posts', ['client_id', 'status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_posts_client_status', table_name='driver_posts')
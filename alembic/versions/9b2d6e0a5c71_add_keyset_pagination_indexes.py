@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: 9b2d6e0a5c71
+Revises: 4f1a9c2e7b3d
+Create Date: 2026-10-18 11:03:27.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2d6e0a5c71'
+down_revision: Union[str, Sequence[str], None] = '4f1a9c2e7b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_driver_posts_status_departure', 'driver_posts', ['status', 'departure_time', 'id'])
+    op.create_index('ix_driver_posts_time_stamp', 'driver_posts', ['time_stamp', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_posts_time_stamp', table_name='driver_posts')
+    op.drop_index('ix_driver_posts_status_departure', table_name='driver_posts')
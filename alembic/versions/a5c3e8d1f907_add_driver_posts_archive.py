@@ -0,0 +1,61 @@
+"""add driver_posts_archive
+
+Revision ID: a5c3e8d1f907
+Revises: 6e7f2b9c4d18
+Create Date: 2026-10-18 15:32:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c3e8d1f907'
+down_revision: Union[str, Sequence[str], None] = '6e7f2b9c4d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'driver_posts_archive',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('driver_id', sa.String(length=255), nullable=False),
+        sa.Column('client_id', sa.String(length=255), server_default=sa.text("'unknown'"), nullable=False),
+        sa.Column('vehicle_info', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.Enum('open', 'matched', 'closed', name='driver_post_status'), nullable=False),
+        sa.Column('time_stamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('start_point', mysql.JSON(), nullable=False),
+        sa.Column('destination', mysql.JSON(), nullable=False),
+        sa.Column('start_lat', sa.Float(), nullable=True),
+        sa.Column('start_lng', sa.Float(), nullable=True),
+        sa.Column('start_geohash', sa.String(length=12), nullable=True),
+        sa.Column('destination_lat', sa.Float(), nullable=True),
+        sa.Column('destination_lng', sa.Float(), nullable=True),
+        sa.Column('destination_geohash', sa.String(length=12), nullable=True),
+        sa.Column('meet_point', mysql.JSON(), nullable=False),
+        sa.Column('departure_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('helmet', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('contact', mysql.JSON(), nullable=False),
+        sa.Column('leave', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('image_url', sa.String(length=2083), nullable=True),
+        sa.Column('thumbnail_url', sa.String(length=2083), nullable=True),
+        sa.Column('display_url', sa.String(length=2083), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_driver_posts_archive_driver_id', 'driver_posts_archive', ['driver_id'])
+    op.create_index('ix_driver_posts_archive_departure_time', 'driver_posts_archive', ['departure_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_posts_archive_departure_time', table_name='driver_posts_archive')
+    op.drop_index('ix_driver_posts_archive_driver_id', table_name='driver_posts_archive')
+    op.drop_table('driver_posts_archive')
@@ -0,0 +1,31 @@
+"""add ngram FULLTEXT index on notes, description and vehicle_info
+
+Revision ID: b8e2c6d4a017
+Revises: 7a4d2f8b6e10
+Create Date: 2026-10-18 18:02:37.214905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2c6d4a017'
+down_revision: Union[str, Sequence[str], None] = '7a4d2f8b6e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ft_driver_posts_text', 'driver_posts', ['notes', 'description', 'vehicle_info'],
+        mysql_prefix='FULLTEXT', mysql_with_parser='ngram',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_driver_posts_text', table_name='driver_posts')
@@ -0,0 +1,32 @@
+"""add driver_posts.version for optimistic concurrency
+
+Revision ID: c4f0a8e2d951
+Revises: b8e2c6d4a017
+Create Date: 2026-10-18 18:40:12.583310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f0a8e2d951'
+down_revision: Union[str, Sequence[str], None] = 'b8e2c6d4a017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing rows start at version 1
+    op.add_column(
+        'driver_posts',
+        sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('1')),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('driver_posts', 'version')
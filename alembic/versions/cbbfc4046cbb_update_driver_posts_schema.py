@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
 
 
 # revision identifiers, used by Alembic.
@@ -20,9 +21,36 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    pass
+    # databases created by the app's old create_all at startup already have the table
+    if sa.inspect(op.get_bind()).has_table('driver_posts'):
+        return
+    op.create_table(
+        'driver_posts',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('driver_id', sa.String(length=255), nullable=False),
+        sa.Column('client_id', sa.String(length=255), server_default=sa.text("'unknown'"), nullable=False),
+        sa.Column('vehicle_info', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.Enum('open', 'matched', 'closed', name='driver_post_status'),
+                  server_default='open', nullable=False),
+        sa.Column('time_stamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('start_point', mysql.JSON(), nullable=False),
+        sa.Column('destination', mysql.JSON(), nullable=False),
+        sa.Column('meet_point', mysql.JSON(), nullable=False),
+        sa.Column('departure_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('helmet', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('contact', mysql.JSON(), nullable=False),
+        sa.Column('leave', sa.Boolean(), server_default='0', nullable=False),
+        sa.Column('image_url', sa.String(length=2083), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_driver_posts_driver_id', 'driver_posts', ['driver_id'])
+    op.create_index('ix_driver_posts_client_id', 'driver_posts', ['client_id'])
+    op.create_index('ix_driver_posts_status', 'driver_posts', ['status'])
+    op.create_index('ix_driver_posts_driver_status', 'driver_posts', ['driver_id', 'status'])
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    pass
+    op.drop_table('driver_posts')
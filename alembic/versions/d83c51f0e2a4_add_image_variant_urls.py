@@ -0,0 +1,30 @@
+"""add thumbnail/display image urls
+
+Revision ID: d83c51f0e2a4
+Revises: 9b2d6e0a5c71
+Create Date: 2026-10-18 13:41:09.927116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83c51f0e2a4'
+down_revision: Union[str, Sequence[str], None] = '9b2d6e0a5c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('driver_posts', sa.Column('thumbnail_url', sa.String(length=2083), nullable=True))
+    op.add_column('driver_posts', sa.Column('display_url', sa.String(length=2083), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('driver_posts', 'display_url')
+    op.drop_column('driver_posts', 'thumbnail_url')
@@ -0,0 +1,41 @@
+"""add post_outbox
+
+Revision ID: e2a9f5c7b384
+Revises: c4f0a8e2d951
+Create Date: 2026-10-18 19:15:48.902167
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9f5c7b384'
+down_revision: Union[str, Sequence[str], None] = 'c4f0a8e2d951'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'post_outbox',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('event_type', sa.String(length=16), nullable=False),
+        sa.Column('post_id', sa.String(length=36), nullable=True),
+        sa.Column('driver_id', sa.String(length=255), nullable=True),
+        sa.Column('payload', mysql.JSON(), nullable=True),
+        sa.Column(
+            'created_at', mysql.DATETIME(fsp=6), nullable=False,
+            server_default=sa.text('CURRENT_TIMESTAMP(6)'),
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('post_outbox')
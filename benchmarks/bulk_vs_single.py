@@ -0,0 +1,99 @@
+# benchmarks/bulk_vs_single.py
+"""
+Compare the one-request-per-post path with the bulk endpoints for create,
+update and delete of --posts posts (bulk requests carry --batch posts).
+
+Start the server with RATE_LIMIT_ENABLED=false: every request comes from one
+address, and a 429 aborts the run.
+
+    python -m benchmarks.bulk_vs_single --base-url http://localhost:8000 --posts 2000 --batch 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.common import API_PREFIX, bench_client, make_post
+
+
+def _batches(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def timed(label: str, results: dict, n: int, coro):
+    started = time.perf_counter()
+    value = await coro
+    elapsed = time.perf_counter() - started
+    results[label] = {"seconds": round(elapsed, 3), "posts_per_s": round(n / elapsed, 1)}
+    return value
+
+
+async def single_path(client: httpx.AsyncClient, bodies: list[dict], concurrency: int, results: dict):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def call(method: str, url: str, **kwargs):
+        async with sem:
+            r = await client.request(method, url, **kwargs)
+            r.raise_for_status()
+            return r
+
+    async def create_all():
+        responses = await asyncio.gather(*(call("POST", f"{API_PREFIX}/", json=b) for b in bodies))
+        return [r.json() for r in responses]
+
+    ids = await timed("single_create", results, len(bodies), create_all())
+    await timed("single_update", results, len(ids), asyncio.gather(*(
+        call("PATCH", f"{API_PREFIX}/driver_posts/{post_id}", json={"notes": "updated"}) for post_id in ids
+    )))
+    await timed("single_delete", results, len(ids), asyncio.gather(*(
+        call("DELETE", f"{API_PREFIX}/delete/post/{post_id}") for post_id in ids
+    )))
+
+
+async def bulk_path(client: httpx.AsyncClient, bodies: list[dict], batch: int, results: dict):
+    async def create_all():
+        ids = []
+        for chunk in _batches(bodies, batch):
+            r = await client.post(f"{API_PREFIX}/bulk", json=chunk)
+            r.raise_for_status()
+            ids += [item["post_id"] for item in r.json()]
+        return ids
+
+    async def update_all(ids):
+        for chunk in _batches(ids, batch):
+            items = [{"post_id": post_id, "changes": {"notes": "updated"}} for post_id in chunk]
+            (await client.patch(f"{API_PREFIX}/bulk", json=items)).raise_for_status()
+
+    async def delete_all(ids):
+        for chunk in _batches(ids, batch):
+            (await client.post(f"{API_PREFIX}/bulk/delete", json=chunk)).raise_for_status()
+
+    ids = await timed("bulk_create", results, len(bodies), create_all())
+    await timed("bulk_update", results, len(ids), update_all(ids))
+    await timed("bulk_delete", results, len(ids), delete_all(ids))
+
+
+async def main(base_url: str, posts: int, batch: int, concurrency: int):
+    rng = random.Random(0)
+    bodies = [make_post(i, rng) for i in range(posts)]
+    results: dict = {"posts": posts, "batch": batch, "concurrency": concurrency}
+    async with bench_client(base_url=base_url, timeout=120) as client:
+        await single_path(client, bodies, concurrency, results)
+        await bulk_path(client, bodies, batch, results)
+    for op in ("create", "update", "delete"):
+        results[f"{op}_speedup"] = round(results[f"single_{op}"]["seconds"] / results[f"bulk_{op}"]["seconds"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20, help="in-flight requests on the single path")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.posts, args.batch, args.concurrency))
@@ -0,0 +1,87 @@
+# benchmarks/common.py
+# Helpers shared by the benchmark scripts. Run them from the repo root, e.g.
+#   python -m benchmarks.match_concurrency --base-url http://localhost:8000
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import httpx
+
+API_PREFIX = "/api/posts"
+RATE_LIMIT_HINT = "start the server with RATE_LIMIT_ENABLED=false"
+
+PLACES = [
+    ("海大", "基隆市中正區北寧路2號", 25.1504, 121.7797),
+    ("基隆火車站", "基隆市仁愛區港西街5號", 25.1319, 121.7392),
+    ("台北車站", "台北市中正區北平西路3號", 25.0478, 121.5170),
+    ("南港車站", "台北市南港區南港路一段313號", 25.0522, 121.6068),
+    ("汐止", "新北市汐止區新台五路一段", 25.0632, 121.6615),
+    ("七堵", "基隆市七堵區東新街", 25.0929, 121.7136),
+]
+
+
+class RateLimited(RuntimeError):
+    pass
+
+
+async def _fail_on_rate_limit(response: httpx.Response):
+    if response.status_code == 429:
+        request = response.request
+        raise RateLimited(f"{request.method} {request.url.path} was rate limited; {RATE_LIMIT_HINT}")
+
+
+def bench_client(base_url: str, **kwargs) -> httpx.AsyncClient:
+    """
+    AsyncClient for a benchmark run: a 429 aborts the run instead of being timed
+    (or counted) like an answer, since every request comes from one address.
+    """
+    return httpx.AsyncClient(base_url=base_url, event_hooks={"response": [_fail_on_rate_limit]}, **kwargs)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """Latencies in seconds -> throughput and percentiles in milliseconds."""
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def _place(rng: random.Random) -> dict:
+    name, address, lat, lng = rng.choice(PLACES)
+    # jitter so posts do not all sit on the same coordinate
+    return {
+        "Name": name,
+        "Address": address,
+        "Lat": lat + rng.uniform(-0.02, 0.02),
+        "Lng": lng + rng.uniform(-0.02, 0.02),
+    }
+
+
+def make_post(i: int, rng: random.Random, now: datetime | None = None) -> dict:
+    """Request body for POST /api/posts/ (field aliases as the API expects)."""
+    now = now or datetime.now()
+    start = _place(rng)
+    return {
+        "driver_id": f"bench-driver-{i % 1000}",
+        "vehicle_info": "機車",
+        "starting_point": start,
+        "destination": _place(rng),
+        "meet_point": start,
+        "departure_time": (now + timedelta(minutes=rng.randint(-600, 4320))).isoformat(),
+        "notes": f"benchmark post {i}",
+        "description": "順路載人",
+        "helmet": rng.random() < 0.5,
+        "contact_info": {"phone": f"09{rng.randint(10000000, 99999999)}"},
+    }
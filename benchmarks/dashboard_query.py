@@ -0,0 +1,120 @@
+# benchmarks/dashboard_query.py
+"""
+A user's posts: the `driver_id = ? OR client_id = ?` query behind
+/search/{user_id} (every row, unpaginated) versus the /dashboard query
+(UNION ALL of one arm per role on (driver_id, status) / (client_id, status),
+newest LIMIT rows per role, plus per-status counts), on a synthetic
+driver_posts table in SQLite (stdlib, no server needed).
+
+SQLite can answer an OR of two indexed columns with a multi-index OR plan,
+which MySQL often does not (it scans instead), so the gap here is a lower
+bound. The query plans are printed so the two can be compared; run the
+same SQL under EXPLAIN on MySQL to see the scan.
+
+    python -m benchmarks.dashboard_query --rows 1000000 --queries 500 --limit 20
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import summarize
+
+STATUSES = ("open", "matched", "closed")
+
+OR_QUERY = "SELECT * FROM driver_posts WHERE driver_id = ? OR client_id = ?"
+
+# SQLite only allows ORDER BY / LIMIT on a UNION arm inside a subquery
+POSTS_QUERY = """
+SELECT * FROM (SELECT *, 'driver' AS role FROM driver_posts WHERE driver_id = ?
+               ORDER BY departure_time DESC, id DESC LIMIT ?)
+UNION ALL
+SELECT * FROM (SELECT *, 'client' AS role FROM driver_posts WHERE client_id = ?
+               ORDER BY departure_time DESC, id DESC LIMIT ?)
+"""
+COUNTS_QUERY = """
+SELECT 'driver' AS role, status, COUNT(*) FROM driver_posts WHERE driver_id = ? GROUP BY status
+UNION ALL
+SELECT 'client' AS role, status, COUNT(*) FROM driver_posts WHERE client_id = ? GROUP BY status
+"""
+
+
+def seed(conn: sqlite3.Connection, rows: int, users: int, rng: random.Random):
+    conn.execute("""
+        CREATE TABLE driver_posts (
+            id TEXT PRIMARY KEY, driver_id TEXT NOT NULL, client_id TEXT NOT NULL,
+            status TEXT NOT NULL, departure_time TEXT NOT NULL, notes TEXT
+        )
+    """)
+    start = datetime(2025, 1, 1)
+    batch = []
+    for i in range(rows):
+        post_status = rng.choices(STATUSES, [3, 3, 4])[0]
+        client = "unknown" if post_status == "open" else f"user-{rng.randrange(users)}"
+        departure = start + timedelta(minutes=rng.randrange(600_000))
+        batch.append((f"{i:08d}", f"user-{rng.randrange(users)}", client, post_status,
+                      departure.isoformat(sep=" "), "x" * 80))
+        if len(batch) == 50_000:
+            conn.executemany("INSERT INTO driver_posts VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO driver_posts VALUES (?, ?, ?, ?, ?, ?)", batch)
+    conn.execute("CREATE INDEX ix_driver_posts_driver_status ON driver_posts (driver_id, status)")
+    conn.execute("CREATE INDEX ix_driver_posts_client_status ON driver_posts (client_id, status)")
+    conn.execute("ANALYZE")
+
+
+def or_query(conn, user_id, limit):
+    return conn.execute(OR_QUERY, (user_id, user_id)).fetchall()
+
+
+def dashboard_query(conn, user_id, limit):
+    counts = conn.execute(COUNTS_QUERY, (user_id, user_id)).fetchall()
+    posts = conn.execute(POSTS_QUERY, (user_id, limit + 1, user_id, limit + 1)).fetchall()
+    return counts, posts
+
+
+def run(conn, fn, user_ids, limit) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for user_id in user_ids:
+        t0 = time.perf_counter()
+        fn(conn, user_id, limit)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def plan(conn, sql, params) -> list[str]:
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=2_000, help="fewer users = more posts per user")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    conn = sqlite3.connect(":memory:")
+    seed(conn, args.rows, args.users, rng)
+    user_ids = [f"user-{rng.randrange(args.users)}" for _ in range(args.queries)]
+
+    results = {
+        "rows": args.rows,
+        "posts_per_user": round(args.rows / args.users, 1),
+        "or_query": run(conn, or_query, user_ids, args.limit),
+        "dashboard": run(conn, dashboard_query, user_ids, args.limit),
+        "plans": {
+            "or_query": plan(conn, OR_QUERY, ("user-1", "user-1")),
+            "dashboard_posts": plan(conn, POSTS_QUERY, ("user-1", 21, "user-1", 21)),
+            "dashboard_counts": plan(conn, COUNTS_QUERY, ("user-1", "user-1")),
+        },
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
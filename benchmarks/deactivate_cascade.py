@@ -0,0 +1,84 @@
+# benchmarks/deactivate_cascade.py
+"""
+Deactivating a user who drives --posts posts and holds --matched posts of
+other drivers as client: the previous sequence of calls
+(PATCH /unmatch/client/{id} then DELETE /delete/driver/{id}) versus one
+POST /users/{id}/deactivate?driver_action=delete. Afterwards the dashboard
+of each user must be empty (driver) / free of matched posts (client), and
+the cascade must report one result per post.
+
+Start the server with RATE_LIMIT_ENABLED=false: every request comes from one
+address, and a 429 aborts the run.
+
+    python -m benchmarks.deactivate_cascade --base-url http://localhost:8000 --posts 1000 5000 --matched 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.common import API_PREFIX, bench_client, make_post
+
+BATCH = 500
+
+
+async def seed(client: httpx.AsyncClient, user_id: str, posts: int, matched: int, rng: random.Random):
+    bodies = []
+    for i in range(posts):
+        bodies.append(make_post(i, rng) | {"driver_id": user_id})
+    for i in range(matched):
+        bodies.append(make_post(i, rng) | {"status": "matched", "client_id": user_id})
+    for start in range(0, len(bodies), BATCH):
+        (await client.post(f"{API_PREFIX}/bulk", json=bodies[start:start + BATCH])).raise_for_status()
+
+
+async def check_cleared(client: httpx.AsyncClient, user_id: str):
+    r = await client.get(f"{API_PREFIX}/dashboard/{user_id}", params={"limit": 1})
+    r.raise_for_status()
+    counts = r.json()["counts"]
+    assert sum(counts["driver"].values()) == 0, counts
+    assert counts["client"]["matched"] == 0, counts
+
+
+async def legacy(client: httpx.AsyncClient, user_id: str):
+    (await client.patch(f"{API_PREFIX}/unmatch/client/{user_id}")).raise_for_status()
+    (await client.delete(f"{API_PREFIX}/delete/driver/{user_id}")).raise_for_status()
+
+
+async def cascade(client: httpx.AsyncClient, user_id: str, expected: int):
+    r = await client.post(f"{API_PREFIX}/users/{user_id}/deactivate", params={"driver_action": "delete"})
+    r.raise_for_status()
+    body = r.json()
+    assert len(body["posts"]) == expected, (len(body["posts"]), expected)
+
+
+async def main(base_url: str, sizes: list[int], matched: int):
+    rng = random.Random(0)
+    results = []
+    async with bench_client(base_url=base_url, timeout=300) as client:
+        for posts in sizes:
+            row = {"posts": posts, "matched": matched}
+            for label in ("legacy", "cascade"):
+                user_id = f"bench-deactivate-{label}-{posts}-{rng.randrange(1 << 30)}"
+                await seed(client, user_id, posts, matched, rng)
+                started = time.perf_counter()
+                if label == "legacy":
+                    await legacy(client, user_id)
+                else:
+                    await cascade(client, user_id, posts + matched)
+                row[f"{label}_s"] = round(time.perf_counter() - started, 3)
+                await check_cleared(client, user_id)
+            results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--posts", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--matched", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.posts, args.matched))
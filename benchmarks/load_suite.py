@@ -0,0 +1,260 @@
+# benchmarks/load_suite.py
+"""
+Load test of every post route against a running server, at several table
+sizes. For each size the table is topped up with benchmarks.seed, then each
+route is driven by --concurrency async clients for --requests requests and
+reported with throughput, p50/p95/p99 latency, status codes and the number
+of SQL statements per request (from the server's /metrics). Results are
+written as JSON so two commits can be compared:
+
+    python -m benchmarks.load_suite --base-url http://localhost:8000 --rows 10000 100000 1000000
+    python -m benchmarks.load_suite ... --compare benchmarks/results/<older>.json
+
+The service itself needs MySQL (generated JSON columns, FULLTEXT); point
+DB_URL at a local server and run `alembic upgrade head` first. Start it
+with RATE_LIMIT_ENABLED=false, or the limiter answers most requests with
+429.
+Rows are inserted behind the server's back, so cached lists and counts
+can lag by up to POST_CACHE_TTL / STATUS_COUNT_RECONCILE_INTERVAL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import httpx
+
+from API.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from benchmarks.common import API_PREFIX, PLACES, summarize
+from benchmarks import seed as seeder
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+STATEMENT_COUNT_METRIC = "db_statement_duration_seconds_count"
+REGRESSION_THRESHOLD = 0.10  # flag p95 / throughput changes worse than 10%
+
+# (method, path, keyword arguments for httpx)
+Request = tuple[str, str, dict]
+
+
+@dataclass
+class Context:
+    """Ids sampled from the seeded table, shared by the scenarios."""
+    open_post_ids: list[str]
+    post_ids: list[str]
+    driver_ids: list[str]
+    matched_clients: list[str]
+    rng: random.Random
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Context], Optional[Request]]  # None: nothing left to send (e.g. no open posts)
+
+
+def _place(ctx: Context) -> tuple:
+    return ctx.rng.choice(PLACES)
+
+
+def _time(ctx: Context) -> str:
+    return (datetime.now() + timedelta(minutes=ctx.rng.randint(-600, 3000))).isoformat()
+
+
+def _request_post(ctx: Context) -> Optional[Request]:
+    if not ctx.open_post_ids:
+        return None
+    client_id = f"bench-load-client-{ctx.rng.randrange(1 << 30)}"
+    ctx.matched_clients.append(client_id)
+    post_id = ctx.open_post_ids.pop()
+    return "PATCH", f"{API_PREFIX}/request", {"params": {"post_id": post_id, "client_id": client_id}}
+
+
+def _unmatch(ctx: Context) -> Optional[Request]:
+    if not ctx.matched_clients:
+        return None
+    return "PATCH", f"{API_PREFIX}/unmatch/client/{ctx.matched_clients.pop()}", {}
+
+
+SCENARIOS = [
+    Scenario("all_page", lambda ctx: ("GET", f"{API_PREFIX}/all", {"params": {"limit": 50}})),
+    Scenario("allpost_page", lambda ctx: ("GET", f"{API_PREFIX}/allpost", {"params": {"limit": 50}})),
+    Scenario("getpost", lambda ctx: ("GET", f"{API_PREFIX}/getpost/{ctx.rng.choice(ctx.post_ids)}", {})),
+    Scenario("search_exact", lambda ctx: ("GET", f"{API_PREFIX}/search", {"params": {
+        "start_point": _place(ctx)[0], "end_point": _place(ctx)[0], "time": _time(ctx), "limit": 50,
+    }})),
+    Scenario("search_partial", lambda ctx: ("GET", f"{API_PREFIX}/search", {"params": {
+        "start_point": _place(ctx)[0][:2], "time": _time(ctx), "partial": "true", "limit": 50,
+    }})),
+    Scenario("search_text", lambda ctx: ("GET", f"{API_PREFIX}/search", {"params": {
+        "q": f"post {ctx.rng.randrange(10_000)}", "limit": 50,
+    }})),
+    Scenario("search_nearby", lambda ctx: ("GET", f"{API_PREFIX}/search/nearby", {"params": {
+        "lat": _place(ctx)[2], "lng": _place(ctx)[3], "radius_km": 3,
+    }})),
+    Scenario("search_user", lambda ctx: ("GET", f"{API_PREFIX}/search/{ctx.rng.choice(ctx.driver_ids)}", {})),
+    Scenario("dashboard", lambda ctx: ("GET", f"{API_PREFIX}/dashboard/{ctx.rng.choice(ctx.driver_ids)}", {})),
+    Scenario("count", lambda ctx: ("GET", f"{API_PREFIX}/count", {})),
+    Scenario("count_open", lambda ctx: ("GET", f"{API_PREFIX}/count/open", {})),
+    Scenario("count_matched", lambda ctx: ("GET", f"{API_PREFIX}/count/matched", {})),
+    Scenario("modify", lambda ctx: ("PATCH", f"{API_PREFIX}/driver_posts/{ctx.rng.choice(ctx.post_ids)}", {
+        "json": {"notes": f"benchmark edit {ctx.rng.randrange(1 << 30)}"},
+    })),
+    Scenario("request", _request_post),
+    Scenario("unmatch", _unmatch),
+]
+
+
+async def statement_count(client: httpx.AsyncClient) -> Optional[float]:
+    r = await client.get("/metrics")
+    if r.status_code != 200:
+        return None
+    total = 0.0
+    for line in r.text.splitlines():
+        if line.startswith(STATEMENT_COUNT_METRIC):
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+async def fetch_pages(client: httpx.AsyncClient, path: str, size: int) -> list[dict]:
+    """Up to `size` posts from a cursor-paginated list route, MAX_PAGE_SIZE at a time."""
+    posts: list[dict] = []
+    cursor = None
+    while len(posts) < size:
+        params = {"limit": min(MAX_PAGE_SIZE, size - len(posts))}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get(f"{API_PREFIX}{path}", params=params)
+        r.raise_for_status()
+        posts.extend(r.json())
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    return posts
+
+
+async def sample_context(client: httpx.AsyncClient, rng: random.Random, size: int = 2000) -> Context:
+    open_posts = await fetch_pages(client, "/all", size)
+    all_posts = await fetch_pages(client, "/allpost", size)
+    rng.shuffle(open_posts)
+    return Context(
+        open_post_ids=[p["id"] for p in open_posts],
+        post_ids=[p["id"] for p in all_posts] or [p["id"] for p in open_posts],
+        driver_ids=sorted({p["driver_id"] for p in all_posts}) or ["bench-driver-0"],
+        matched_clients=[],
+        rng=rng,
+    )
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context,
+                       requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    codes: Counter = Counter()
+    queue = [scenario.build(ctx) for _ in range(requests)]
+    queue = [r for r in queue if r is not None]
+
+    async def worker():
+        while queue:
+            method, path, kwargs = queue.pop()
+            started = time.perf_counter()
+            r = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            codes[r.status_code] += 1
+
+    before = await statement_count(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await statement_count(client)
+
+    result = summarize(latencies, elapsed)
+    result["status_codes"] = {str(code): n for code, n in sorted(codes.items())}
+    result["errors"] = sum(n for code, n in codes.items() if code >= 400)
+    if before is not None and after is not None and latencies:
+        # the /metrics scrape itself issues no SQL
+        result["db_queries_per_request"] = round((after - before) / len(latencies), 2)
+    if codes.get(429):
+        raise SystemExit(f"{scenario.name} was rate limited; start the server with RATE_LIMIT_ENABLED=false")
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    lines = []
+    for size, routes in current["sizes"].items():
+        for name, result in routes.items():
+            old = baseline.get("sizes", {}).get(size, {}).get(name)
+            if not old or not old.get("p95_ms") or not old.get("throughput_rps"):
+                continue
+            p95 = result["p95_ms"] / old["p95_ms"] - 1
+            rps = result["throughput_rps"] / old["throughput_rps"] - 1
+            flag = "REGRESSION" if p95 > REGRESSION_THRESHOLD or rps < -REGRESSION_THRESHOLD else ""
+            lines.append(f"{size:>8} {name:<16} p95 {p95:+7.1%}  rps {rps:+7.1%}  {flag}")
+    return lines
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    engine = seeder.make_engine(args.db_url)
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests_per_route": args.requests,
+        },
+        "sizes": {},
+    }
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        for rows in sorted(args.rows):
+            seeder.seed(engine, rows, args.seed)
+            ctx = await sample_context(client, rng)
+            report["sizes"][str(rows)] = results = {}
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, ctx, args.requests, args.concurrency)
+                r = results[scenario.name]
+                print(f"{rows:>8} {scenario.name:<16} {r['throughput_rps']:>9} rps  p95 {r['p95_ms']:>8} ms  "
+                      f"queries/req {r.get('db_queries_per_request', '-')}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit'] or 'nogit'}.json"
+    )
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"results written to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print("\n".join(compare(report, json.load(f))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--requests", type=int, default=500, help="per route and size")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-url", help="blocking SQLAlchemy URL used for seeding; default: DB_URL")
+    parser.add_argument("--out", help="result file; default benchmarks/results/<time>-<commit>.json")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    asyncio.run(main(parser.parse_args()))
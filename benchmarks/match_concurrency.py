@@ -0,0 +1,85 @@
+# benchmarks/match_concurrency.py
+"""
+Fire N simultaneous PATCH /request calls at one open post and check that
+exactly one client wins (200) while the rest get 409, then report throughput.
+More than one 200 is a double booking. A 429 is not: start the server with
+RATE_LIMIT_ENABLED=false, every call comes from one address and the write
+limit is far below -n.
+
+    python -m benchmarks.match_concurrency --base-url http://localhost:8000 -n 200 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.common import API_PREFIX, RATE_LIMIT_HINT, make_post, summarize
+
+
+async def one_round(client: httpx.AsyncClient, n: int, rng: random.Random) -> tuple[dict, list[float], float]:
+    resp = await client.post(f"{API_PREFIX}/", json=make_post(rng.randint(0, 10**6), rng))
+    resp.raise_for_status()
+    post_id = resp.json()
+
+    latencies: list[float] = []
+
+    async def request(i: int) -> int:
+        started = time.perf_counter()
+        r = await client.patch(f"{API_PREFIX}/request", params={"post_id": post_id, "client_id": f"bench-client-{i}"})
+        latencies.append(time.perf_counter() - started)
+        return r.status_code
+
+    started = time.perf_counter()
+    codes = await asyncio.gather(*(request(i) for i in range(n)))
+    elapsed = time.perf_counter() - started
+
+    await client.delete(f"{API_PREFIX}/delete/post/{post_id}")
+    return {code: codes.count(code) for code in set(codes)}, latencies, elapsed
+
+
+def verdict(codes: dict, n: int) -> str:
+    if codes.get(200, 0) > 1:
+        return "DOUBLE BOOKING"
+    if codes.get(429):
+        return f"RATE LIMITED ({RATE_LIMIT_HINT})"
+    if codes.get(200, 0) == 1 and codes.get(409, 0) == n - 1:
+        return "OK"
+    return "UNEXPECTED"
+
+
+async def main(base_url: str, n: int, rounds: int, seed: int):
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=n, max_keepalive_connections=n)
+    all_latencies: list[float] = []
+    total_elapsed = 0.0
+    verdicts: list[str] = []
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        for r in range(rounds):
+            codes, latencies, elapsed = await one_round(client, n, rng)
+            all_latencies += latencies
+            total_elapsed += elapsed
+            verdicts.append(verdict(codes, n))
+            print(f"round {r}: {codes} {verdicts[-1]}")
+
+    print(json.dumps({
+        "concurrency": n,
+        "rounds": rounds,
+        "failed_rounds": sum(v != "OK" for v in verdicts),
+        "double_bookings": verdicts.count("DOUBLE BOOKING"),
+        "rate_limited_rounds": sum(v.startswith("RATE LIMITED") for v in verdicts),
+        **summarize(all_latencies, total_elapsed),
+    }, indent=2))
+    return sum(v != "OK" for v in verdicts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("-n", type=int, default=100, help="simultaneous requests per post")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    raise SystemExit(1 if asyncio.run(main(args.base_url, args.n, args.rounds, args.seed)) else 0)
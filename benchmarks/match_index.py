@@ -0,0 +1,67 @@
+# benchmarks/match_index.py
+"""
+Latency of MatchIndex.recommend (the /recommend route minus HTTP) over
+--posts synthetic open posts spread across the benchmark places and the next
+three days. The index is filled in-process, no database needed.
+
+    python -m benchmarks.match_index --posts 10000 100000 --queries 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import PLACES, make_post, summarize
+from domain import geo
+from repository.match_index import MatchIndex, _entry
+
+
+def fill(index: MatchIndex, posts: int, rng: random.Random, now: datetime):
+    for i in range(posts):
+        body = make_post(i, rng, now)
+        post = {
+            "id": f"bench-{i}",
+            "status": "open",
+            "departure_time": datetime.fromisoformat(body["departure_time"]),
+            **geo.point_columns(body["starting_point"], "start"),
+            **geo.point_columns(body["destination"], "destination"),
+        }
+        index._add(_entry(post))
+    index._loaded = True
+
+
+async def run(index: MatchIndex, queries: int, rng: random.Random, now: datetime) -> dict:
+    latencies = []
+    matches = 0
+    started = time.perf_counter()
+    for _ in range(queries):
+        _, _, o_lat, o_lng = rng.choice(PLACES)
+        _, _, d_lat, d_lng = rng.choice(PLACES)
+        departure = now + timedelta(minutes=rng.randint(0, 3 * 24 * 60))
+        t0 = time.perf_counter()
+        matches += len(await index.recommend((o_lat, o_lng), (d_lat, d_lng), departure, timedelta(minutes=30), 3.0, 3.0))
+        latencies.append(time.perf_counter() - t0)
+    result = summarize(latencies, time.perf_counter() - started)
+    result["mean_matches"] = round(matches / queries, 2)
+    return result
+
+
+async def main(sizes: list[int], queries: int):
+    now = datetime.now()
+    results = []
+    for posts in sizes:
+        rng = random.Random(0)
+        index = MatchIndex()
+        fill(index, posts, rng, now)
+        results.append({"posts": posts, "buckets": index.stats()["buckets"], **await run(index, queries, rng, now)})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.posts, args.queries))
@@ -0,0 +1,105 @@
+# benchmarks/nearby_search.py
+"""
+Proximity search on a synthetic driver_posts table in SQLite (stdlib, no
+server needed): geohash prefix + bounding box on the (status, geohash)
+index, the same filters DriverPostRepository.search_nearby builds, versus
+scanning every open post and computing distances.
+
+    python -m benchmarks.nearby_search --rows 100000 --queries 200 --radius-km 2
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+
+from benchmarks.common import PLACES, summarize
+from domain import geo
+
+
+def seed(conn: sqlite3.Connection, rows: int, rng: random.Random):
+    conn.execute("""
+        CREATE TABLE driver_posts (
+            id TEXT PRIMARY KEY, status TEXT NOT NULL,
+            start_lat REAL, start_lng REAL, start_geohash TEXT
+        )
+    """)
+    data = []
+    for i in range(rows):
+        _, _, lat, lng = rng.choice(PLACES)
+        lat += rng.gauss(0, 0.15)
+        lng += rng.gauss(0, 0.15)
+        post_status = rng.choices(["open", "matched", "closed"], [6, 2, 2])[0]
+        data.append((f"{i:08d}", post_status, lat, lng, geo.encode(lat, lng)))
+    conn.executemany("INSERT INTO driver_posts VALUES (?, ?, ?, ?, ?)", data)
+    conn.execute("CREATE INDEX ix_driver_posts_status_start_geohash ON driver_posts (status, start_geohash)")
+    conn.execute("ANALYZE")
+
+
+def geohash_query(conn, lat, lng, radius_km):
+    min_lat, min_lng, max_lat, max_lng = geo.bounding_box(lat, lng, radius_km)
+    cells = geo.covering_cells(min_lat, min_lng, max_lat, max_lng)
+    # prefix ranges instead of LIKE so SQLite (case-sensitive-LIKE off) can use the index
+    ranges = " OR ".join("(start_geohash >= ? AND start_geohash < ?)" for _ in cells)
+    params = [bound for cell in cells for bound in (cell, cell + "~")]
+    rows = conn.execute(
+        f"SELECT id, start_lat, start_lng FROM driver_posts WHERE status = 'open' AND ({ranges})"
+        " AND start_lat BETWEEN ? AND ? AND start_lng BETWEEN ? AND ?",
+        [*params, min_lat, max_lat, min_lng, max_lng],
+    ).fetchall()
+    return _nearest(rows, lat, lng, radius_km)
+
+
+def scan_query(conn, lat, lng, radius_km):
+    rows = conn.execute("SELECT id, start_lat, start_lng FROM driver_posts WHERE status = 'open'").fetchall()
+    return _nearest(rows, lat, lng, radius_km)
+
+
+def _nearest(rows, lat, lng, radius_km, limit=50):
+    hits = []
+    for post_id, p_lat, p_lng in rows:
+        d = geo.haversine_km(lat, lng, p_lat, p_lng)
+        if d <= radius_km:
+            hits.append((d, post_id))
+    hits.sort()
+    return [post_id for _, post_id in hits[:limit]]
+
+
+def run(conn, fn, points, radius_km):
+    latencies = []
+    results = []
+    started = time.perf_counter()
+    for lat, lng in points:
+        t = time.perf_counter()
+        results.append(fn(conn, lat, lng, radius_km))
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - started), results
+
+
+def main(rows: int, queries: int, radius_km: float):
+    rng = random.Random(42)
+    conn = sqlite3.connect(":memory:")
+    seed(conn, rows, rng)
+    points = []
+    for _ in range(queries):
+        _, _, lat, lng = rng.choice(PLACES)
+        points.append((lat + rng.gauss(0, 0.05), lng + rng.gauss(0, 0.05)))
+
+    geohash_stats, geohash_results = run(conn, geohash_query, points, radius_km)
+    scan_stats, scan_results = run(conn, scan_query, points, radius_km)
+    print(json.dumps({
+        "rows": rows,
+        "radius_km": radius_km,
+        "same_results": geohash_results == scan_results,
+        "geohash_index": geohash_stats,
+        "full_scan": scan_stats,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=2.0)
+    args = parser.parse_args()
+    main(args.rows, args.queries, args.radius_km)
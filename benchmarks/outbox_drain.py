@@ -0,0 +1,87 @@
+# benchmarks/outbox_drain.py
+"""
+End-to-end delivery through the post outbox: creates --posts posts with
+POST /bulk and measures how long until a webhook receiver started here has
+seen a "created" event for every one of them (throughput and the delay of
+the last event), plus how many events arrived more than once.
+
+Start the service with the receiver as its sink, e.g.
+
+    POST_OUTBOX_WEBHOOK_URL=http://127.0.0.1:8765/ RATE_LIMIT_ENABLED=false uvicorn main:app
+    python -m benchmarks.outbox_drain --base-url http://localhost:8000 --posts 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from benchmarks.common import API_PREFIX, bench_client, make_post
+
+BATCH = 500
+
+
+class Receiver(BaseHTTPRequestHandler):
+    seen: Counter = Counter()  # outbox id -> deliveries
+    created: set = set()  # post ids
+    lock = threading.Lock()
+
+    def do_POST(self):
+        events = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            for event in events:
+                self.seen[event["id"]] += 1
+                if event["type"] == "created":
+                    self.created.add(event["post_id"])
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+async def main(base_url: str, posts: int, port: int, timeout: float):
+    server = ThreadingHTTPServer(("127.0.0.1", port), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    rng = random.Random(0)
+    bodies = [make_post(i, rng) for i in range(posts)]
+
+    post_ids: set = set()
+    started = time.perf_counter()
+    async with bench_client(base_url=base_url, timeout=120) as client:
+        for start in range(0, posts, BATCH):
+            r = await client.post(f"{API_PREFIX}/bulk", json=bodies[start:start + BATCH])
+            r.raise_for_status()
+            post_ids.update(item["post_id"] for item in r.json())
+    written = time.perf_counter() - started
+
+    while not post_ids <= Receiver.created:
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError(f"{len(post_ids - Receiver.created)} created event(s) not delivered")
+        await asyncio.sleep(0.01)
+    delivered = time.perf_counter() - started
+    server.shutdown()
+
+    print(json.dumps({
+        "posts": posts,
+        "write_s": round(written, 3),
+        "all_delivered_s": round(delivered, 3),
+        "delivery_delay_after_last_write_ms": round((delivered - written) * 1000, 1),
+        "throughput_events_per_s": round(posts / delivered, 1),
+        "redelivered": sum(n - 1 for n in Receiver.seen.values() if n > 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.posts, args.port, args.timeout))
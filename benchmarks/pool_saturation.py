@@ -0,0 +1,71 @@
+# benchmarks/pool_saturation.py
+"""
+Drive a DB-bound route at increasing concurrency, past DB_POOL_MAX_SIZE, and
+report latency next to the pool's own numbers from GET /pool/stats. Once
+concurrency exceeds the pool, throughput should flatten and the extra
+latency should show up as pool wait time, not as errors.
+
+Start the server with RATE_LIMIT_ENABLED=false: every request comes from one
+address, and a 429 aborts the run.
+
+    python -m benchmarks.pool_saturation --base-url http://localhost:8000 --levels 5 20 50 100 --requests 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import API_PREFIX, bench_client, summarize
+
+
+async def level(client: httpx.AsyncClient, concurrency: int, requests: int, path: str) -> dict:
+    before = (await client.get("/pool/stats")).json()
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def call():
+        nonlocal errors
+        async with sem:
+            started = time.perf_counter()
+            try:
+                r = await client.get(path)
+                errors += r.status_code >= 500
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    after = (await client.get("/pool/stats")).json()
+
+    checkouts = after["checkouts"] - before["checkouts"]
+    return {
+        "concurrency": concurrency,
+        "errors": errors,
+        **summarize(latencies, elapsed),
+        "pool_max_size": after["max_size"],
+        "pool_checkouts": checkouts,
+        "pool_max_wait_ms": after["max_wait_ms"],
+        "pool_avg_wait_ms_total": after["avg_wait_ms"],
+    }
+
+
+async def main(base_url: str, levels: list[int], requests: int, path: str):
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with bench_client(base_url=base_url, limits=limits, timeout=60) as client:
+        results = [await level(client, c, requests, path) for c in levels]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--levels", type=int, nargs="+", default=[5, 20, 50, 100])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--path", default=f"{API_PREFIX}/allpost?limit=50")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.levels, args.requests, args.path))
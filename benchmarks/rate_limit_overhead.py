@@ -0,0 +1,82 @@
+# benchmarks/rate_limit_overhead.py
+"""
+Latency added by the slowapi limiter, measured in process (httpx ASGI
+transport, no server or network) on a trivial route: undecorated, behind
+the default-limit middleware, and with a per-route limit. That the limits
+are enforced is checked by tests/test_rate_limiting.py.
+
+    python -m benchmarks.rate_limit_overhead --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
+
+from benchmarks.common import summarize
+from rate_limiting import rate_limit_key
+
+HIGH_LIMIT = "1000000/minute"  # never reached while timing
+
+
+def build_app(with_middleware: bool, limit: str = HIGH_LIMIT, storage_uri: str = "memory://") -> FastAPI:
+    limiter = Limiter(key_func=rate_limit_key, key_style="endpoint", default_limits=[limit], storage_uri=storage_uri, headers_enabled=True)
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    if with_middleware:
+        app.add_middleware(SlowAPIMiddleware)
+
+    @app.get("/plain")
+    async def plain():
+        return {"ok": True}
+
+    @app.get("/limited")
+    @limiter.limit(limit)
+    async def limited(request: Request, response: Response):
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> dict:
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(100):  # warm-up
+            await client.get(path)
+        started = time.perf_counter()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - t0)
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed)
+
+
+async def main(requests: int, storage_uri: str):
+    bare = build_app(with_middleware=False)
+    wrapped = build_app(with_middleware=True, storage_uri=storage_uri)
+    results = {
+        "storage_uri": storage_uri,
+        "no_limiter": await measure(bare, "/plain", requests),
+        "default_limit_middleware": await measure(wrapped, "/plain", requests),
+        "route_limit": await measure(bare, "/limited", requests),
+    }
+    base = results["no_limiter"]["mean_ms"]
+    for name in ("default_limit_middleware", "route_limit"):
+        results[name]["overhead_ms"] = round(results[name]["mean_ms"] - base, 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--storage-uri", default="memory://", help="e.g. redis://localhost:6379")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.storage_uri))
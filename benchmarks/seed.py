@@ -0,0 +1,103 @@
+# benchmarks/seed.py
+"""
+Fill driver_posts with synthetic rows straight through the database (the
+blocking driver from infrastructure.database.sync_url, schema from
+`alembic upgrade head`), much faster than going through the API.
+Seeded posts belong to drivers named bench-driver-*; seeding tops the
+table up to the requested number of such rows.
+
+    python -m benchmarks.seed --rows 100000
+    python -m benchmarks.seed --reset
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, func, insert, pool, select
+
+from benchmarks.common import make_post
+from domain import geo
+from domain.driverPost import DriverPost
+
+BENCH_DRIVER_PREFIX = "bench-driver-"
+BATCH_SIZE = 5000
+STATUS_WEIGHTS = {"open": 6, "matched": 2, "closed": 2}
+
+
+def post_row(i: int, rng: random.Random, now: datetime) -> dict:
+    body = make_post(i, rng, now)
+    post_status = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0]
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "driver_id": body["driver_id"],
+        "client_id": f"bench-client-{rng.randrange(5000)}" if post_status != "open" else "unknown",
+        "vehicle_info": body["vehicle_info"],
+        "status": post_status,
+        "start_point": body["starting_point"],
+        "destination": body["destination"],
+        "meet_point": body["meet_point"],
+        "departure_time": datetime.fromisoformat(body["departure_time"]),
+        "notes": body["notes"],
+        "description": body["description"],
+        "helmet": body["helmet"],
+        "contact": body["contact_info"],
+        "leave": False,
+        **geo.point_columns(body["starting_point"], "start"),
+        **geo.point_columns(body["destination"], "destination"),
+    }
+
+
+def bench_rows(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(DriverPost).where(DriverPost.driver_id.startswith(BENCH_DRIVER_PREFIX))
+        ).scalar_one()
+
+
+def seed(engine, rows: int, seed_value: int = 0) -> int:
+    """Insert bench rows until there are `rows` of them; returns how many were added."""
+    existing = bench_rows(engine)
+    missing = max(0, rows - existing)
+    rng = random.Random(seed_value + existing)  # different ids on every top-up
+    now = datetime.now()
+    started = time.perf_counter()
+    for start in range(0, missing, BATCH_SIZE):
+        batch = [post_row(existing + start + i, rng, now) for i in range(min(BATCH_SIZE, missing - start))]
+        with engine.begin() as conn:
+            conn.execute(insert(DriverPost), batch)
+        done = start + len(batch)
+        print(f"seeded {done}/{missing} rows ({done / (time.perf_counter() - started):.0f} rows/s)", flush=True)
+    return missing
+
+
+def reset(engine) -> int:
+    deleted = 0
+    while True:
+        # one short transaction per batch
+        with engine.begin() as conn:
+            ids = conn.execute(
+                select(DriverPost.id).where(DriverPost.driver_id.startswith(BENCH_DRIVER_PREFIX)).limit(BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            deleted += conn.execute(delete(DriverPost).where(DriverPost.id.in_(ids))).rowcount
+
+
+def make_engine(url: str | None = None):
+    from infrastructure.database import sync_url
+    return create_engine(url or sync_url(), poolclass=pool.NullPool)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="delete every bench row instead")
+    parser.add_argument("--db-url", help="blocking SQLAlchemy URL; default: DB_URL through its sync driver")
+    args = parser.parse_args()
+    engine = make_engine(args.db_url)
+    if args.reset:
+        print(f"deleted {reset(engine)} bench rows")
+    else:
+        print(f"added {seed(engine, args.rows)} rows, {bench_rows(engine)} bench rows in total")
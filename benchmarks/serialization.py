@@ -0,0 +1,98 @@
+# benchmarks/serialization.py
+"""
+Per-row cost of turning repository rows into the JSON body of a list route.
+
+  previous: model_validate(row).model_dump() per row, then FastAPI validates
+            the list against response_model, runs jsonable_encoder and json.dumps
+  current:  API.serialization.posts_response (one TypeAdapter validation,
+            JSON bytes written by pydantic-core)
+
+    python -m benchmarks.serialization --rows 1000 10000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from API.dto.driver_post import DriverPostReturnDTO
+from API.serialization import posts_response
+from benchmarks.common import make_post
+
+
+def make_rows(n: int) -> list[dict]:
+    rng = random.Random(0)
+    rows = []
+    for i in range(n):
+        body = make_post(i, rng)
+        rows.append({
+            "id": f"{i:036d}",
+            "driver_id": body["driver_id"],
+            "client_id": "unknown",
+            "vehicle_info": body["vehicle_info"],
+            "status": "open",
+            "time_stamp": datetime.now(),
+            "start_point": body["starting_point"],
+            "destination": body["destination"],
+            "meet_point": body["meet_point"],
+            "departure_time": datetime.fromisoformat(body["departure_time"]),
+            "notes": body["notes"],
+            "description": body["description"],
+            "helmet": body["helmet"],
+            "contact": body["contact_info"],
+            "leave": False,
+            "image_url": None,
+        })
+    return rows
+
+
+_response_adapter = TypeAdapter(List[DriverPostReturnDTO])
+
+
+def previous_path(rows: list[dict]) -> bytes:
+    dumped = [DriverPostReturnDTO.model_validate(p).model_dump() for p in rows]
+    # what FastAPI's serialize_response does with response_model=List[DriverPostReturnDTO]
+    validated = _response_adapter.validate_python(dumped)
+    content = jsonable_encoder(_response_adapter.dump_python(validated, by_alias=True))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def current_path(rows: list[dict]) -> bytes:
+    return posts_response(rows).body
+
+
+def measure(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes: list[int], repeat: int):
+    results = []
+    for n in sizes:
+        rows = make_rows(n)
+        assert json.loads(previous_path(rows)) == json.loads(current_path(rows))
+        previous = measure(previous_path, rows, repeat)
+        current = measure(current_path, rows, repeat)
+        results.append({
+            "rows": n,
+            "previous_us_per_row": round(previous / n * 1e6, 2),
+            "current_us_per_row": round(current / n * 1e6, 2),
+            "speedup": round(previous / current, 2),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,88 @@
+# benchmarks/startup_time.py
+"""
+Cold start of the service, each sample in a fresh interpreter:
+
+  import:   time to `import main` (module-level work: clients, pools, models)
+  ready:    time from spawning uvicorn until GET /ready answers 200
+            (startup hook done and the database pool warm)
+
+Uses the DB_URL (and other settings) from the environment / .env.
+
+    python -m benchmarks.startup_time --runs 5
+    python -m benchmarks.startup_time --runs 5 --skip-ready
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import percentile
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True, env=os.environ.copy(),
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/ready"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass  # not listening yet, or 503 while the pool warms up
+            time.sleep(0.02)
+        raise TimeoutError(f"/ready did not return 200 within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(samples: list[float]) -> dict:
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples) * 1000, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--skip-ready", action="store_true", help="only measure the import")
+    args = parser.parse_args()
+
+    results = {"import": summary([measure_import() for _ in range(args.runs)])}
+    if not args.skip_ready:
+        results["ready"] = summary([measure_ready(args.timeout) for _ in range(args.runs)])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
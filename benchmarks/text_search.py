@@ -0,0 +1,76 @@
+# benchmarks/text_search.py
+"""
+Free-text search over notes / description / vehicle_info on MySQL: the
+ngram FULLTEXT query behind /search?q= (MATCH ... AGAINST, ranked by
+relevance) versus `LIKE '%q%'` on the three columns, which scans every open
+row. The table is topped up with benchmarks.seed first; the schema must be
+at `alembic upgrade head` (ft_driver_posts_text).
+
+Seeded notes are "benchmark post <n>", so a rare term ("post 4217") and a
+term on every row ("順路") are timed separately.
+
+    python -m benchmarks.text_search --rows 100000 --queries 200
+"""
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import and_, or_, select
+
+from benchmarks import seed as seeder
+from benchmarks.common import summarize
+from domain.driverPost import DriverPost
+from repository.driverPost_repository import DriverPostRepository, TEXT_SEARCH_COLUMNS
+
+LIMIT = 50
+
+
+def like_query(q: str):
+    cond = or_(*(col.contains(q, autoescape=True) for col in TEXT_SEARCH_COLUMNS))
+    return (
+        select(DriverPost).where(and_(DriverPost.status == "open", cond))
+        .order_by(DriverPost.departure_time, DriverPost.id).limit(LIMIT)
+    )
+
+
+def fulltext_query(q: str):
+    return DriverPostRepository._search_query(q=q, limit=LIMIT)
+
+
+def run(engine, build, terms: list[str]) -> dict:
+    latencies = []
+    hits = 0
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        for q in terms:
+            t = time.perf_counter()
+            hits += len(conn.execute(build(q)).fetchall())
+            latencies.append(time.perf_counter() - t)
+    result = summarize(latencies, time.perf_counter() - started)
+    result["mean_hits"] = round(hits / len(terms), 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--db-url", help="blocking SQLAlchemy URL; default: DB_URL through its sync driver")
+    args = parser.parse_args()
+
+    engine = seeder.make_engine(args.db_url)
+    seeder.seed(engine, args.rows)
+    rng = random.Random(0)
+    workloads = {
+        "rare": [f"post {rng.randrange(args.rows)}" for _ in range(args.queries)],
+        "common": ["順路"] * args.queries,
+    }
+    results = {"rows": args.rows}
+    for name, terms in workloads.items():
+        results[name] = {"like": run(engine, like_query, terms), "fulltext": run(engine, fulltext_query, terms)}
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
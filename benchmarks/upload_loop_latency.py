@@ -0,0 +1,98 @@
+# benchmarks/upload_loop_latency.py
+"""
+Measure how image uploads affect everybody else on the worker: while
+--uploads concurrent PATCH /upload_image calls run, a probe keeps calling
+GET /count/open and records its latency. With uploads blocking the event
+loop the probe latency tracks the S3 transfer time; with the thread pool it
+stays near the idle baseline.
+
+Point the service at a local S3 stand-in (e.g. `moto_server` and
+AWS_ENDPOINT_URL=http://localhost:5000) to keep the numbers reproducible.
+
+Start the server with RATE_LIMIT_ENABLED=false: every request comes from one
+address, and a 429 aborts the run.
+
+    python -m benchmarks.upload_loop_latency --base-url http://localhost:8000 --uploads 20 --size 4000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import time
+import zlib
+
+import httpx
+
+from benchmarks.common import API_PREFIX, bench_client, make_post, summarize
+
+
+def random_png(size: int) -> bytes:
+    """A valid PNG of roughly `size` bytes (random pixels do not compress)."""
+    width = 512
+    height = max(1, size // (width * 3))
+    raw = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 0)) + chunk(b"IEND", b"")
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(f"{API_PREFIX}/count/open")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def main(base_url: str, uploads: int, size: int, duration: float):
+    rng = random.Random(0)
+    image = random_png(size)
+    async with bench_client(base_url=base_url, timeout=120) as client:
+        post_id = (await client.post(f"{API_PREFIX}/", json=make_post(0, rng))).json()
+
+        stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe(client, stop, 0.01))
+        await asyncio.sleep(duration)
+        stop.set()
+        idle = await idle_task
+
+        async def upload():
+            started = time.perf_counter()
+            files = {"file": ("bench.png", image, "image/png")}
+            r = await client.patch(f"{API_PREFIX}/upload_image", params={"post_id": post_id}, files=files)
+            r.raise_for_status()
+            return time.perf_counter() - started
+
+        stop = asyncio.Event()
+        busy_task = asyncio.create_task(probe(client, stop, 0.01))
+        started = time.perf_counter()
+        upload_latencies = await asyncio.gather(*(upload() for _ in range(uploads)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        busy = await busy_task
+
+        await client.delete(f"{API_PREFIX}/delete/post/{post_id}")
+
+    print(json.dumps({
+        "image_bytes": len(image),
+        "probe_idle": summarize(idle, duration),
+        "probe_during_uploads": summarize(busy, elapsed),
+        "uploads": summarize(list(upload_latencies), elapsed),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--size", type=int, default=4_000_000, help="approximate image size in bytes")
+    parser.add_argument("--duration", type=float, default=3.0, help="idle baseline duration in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.uploads, args.size, args.duration))
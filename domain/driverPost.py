@@ -1,12 +1,20 @@
 from sqlalchemy import (
     Column, String, Enum, DateTime, Boolean, Text, Integer, JSON, Index, func
-    , text
+    , text, Computed, Float, BigInteger
 )
-from sqlalchemy.dialects.mysql import JSON as MySQLJSON
+from sqlalchemy.dialects.mysql import JSON as MySQLJSON, DATETIME as MySQLDateTime
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+
+def _json_text(column: str, key: str, length: int = 512) -> Computed:
+    # Stored generated column so MySQL can index the JSON field (FULLTEXT requires STORED)
+    return Computed(
+        f"left(json_unquote(json_extract(`{column}`, '$.{key}')), {length})",
+        persisted=True,
+    )
+
 class DriverPost(Base):
     __tablename__ = 'driver_posts'
 
@@ -28,6 +36,20 @@ class DriverPost(Base):
     start_point = Column(MySQLJSON, nullable=False)
     destination = Column(MySQLJSON, nullable=False)
 
+    # Indexed copies of start_point/destination Name & Address used by search
+    start_name = Column(String(512), _json_text("start_point", "Name"), nullable=True)
+    start_address = Column(String(512), _json_text("start_point", "Address"), nullable=True)
+    destination_name = Column(String(512), _json_text("destination", "Name"), nullable=True)
+    destination_address = Column(String(512), _json_text("destination", "Address"), nullable=True)
+
+    # Coordinates of start_point/destination, filled by the repository (see domain/geo.py)
+    start_lat = Column(Float, nullable=True)
+    start_lng = Column(Float, nullable=True)
+    start_geohash = Column(String(12), nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lng = Column(Float, nullable=True)
+    destination_geohash = Column(String(12), nullable=True)
+
     meet_point = Column(MySQLJSON, nullable=False)
     departure_time = Column(DateTime(timezone=True), nullable=False)
     notes = Column(Text, nullable=True)
@@ -36,7 +58,107 @@ class DriverPost(Base):
     contact = Column(MySQLJSON, nullable=False)  # contact_info
     leave = Column(Boolean, nullable=False, server_default="0")
     image_url = Column(String(2083), nullable=True)
+    thumbnail_url = Column(String(2083), nullable=True)  # small variant for list views
+    display_url = Column(String(2083), nullable=True)  # recompressed full-screen variant
+
+    # bumped by MySQL on every row change (microseconds, so two writes in one second differ); ETag/Last-Modified
+    updated_at = Column(
+        MySQLDateTime(fsp=6),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"),
+        index=True,
+    )
+    # bumped by every UPDATE the repository issues; ETag of the post and If-Match on PATCH
+    version = Column(Integer, nullable=False, server_default=text("1"))
 
     __table_args__ = (
         Index("ix_driver_posts_driver_status", "driver_id", "status"),
+        # dashboard: the client arm of the UNION ALL (see get_dashboard)
+        Index("ix_driver_posts_client_status", "client_id", "status"),
+        # keyset pagination: /all & /search by (departure_time, id), /allpost by (time_stamp, id)
+        Index("ix_driver_posts_status_departure", "status", "departure_time", "id"),
+        Index("ix_driver_posts_time_stamp", "time_stamp", "id"),
+        # exact match (search_destination with partial=False)
+        Index("ix_driver_posts_start_name", "start_name"),
+        Index("ix_driver_posts_start_address", "start_address"),
+        Index("ix_driver_posts_destination_name", "destination_name"),
+        Index("ix_driver_posts_destination_address", "destination_address"),
+        # proximity search: geohash prefix range scans on open posts
+        Index("ix_driver_posts_status_start_geohash", "status", "start_geohash"),
+        Index("ix_driver_posts_status_destination_geohash", "status", "destination_geohash"),
+        # substring match (partial=True); ngram so Chinese place names tokenize
+        Index(
+            "ft_driver_posts_start", "start_name", "start_address",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ),
+        Index(
+            "ft_driver_posts_destination", "destination_name", "destination_address",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ),
+        # free-text search (q=), ranked by MATCH relevance
+        Index(
+            "ft_driver_posts_text", "notes", "description", "vehicle_info",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ),
     )
+
+
+class DriverPostArchive(Base):
+    """Posts moved out of driver_posts once long past departure (see repository/post_expiry.py)."""
+    __tablename__ = 'driver_posts_archive'
+
+    id = Column(String(36), primary_key=True, autoincrement=False)
+
+    driver_id = Column(String(255), nullable=False, index=True)
+    client_id = Column(String(255), nullable=False, server_default=text("'unknown'"))
+    vehicle_info = Column(String(255), nullable=True)
+    status = Column(Enum("open", "matched", "closed", name="driver_post_status"), nullable=False)
+    time_stamp = Column(DateTime(timezone=True), nullable=False)
+
+    start_point = Column(MySQLJSON, nullable=False)
+    destination = Column(MySQLJSON, nullable=False)
+    start_lat = Column(Float, nullable=True)
+    start_lng = Column(Float, nullable=True)
+    start_geohash = Column(String(12), nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lng = Column(Float, nullable=True)
+    destination_geohash = Column(String(12), nullable=True)
+
+    meet_point = Column(MySQLJSON, nullable=False)
+    departure_time = Column(DateTime(timezone=True), nullable=False, index=True)
+    notes = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)
+    helmet = Column(Boolean, nullable=False, server_default="0")
+    contact = Column(MySQLJSON, nullable=False)
+    leave = Column(Boolean, nullable=False, server_default="0")
+    image_url = Column(String(2083), nullable=True)
+    thumbnail_url = Column(String(2083), nullable=True)
+    display_url = Column(String(2083), nullable=True)
+
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    """Outcome of a request sent with an Idempotency-Key header, replayed on retries until expires_at."""
+    __tablename__ = 'idempotency_keys'
+
+    scope = Column(String(32), primary_key=True)  # create / request / upload_image
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(MySQLJSON, nullable=True)  # NULL while the first request is still running
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class PostOutbox(Base):
+    """Post events written in the same transaction as the change, drained by repository/outbox_publisher.py."""
+    __tablename__ = 'post_outbox'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)  # also the delivery order
+    event_type = Column(String(16), nullable=False)  # created / matched / unmatched / modified / deleted
+    post_id = Column(String(36), nullable=True)  # NULL = every post (delete_all_post)
+    driver_id = Column(String(255), nullable=True)
+    payload = Column(MySQLJSON, nullable=True)
+    created_at = Column(MySQLDateTime(fsp=6), nullable=False, server_default=text("CURRENT_TIMESTAMP(6)"))
+    # naive UTC; set while a publisher is delivering the row, others skip it until then
+    claimed_until = Column(MySQLDateTime(fsp=6), nullable=True)
@@ -0,0 +1,115 @@
+"""
+Geohash helpers for the start/destination proximity search.
+
+A geohash prefix is a lat/lng rectangle, so "near (lat, lng)" becomes a few
+`LIKE 'prefix%'` range scans on a B-tree index; exact distances are then
+computed in Python on the (small) candidate set.
+"""
+import math
+from typing import Any, Iterable, Optional
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m, stored on every post
+MAX_COVERING_CELLS = 16
+
+_LAT_KEYS = ("Lat", "lat", "Latitude", "latitude")
+_LNG_KEYS = ("Lng", "lng", "Lon", "lon", "Longitude", "longitude")
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves bits starting with longitude
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(lat degrees, lng degrees) covered by one cell of the given precision."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, min_lng, max_lat, max_lng) enclosing the circle."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+    return max(-90.0, lat - dlat), max(-180.0, lng - dlng), min(90.0, lat + dlat), min(180.0, lng + dlng)
+
+
+def covering_cells(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float,
+    max_cells: int = MAX_COVERING_CELLS,
+) -> list[str]:
+    """The finest set of at most `max_cells` geohash prefixes covering the box."""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        dlat, dlng = cell_size(precision)
+        lat_lo, lat_hi = int((min_lat + 90) // dlat), int((max_lat + 90) // dlat)
+        lng_lo, lng_hi = int((min_lng + 180) // dlng), int((max_lng + 180) // dlng)
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) <= max_cells:
+            break
+    return grid_cells(min_lat, min_lng, max_lat, max_lng, precision)
+
+
+def grid_cells(min_lat: float, min_lng: float, max_lat: float, max_lng: float, precision: int) -> list[str]:
+    """Every geohash cell of exactly `precision` characters overlapping the box."""
+    dlat, dlng = cell_size(precision)
+    lat_lo, lat_hi = int((min_lat + 90) // dlat), int((max_lat + 90) // dlat)
+    lng_lo, lng_hi = int((min_lng + 180) // dlng), int((max_lng + 180) // dlng)
+    cells = set()
+    for i in range(lat_lo, lat_hi + 1):
+        for j in range(lng_lo, lng_hi + 1):
+            # encode each cell's centre, clamped to the valid range
+            cell_lat = min(90.0, -90 + (i + 0.5) * dlat)
+            cell_lng = min(180.0, -180 + (j + 0.5) * dlng)
+            cells.add(encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def _first(point: dict, keys: Iterable[str]) -> Optional[float]:
+    for key in keys:
+        value = point.get(key)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def point_columns(point: Optional[dict[str, Any]], prefix: str) -> dict[str, Any]:
+    """`{prefix}_lat/_lng/_geohash` column values for a start_point/destination JSON blob."""
+    lat = _first(point or {}, _LAT_KEYS)
+    lng = _first(point or {}, _LNG_KEYS)
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return {f"{prefix}_lat": None, f"{prefix}_lng": None, f"{prefix}_geohash": None}
+    return {f"{prefix}_lat": lat, f"{prefix}_lng": lng, f"{prefix}_geohash": encode(lat, lng)}
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional, Protocol
+from dotenv import load_dotenv
+import time
+import os
+
+import orjson
+
+load_dotenv()
+
+POST_CACHE_URL = os.getenv("POST_CACHE_URL")  # redis://... ; empty = in-process cache
+POST_CACHE_SIZE = int(os.getenv("POST_CACHE_SIZE", "2048"))
+POST_CACHE_TTL = float(os.getenv("POST_CACHE_TTL", "30"))
+
+
+class CacheBackend(Protocol):
+    shared: bool  # True when every worker sees the same entries and counters
+
+    async def get(self, key: str) -> Optional[Any]: ...
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+    async def delete(self, *keys: str) -> None: ...
+    async def incr(self, key: str) -> int: ...
+    async def counter(self, key: str) -> int: ...
+    async def clear(self) -> None: ...
+    async def stats(self) -> dict: ...
+
+
+class MemoryCache:
+    """Bounded LRU cache with per-entry TTL, local to one worker process."""
+
+    shared = False
+
+    def __init__(self, maxsize: int = POST_CACHE_SIZE, ttl: float = POST_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (self._clock() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        # counters live outside the LRU: they never expire and are never evicted
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    async def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError
+
+
+class RedisCache:
+    """
+    Shared cache for several workers on any Redis-compatible client (redis.asyncio, fakeredis).
+
+    Entries are written with a TTL and counters without one, and eviction is
+    left to the server: run it with a maxmemory limit and
+    `maxmemory-policy volatile-lru`, so that only entries are evicted, least
+    recently used first. Under allkeys-lru a counter could be evicted and
+    restart from 0, bringing back list entries cached under that generation.
+    """
+
+    shared = True
+
+    def __init__(self, client, ttl: float = POST_CACHE_TTL, prefix: str = "post-serv:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        import redis.asyncio as redis  # optional dependency, only needed for this backend
+        return cls(redis.from_url(url), **kwargs)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        await self.client.set(
+            self.prefix + key,
+            orjson.dumps(value, default=json_default),
+            px=int(ttl * 1000),
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + k for k in keys))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    async def counter(self, key: str) -> int:
+        raw = await self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    async def clear(self) -> None:
+        keys = [k async for k in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def stats(self) -> dict:
+        info = await self.client.info("stats")
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": info.get("evicted_keys"),
+            "expirations": info.get("expired_keys"),
+        }
+
+
+def build_cache() -> CacheBackend:
+    if POST_CACHE_URL:
+        return RedisCache.from_url(POST_CACHE_URL)
+    return MemoryCache()
+
+
+post_cache: CacheBackend = build_cache()
@@ -1,18 +1,243 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, sessionmaker
 from databases import Database
 from dotenv import load_dotenv
+from dataclasses import dataclass
+from infrastructure.metrics import db_statement_duration, db_slow_statements
+import asyncio
+import logging
 import os
+import time
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 URL_DATABASE = os.getenv("DB_URL")
 
-engine = create_engine(URL_DATABASE)
+# Connection pool, all overridable from the environment
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "5"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, keep below MySQL wait_timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_PRE_PING_IDLE = float(os.getenv("DB_POOL_PRE_PING_IDLE", "30"))  # only ping connections idle this long
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "10000"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+
+def _pool_options(url: str) -> dict:
+    """Pool keyword arguments for the databases backend that serves this URL."""
+    dialect = make_url(url).get_backend_name()
+    if dialect == "mysql":
+        # passed through databases to aiomysql.create_pool / connect
+        return {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "connect_timeout": DB_CONNECT_TIMEOUT,
+            # MySQL only enforces max_execution_time on SELECT statements. A UTC session makes
+            # CURRENT_TIMESTAMP defaults naive UTC like the values the app writes (see as_utc)
+            "init_command": f"SET SESSION max_execution_time={DB_STATEMENT_TIMEOUT_MS}, time_zone='+00:00'",
+        }
+    if dialect == "postgresql":
+        return {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "max_inactive_connection_lifetime": DB_POOL_RECYCLE,
+            "timeout": DB_CONNECT_TIMEOUT,
+            "command_timeout": DB_STATEMENT_TIMEOUT_MS / 1000,
+        }
+    return {}
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    waiting: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    pings: int = 0
+    ping_failures: int = 0
+
+
+pool_stats = PoolStats()
+
+
+def _statement_kind(query) -> str:
+    if isinstance(query, str):
+        return query.lstrip().split(" ", 1)[0].upper() or "RAW"
+    return getattr(query, "__visit_name__", "other").upper()
+
+
+class InstrumentedDatabase(Database):
+    """databases.Database that times every statement and logs the slow ones with their SQL."""
+
+    def _compiled_sql(self, query) -> str:
+        # placeholders only: bound values are user data (contacts, notes) and stay out of the logs
+        if isinstance(query, str):
+            return query
+        try:
+            return str(query.compile(dialect=self._backend._dialect))
+        except Exception:
+            return str(query)
+
+    def _record(self, query, started: float):
+        self._observe(query, time.perf_counter() - started)
+
+    def _observe(self, query, elapsed: float):
+        kind = _statement_kind(query)
+        db_statement_duration.observe(elapsed, statement=kind)
+        if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            db_slow_statements.inc(statement=kind)
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {self._compiled_sql(query)}")
+
+    async def execute(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().execute(query, values)
+        finally:
+            self._record(query, started)
+
+    async def execute_many(self, query, values):
+        started = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)
+        finally:
+            self._record(query, started)
+
+    async def fetch_all(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().fetch_all(query, values)
+        finally:
+            self._record(query, started)
+
+    async def fetch_one(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await super().fetch_one(query, values)
+        finally:
+            self._record(query, started)
+
+    async def iterate(self, query, values=None):
+        # only the time spent waiting on the driver counts, not the caller's work between rows
+        rows = super().iterate(query, values)
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    record = await rows.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield record
+        finally:
+            await rows.aclose()
+            self._observe(query, elapsed)
 
-database = Database(URL_DATABASE)
+
+database = InstrumentedDatabase(URL_DATABASE, **_pool_options(URL_DATABASE))
+
+
+def _backend_pool():
+    # aiomysql / asyncpg pool created by databases on connect()
+    return getattr(database._backend, "_pool", None)
+
+
+def instrument_pool():
+    """
+    Wrap the driver pool's acquire() to count checkouts and time how long
+    callers wait for a free connection; optionally ping long-idle connections
+    before handing them out. Call after database.connect().
+    """
+    backend_pool = _backend_pool()
+    if backend_pool is None or getattr(backend_pool, "_instrumented", False):
+        return
+    acquire = backend_pool.acquire
+
+    async def timed_acquire(*args, **kwargs):
+        pool_stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await acquire(*args, **kwargs)
+        finally:
+            pool_stats.waiting -= 1
+        waited = time.perf_counter() - started
+        pool_stats.checkouts += 1
+        pool_stats.total_wait += waited
+        pool_stats.max_wait = max(pool_stats.max_wait, waited)
+
+        last_usage = getattr(conn, "last_usage", None)
+        if DB_POOL_PRE_PING and last_usage is not None and hasattr(conn, "ping"):
+            if asyncio.get_running_loop().time() - last_usage > DB_POOL_PRE_PING_IDLE:
+                pool_stats.pings += 1
+                try:
+                    await conn.ping(reconnect=True)
+                except Exception as e:
+                    pool_stats.ping_failures += 1
+                    logger.warning(f"Pre-ping failed on pooled connection: {e}")
+        return conn
+
+    backend_pool.acquire = timed_acquire
+    backend_pool._instrumented = True
+
+
+def get_pool_stats() -> dict:
+    backend_pool = _backend_pool()
+    stats = {
+        "connected": database.is_connected,
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "checkouts": pool_stats.checkouts,
+        "waiting": pool_stats.waiting,
+        "avg_wait_ms": round(pool_stats.total_wait / pool_stats.checkouts * 1000, 3) if pool_stats.checkouts else 0.0,
+        "max_wait_ms": round(pool_stats.max_wait * 1000, 3),
+        "pings": pool_stats.pings,
+        "ping_failures": pool_stats.ping_failures,
+    }
+    if backend_pool is not None:
+        # aiomysql: size/freesize, asyncpg: get_size()/get_idle_size()
+        size = backend_pool.get_size() if hasattr(backend_pool, "get_size") else getattr(backend_pool, "size", None)
+        idle = backend_pool.get_idle_size() if hasattr(backend_pool, "get_idle_size") else getattr(backend_pool, "freesize", None)
+        stats["size"] = size
+        stats["idle"] = idle
+        stats["in_use"] = size - idle if size is not None and idle is not None else None
+    return stats
+
+
+def pool_ready() -> bool:
+    """Connected and the pool holds at least DB_POOL_MIN_SIZE open connections."""
+    if not database.is_connected:
+        return False
+    backend_pool = _backend_pool()
+    if backend_pool is None:
+        # backends without a pool (e.g. SQLite) are ready once connected
+        return True
+    size = backend_pool.get_size() if hasattr(backend_pool, "get_size") else getattr(backend_pool, "size", None)
+    return size is None or size >= DB_POOL_MIN_SIZE
+
+
+def sync_url(url: str = URL_DATABASE) -> str:
+    """The same database through a blocking driver (schema management only, see alembic/env.py)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "mysql":
+        parsed = parsed.set(drivername="mysql+pymysql")
+    elif parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+# the original module's exports; nothing in the service uses them, it runs on `database`
+engine = create_engine(sync_url(URL_DATABASE))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+# UPDATE ... RETURNING; MySQL (and MariaDB) only return rows from INSERT/DELETE, if at all
+SUPPORTS_UPDATE_RETURNING = make_url(URL_DATABASE).get_backend_name() in ("postgresql", "sqlite")
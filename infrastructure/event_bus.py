@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Protocol
+from dotenv import load_dotenv
+import asyncio
+import logging
+import os
+
+import orjson
+
+from infrastructure.cache import json_default
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+POST_EVENTS_URL = os.getenv("POST_EVENTS_URL")  # redis://... ; empty = this worker only
+POST_EVENTS_CHANNEL = os.getenv("POST_EVENTS_CHANNEL", "post-serv:events")
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("POST_EVENTS_QUEUE_SIZE", "256"))
+
+EVENT_TYPES = ("created", "matched", "unmatched", "modified", "deleted")
+
+
+def make_event(event_type: str, post_id: Optional[str], post: Optional[dict] = None,
+               driver_id: Optional[str] = None) -> dict:
+    """post_id None means "every post" (e.g. delete_all_post)."""
+    post = post or {}
+    return {
+        "type": event_type,
+        "post_id": post_id,
+        "driver_id": driver_id or post.get("driver_id"),
+        "post": post or None,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class Subscription:
+    """
+    One listener's bounded queue. A slow consumer never blocks publishers:
+    when the queue is full the oldest event is dropped and counted.
+    """
+
+    def __init__(self, post_ids: Iterable[str] = (), driver_ids: Iterable[str] = (),
+                 maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.post_ids = set(post_ids)
+        self.driver_ids = set(driver_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        if not self.post_ids and not self.driver_ids:
+            return True
+        if event["post_id"] is None:
+            return True
+        return event["post_id"] in self.post_ids or event["driver_id"] in self.driver_ids
+
+    def offer(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class Broker(Protocol):
+    async def start(self, deliver) -> None: ...
+    async def publish(self, events: list[dict]) -> None: ...
+    async def stop(self) -> None: ...
+
+
+class LocalBroker:
+    """Delivers to subscribers of this process only."""
+
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def publish(self, events: list[dict]):
+        for event in events:
+            self._deliver(event)
+
+    async def stop(self):
+        pass
+
+
+class RedisBroker:
+    """Fans events out to every worker through Redis pub/sub (any Redis-compatible client)."""
+
+    def __init__(self, client, channel: str = POST_EVENTS_CHANNEL):
+        self.client = client
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBroker":
+        import redis.asyncio as redis  # optional dependency, only needed for this backend
+        return cls(redis.from_url(url), **kwargs)
+
+    async def start(self, deliver):
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+
+        async def listen():
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    for event in orjson.loads(message["data"]):
+                        deliver(event)
+                except Exception as e:
+                    logger.error(f"Dropped malformed post event message: {e}")
+
+        self._task = asyncio.create_task(listen())
+
+    async def publish(self, events: list[dict]):
+        await self.client.publish(self.channel, orjson.dumps(events, default=json_default))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+class PostEventBus:
+    def __init__(self, broker: Broker):
+        self.broker = broker
+        self.subscribers: set[Subscription] = set()
+        self.published = 0
+        self._started = False
+
+    async def start(self):
+        await self.broker.start(self._deliver)
+        self._started = True
+
+    async def stop(self):
+        await self.broker.stop()
+        self._started = False
+
+    def subscribe(self, post_ids: Iterable[str] = (), driver_ids: Iterable[str] = (),
+                  maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> Subscription:
+        subscription = Subscription(post_ids, driver_ids, maxsize)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    async def publish(self, events: list[dict]):
+        if not events or not self._started:
+            return
+        self.published += len(events)
+        try:
+            await self.broker.publish(events)
+        except Exception as e:
+            # a broker outage must not fail the write that produced the event
+            logger.error(f"Failed to publish {len(events)} post event(s): {e}")
+
+    def _deliver(self, event: dict):
+        for subscription in self.subscribers:
+            if subscription.matches(event):
+                subscription.offer(event)
+
+    def stats(self) -> dict:
+        return {
+            "broker": type(self.broker).__name__,
+            "published": self.published,
+            "subscribers": len(self.subscribers),
+            "dropped": sum(s.dropped for s in self.subscribers),
+        }
+
+
+def build_event_bus() -> PostEventBus:
+    if POST_EVENTS_URL:
+        return PostEventBus(RedisBroker.from_url(POST_EVENTS_URL))
+    return PostEventBus(LocalBroker())
+
+
+post_event_bus = build_event_bus()
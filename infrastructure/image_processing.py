@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+import asyncio
+import io
+import os
+
+from PIL import Image, ImageOps
+
+load_dotenv()
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "webp").lower()  # webp | jpeg
+
+# name -> (longest edge in px, quality)
+VARIANTS = {
+    "thumbnail": (320, 70),
+    "display": (1280, 82),
+}
+
+_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass
+class ImageVariant:
+    name: str
+    data: bytes
+    extension: str
+    content_type: str
+
+
+def _render(contents: bytes, fmt: str) -> list[ImageVariant]:
+    # runs in a worker process: decoding/resizing never holds the event loop's GIL
+    with Image.open(io.BytesIO(contents)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if fmt == "webp" and image.mode in ("RGBA", "LA", "P") else "RGB")
+        variants = []
+        for name, (edge, quality) in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            if fmt == "webp":
+                resized.save(out, "WEBP", quality=quality, method=4)
+            else:
+                resized.convert("RGB").save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+            variants.append(ImageVariant(name, out.getvalue(), fmt, _CONTENT_TYPES[fmt]))
+        return variants
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    # created on first use so importing the app does not spawn processes
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+async def render_variants(contents: bytes, fmt: str = IMAGE_VARIANT_FORMAT) -> list[ImageVariant]:
+    """Thumbnail and recompressed display version of an uploaded image."""
+    if fmt not in _CONTENT_TYPES:
+        fmt = "jpeg"
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _render, contents, fmt)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
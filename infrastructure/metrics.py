@@ -0,0 +1,182 @@
+"""
+Minimal Prometheus metrics: counters and histograms kept in process memory
+and rendered in the text exposition format by GET /metrics.
+"""
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Iterable, Optional
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def _escape(value) -> str:
+    # label values may hold any text (route templates, user input); the format reserves these three
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+def register_collector(collector: Callable[[], Iterable[str]]):
+    """Add a callback producing extra exposition lines (gauges read at scrape time)."""
+    _collectors.append(collector)
+
+
+def gauge_lines(name: str, documentation: str, value: Optional[float]) -> list[str]:
+    if value is None:
+        return []
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# --- metrics shared across the service ---
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_errors = Counter(
+    "http_request_errors_total", "HTTP responses with status >= 500 or unhandled exceptions.",
+    ("method", "route", "status"),
+)
+repository_duration = Histogram(
+    "repository_call_duration_seconds", "DriverPostRepository method latency.", ("method",),
+)
+repository_errors = Counter(
+    "repository_call_errors_total", "DriverPostRepository calls that raised.", ("method",),
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds", "Latency of single SQL statements by kind.", ("statement",),
+)
+db_slow_statements = Counter(
+    "db_slow_statements_total", "Statements slower than DB_SLOW_QUERY_MS.", ("statement",),
+)
+s3_upload_duration = Histogram(
+    "s3_upload_duration_seconds", "S3 upload latency.", (),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+s3_upload_bytes = Counter("s3_upload_bytes_total", "Bytes uploaded to S3.")
+s3_upload_errors = Counter("s3_upload_errors_total", "Failed S3 uploads.")
+outbox_published = Counter("post_outbox_published_total", "Outbox events delivered to the sink.")
+outbox_publish_errors = Counter("post_outbox_publish_errors_total", "Outbox batches the sink rejected.")
+outbox_batch_duration = Histogram(
+    "post_outbox_batch_duration_seconds", "Time to read, deliver and delete one outbox batch.", (),
+)
+
+
+def timed_query(func):
+    """Record the latency (and failures) of a repository coroutine under its name."""
+    name = func.__name__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            repository_errors.inc(method=name)
+            raise
+        finally:
+            repository_duration.observe(time.perf_counter() - started, method=name)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming responses untouched)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI puts the matched route in the scope; use its template to keep cardinality low
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            labels = {"method": scope["method"], "route": route_path, "status": str(status_code)}
+            http_request_duration.observe(time.perf_counter() - started, **labels)
+            if status_code >= 500:
+                http_errors.inc(**labels)
@@ -0,0 +1,76 @@
+from typing import Optional, Protocol
+from dotenv import load_dotenv
+import asyncio
+import os
+
+import orjson
+
+from infrastructure.cache import json_default
+
+load_dotenv()
+
+POST_OUTBOX_WEBHOOK_URL = os.getenv("POST_OUTBOX_WEBHOOK_URL")  # empty = no sink, the publisher does not run
+# every repository write also inserts its events into post_outbox, in the same transaction;
+# on by default only with a sink, otherwise the rows would pile up undelivered
+POST_OUTBOX_ENABLED = os.getenv(
+    "POST_OUTBOX_ENABLED", "true" if POST_OUTBOX_WEBHOOK_URL else "false"
+).lower() in ("1", "true", "yes")
+POST_OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("POST_OUTBOX_WEBHOOK_TIMEOUT", "5"))
+POST_OUTBOX_QUEUE_SIZE = int(os.getenv("POST_OUTBOX_QUEUE_SIZE", "10000"))
+
+
+class OutboxSink(Protocol):
+    """
+    Receives drained outbox events in id order. Raising means "not delivered":
+    the batch stays in the outbox and is sent again, so consumers must dedupe
+    on the event `id` (delivery is at-least-once).
+    """
+    async def send(self, events: list[dict]) -> None: ...
+    async def close(self) -> None: ...
+
+
+class QueueSink:
+    """
+    Keeps events in an in-process queue, for tests or a consumer living in this
+    process; never built by build_sink(), pass it to the publisher explicitly.
+    """
+
+    def __init__(self, maxsize: int = POST_OUTBOX_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def send(self, events: list[dict]):
+        # a full queue fails the whole batch, which then waits in the outbox instead of being dropped
+        if self.queue.maxsize and self.queue.maxsize - self.queue.qsize() < len(events):
+            raise asyncio.QueueFull(f"outbox queue has no room for {len(events)} events")
+        for event in events:
+            self.queue.put_nowait(event)
+
+    async def close(self):
+        pass
+
+
+class WebhookSink:
+    """POSTs each batch as a JSON array; any non-2xx answer fails the batch."""
+
+    def __init__(self, url: str, timeout: float = POST_OUTBOX_WEBHOOK_TIMEOUT):
+        import httpx  # only needed for this sink
+        self.url = url
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, events: list[dict]):
+        response = await self._client.post(
+            self.url,
+            content=orjson.dumps(events, default=json_default),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def build_sink(url: Optional[str] = POST_OUTBOX_WEBHOOK_URL) -> Optional[OutboxSink]:
+    """The configured sink, or None: without one there is nowhere to deliver and nothing may be deleted."""
+    if url:
+        return WebhookSink(url)
+    return None
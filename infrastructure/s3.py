@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from dotenv import load_dotenv
+import threading
+import os
+
+load_dotenv()
+
+# boto3 is blocking: uploads run on this bounded pool instead of the event loop
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "8"))
+s3_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+
+_client = None
+_transfer_config = None
+_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    The process-wide S3 client, built on first use. Importing boto3 and
+    building a client takes a noticeable part of a cold start, and most
+    requests never touch S3. Clients are thread-safe, so the upload pool shares it.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import boto3
+                _client = boto3.client(
+                    's3',
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    region_name=os.getenv("aws_region")
+                )
+    return _client
+
+
+def get_transfer_config():
+    # files above the threshold go up as a multipart upload, streamed chunk by chunk
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+        _transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=4,
+        )
+    return _transfer_config
+
+
+def is_initialized() -> bool:
+    return _client is not None
@@ -1,14 +1,41 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from infrastructure.database import engine, database  # engine: SQLAlchemy Engine, database: databases.Database
-from domain.driverPost import Base
+from infrastructure.database import database, instrument_pool, get_pool_stats, pool_ready
 from API.post_route import router as post_router
+from API.pagination import NEXT_CURSOR_HEADER
+from API.idempotency import IDEMPOTENT_REPLAYED_HEADER
+from repository.status_counter import status_counter
+from repository.post_expiry import post_expiry, POST_EXPIRY_ENABLED
+from repository.idempotency_repository import IdempotencyRepository
+from repository.match_index import match_index
+from repository.outbox_publisher import outbox_publisher
+from infrastructure.outbox import POST_OUTBOX_ENABLED
+from infrastructure import image_processing
+from infrastructure.event_bus import post_event_bus
+from infrastructure.metrics import MetricsMiddleware, register_collector, gauge_lines, render
+from app_logging import configure_logging, LogLevel
+from rate_limiting import limiter
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
 from starlette.responses import Response
+import asyncio
+import os
 
-app = FastAPI()
+configure_logging(os.getenv("LOG_LEVEL", LogLevel.ERROR))
+
+# routes that return plain objects are encoded with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.router.redirect_slashes = False
 
+# 429 with Retry-After / X-RateLimit-* headers, see rate_limiting.py
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# default limit for undecorated routes; added before CORS so rejected requests still get CORS headers
+app.add_middleware(SlowAPIMiddleware)
+
 ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "https://ntouber.zeabur.app",
@@ -20,23 +47,111 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER,
+        "ETag", "Last-Modified", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+    ],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 async def startup():
-    # 先確保 schema 存在（同步 create_all 用 sync engine 沒問題）
-    Base.metadata.create_all(bind=engine)
-    # 再連 databases（非同步）
+    # schema 由 Alembic 管理（alembic upgrade head），啟動時不再 create_all
     await database.connect()
+    instrument_pool()
     print("Database connected successfully.")
+    await post_event_bus.start()
+    app.state.background_tasks = [
+        asyncio.create_task(status_counter.run()),
+        asyncio.create_task(IdempotencyRepository.run_purge()),
+        asyncio.create_task(match_index.run()),
+    ]
+    if POST_EXPIRY_ENABLED:
+        app.state.background_tasks.append(asyncio.create_task(post_expiry.run()))
+    if outbox_publisher.enabled:
+        app.state.background_tasks.append(asyncio.create_task(outbox_publisher.run()))
+    elif POST_OUTBOX_ENABLED:
+        print("POST_OUTBOX_WEBHOOK_URL is not set: outbox events are kept, not published.")
 
 @app.on_event("shutdown")
 async def shutdown():
+    for task in app.state.background_tasks:
+        task.cancel()
+    image_processing.shutdown()
+    await post_event_bus.stop()
     await database.disconnect()
     print("Database disconnected successfully.")
 
 
+@app.get("/pool/stats")
+async def pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/ready")
+@limiter.exempt
+async def ready():
+    """Readiness probe: 200 once the database pool is connected and warm, 503 before."""
+    stats = get_pool_stats()
+    is_ready = pool_ready()
+    return ORJSONResponse({"ready": is_ready, "pool": stats}, status_code=200 if is_ready else 503)
+
+
+@app.get("/expiry/stats")
+async def expiry_stats():
+    return post_expiry.stats()
+
+
+@app.get("/outbox/stats")
+async def outbox_stats():
+    return outbox_publisher.stats()
+
+
+@app.get("/match/stats")
+async def match_stats():
+    return match_index.stats()
+
+
+def _pool_gauges():
+    stats = get_pool_stats()
+    yield from gauge_lines("db_pool_size", "Open connections in the pool.", stats.get("size"))
+    yield from gauge_lines("db_pool_in_use", "Connections checked out of the pool.", stats.get("in_use"))
+    yield from gauge_lines("db_pool_waiting", "Callers waiting for a pooled connection.", stats["waiting"])
+    yield from gauge_lines("db_pool_checkouts", "Connections handed out since startup.", stats["checkouts"])
+
+
+def _event_gauges():
+    stats = post_event_bus.stats()
+    yield from gauge_lines("post_event_subscribers", "Open post event streams.", stats["subscribers"])
+    yield from gauge_lines("post_events_dropped", "Events dropped for slow subscribers.", stats["dropped"])
+
+
+def _match_gauges():
+    stats = match_index.stats()
+    yield from gauge_lines("match_index_posts", "Open posts in the in-memory match index.", stats["posts"])
+    yield from gauge_lines("match_index_rebuild_ms", "Duration of the last match index rebuild.", stats["last_rebuild_ms"])
+
+
+def _outbox_gauges():
+    stats = outbox_publisher.stats()
+    yield from gauge_lines("post_outbox_lag_seconds", "Age of the oldest undelivered outbox event.", stats["lag_seconds"])
+    yield from gauge_lines("post_outbox_pending", "Undelivered outbox events (upper bound).", stats["pending"])
+
+
+register_collector(_pool_gauges)
+register_collector(_event_gauges)
+register_collector(_match_gauges)
+register_collector(_outbox_gauges)
+
+
+@app.get("/metrics")
+@limiter.exempt
+async def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
 @app.options("/{path:path}")
+@limiter.exempt
 async def options_handler(path: str):
     return Response(status_code=204)
 
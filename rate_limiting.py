@@ -1,4 +1,72 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+from dotenv import load_dotenv
+import os
 
-limiter =  Limiter(key_func=get_remote_address)
\ No newline at end of file
+load_dotenv()
+
+# memory:// keeps counters in this worker; use redis://host:6379 (or any limits storage URI)
+# so every worker shares them
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "fixed-window")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# only behind a proxy that overwrites X-Forwarded-For, otherwise clients can pick their own key
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+# Limits per endpoint cost class ("<count>/<period>", several separated by ";")
+DEFAULT_LIMIT = os.getenv("RATE_LIMIT_DEFAULT", "120/minute")  # everything not listed below
+# /all, /getpost and /count are polled by every open page and answered from the cache or with
+# a 304; many users behind one NAT address (a campus network) share this bucket
+POLL_LIMIT = os.getenv("RATE_LIMIT_POLL", "1200/minute")
+WRITE_LIMIT = os.getenv("RATE_LIMIT_WRITE", "30/minute")  # create, request, upload_image
+SEARCH_LIMIT = os.getenv("RATE_LIMIT_SEARCH", "60/minute")  # /search, /search/nearby
+SCAN_LIMIT = os.getenv("RATE_LIMIT_SCAN", "10/minute")  # /allpost reads the whole table
+BULK_LIMIT = os.getenv("RATE_LIMIT_BULK", "10/minute")
+ADMIN_LIMIT = os.getenv("RATE_LIMIT_ADMIN", "2/minute")  # /deleteall
+
+# a partial or q= (FULLTEXT) search uses this many units of the search limit
+PARTIAL_SEARCH_COST = int(os.getenv("RATE_LIMIT_PARTIAL_SEARCH_COST", "3"))
+
+
+def client_address(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return get_remote_address(request)
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Rate limit key: the client IP. Ids sent in the path or query string are
+    never used, a caller could pick a fresh one per request. Once an
+    authentication layer sets request.state.user_id, that user gets a bucket of
+    their own per IP.
+    """
+    address = client_address(request)
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return f"user:{user_id}:ip:{address}"
+    return f"ip:{address}"
+
+
+def search_cost(request: Request) -> int:
+    partial = request.query_params.get("partial", "").lower() in ("1", "true", "yes", "on")
+    return PARTIAL_SEARCH_COST if partial or request.query_params.get("q", "").strip() else 1
+
+
+limiter = Limiter(
+    key_func=rate_limit_key,
+    # one bucket per route, not per concrete URL: /dashboard/a and /dashboard/b share it
+    key_style="endpoint",
+    default_limits=[DEFAULT_LIMIT],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    headers_enabled=True,
+    enabled=RATE_LIMIT_ENABLED,
+    key_prefix="post-serv",
+    # a storage outage lets requests through instead of failing them
+    swallow_errors=True,
+    in_memory_fallback_enabled=True,
+)
@@ -1,34 +1,184 @@
-from sqlalchemy.sql import insert, delete, select, update
+from sqlalchemy.sql import Select, insert, delete, select, update
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_, update, true
-from datetime import datetime, timedelta
-from typing import Optional
+from sqlalchemy import func, or_, and_, update, true, case, literal, union_all
+from sqlalchemy.dialects.mysql import match
+from datetime import datetime, timedelta, timezone
+from typing import Optional, AsyncIterator, Callable, Iterable, Tuple, BinaryIO
 from fastapi import FastAPI, HTTPException, status
-from infrastructure.database import database
-from domain.driverPost import DriverPost
-import boto3
-from loguru import logger
+from infrastructure.database import database, SUPPORTS_UPDATE_RETURNING
+from infrastructure.cache import post_cache, POST_CACHE_TTL, json_default
+from infrastructure.event_bus import post_event_bus, make_event
+from infrastructure.outbox import POST_OUTBOX_ENABLED
+from infrastructure.s3 import s3_executor, get_s3_client, get_transfer_config
+from domain.driverPost import DriverPost, PostOutbox
+from domain import geo
+from repository.status_counter import status_counter
+from infrastructure.metrics import timed_query, s3_upload_duration, s3_upload_bytes, s3_upload_errors
 import filetype
 from uuid import uuid4
+import asyncio
+import io
+import logging
+import math
+import orjson
 import os
+import time
 
-s3 = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("aws_region")
-)
+logger = logging.getLogger(__name__)
 
-import logging
+# MySQL ngram_token_size (default 2)
+FULLTEXT_MIN_TOKEN = int(os.getenv("FULLTEXT_MIN_TOKEN", "2"))
+
+# columns of the ft_driver_posts_text FULLTEXT index, searched by q=
+TEXT_SEARCH_COLUMNS = (DriverPost.notes, DriverPost.description, DriverPost.vehicle_info)
+
+# departure time window used by search_destination and search_nearby: [time, time + 5 hours]
+SEARCH_WINDOW = timedelta(hours=5)
+# upper bound of candidate rows a proximity query reads before exact distance filtering
+NEARBY_MAX_CANDIDATES = int(os.getenv("NEARBY_MAX_CANDIDATES", "5000"))
+# rows per statement of a stream=true response
+STREAM_PAGE_SIZE = int(os.getenv("STREAM_PAGE_SIZE", "500"))
+
+# (sort value, id) of the last row of the previous page; the sort value is a
+# float relevance for full-text searches (q=)
+Cursor = Tuple[datetime | float, str]
+
+
+def _keyset(query, sort_col, after: Optional[Cursor] = None, limit: Optional[int] = None, descending: bool = False):
+    """Order by (sort_col, id) and continue after the given cursor."""
+    if descending:
+        query = query.order_by(sort_col.desc(), DriverPost.id.desc())
+    else:
+        query = query.order_by(sort_col, DriverPost.id)
+    if after is not None:
+        value, last_id = after
+        if descending:
+            query = query.where(or_(
+                sort_col < value,
+                and_(sort_col == value, DriverPost.id < last_id),
+            ))
+        else:
+            query = query.where(or_(
+                sort_col > value,
+                and_(sort_col == value, DriverPost.id > last_id),
+            ))
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+# rows locked and written per statement by deactivate_user
+CASCADE_CHUNK_SIZE = int(os.getenv("CASCADE_CHUNK_SIZE", "500"))
+
+# dashboard role -> column holding the user id
+DASHBOARD_ROLES = {"driver": DriverPost.driver_id, "client": DriverPost.client_id}
+
+
+# bumped on every write; list/count cache keys embed it so one write invalidates them all
+POSTS_GENERATION_KEY = "posts:generation"
+# epoch seconds of the last write, for Last-Modified / ETag on lists
+POSTS_LAST_WRITE_KEY = "posts:last_write"
+POSTS_LAST_WRITE_TTL = 7 * 24 * 3600
+
+
+def _post_key(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+async def _list_key(name: str, *params) -> str:
+    generation = await post_cache.counter(POSTS_GENERATION_KEY)
+    return ":".join(["posts", name, str(generation), *map(str, params)])
+
+
+async def _cached(key: str, loader):
+    value = await post_cache.get(key)
+    if value is None:
+        value = await loader()
+        await post_cache.set(key, value)
+    return value
+
+
+async def invalidate_posts(*post_ids: str):
+    """Drop the cached rows of the written posts and every cached list/count."""
+    if post_ids:
+        await post_cache.delete(*(_post_key(pid) for pid in post_ids))
+    await post_cache.incr(POSTS_GENERATION_KEY)
+    await post_cache.set(POSTS_LAST_WRITE_KEY, time.time(), ttl=POSTS_LAST_WRITE_TTL)
+
+
+def _with_coordinates(fields: dict) -> dict:
+    # keep the lat/lng/geohash columns in step with the start_point/destination JSON
+    fields = dict(fields)
+    if "start_point" in fields:
+        fields |= geo.point_columns(fields["start_point"], "start")
+    if "destination" in fields:
+        fields |= geo.point_columns(fields["destination"], "destination")
+    return fields
+
+
+def _near(prefix: str, lat: float, lng: float, radius_km: float) -> list:
+    """Index-friendly filters for rows whose {prefix} point may lie within radius_km."""
+    lat_col = getattr(DriverPost, f"{prefix}_lat")
+    lng_col = getattr(DriverPost, f"{prefix}_lng")
+    geohash_col = getattr(DriverPost, f"{prefix}_geohash")
+    min_lat, min_lng, max_lat, max_lng = geo.bounding_box(lat, lng, radius_km)
+    cells = geo.covering_cells(min_lat, min_lng, max_lat, max_lng)
+    return [
+        # the pattern is bound as a value (geohash cells hold no wildcards): a range scan on the index,
+        # and no literal '%' in the statement text for drivers that %-format it
+        or_(*(geohash_col.like(f"{cell}%") for cell in cells)),
+        lat_col.between(min_lat, max_lat),
+        lng_col.between(min_lng, max_lng),
+    ]
+
+
+async def _touched(cond, for_update: bool = False) -> dict[str, dict]:
+    # {id: {status, driver_id}} of the rows an UPDATE/DELETE is about to touch,
+    # for cache, count and event upkeep
+    query = select(DriverPost.id, DriverPost.status, DriverPost.driver_id).where(cond)
+    if for_update:
+        query = query.with_for_update()
+    rows = await database.fetch_all(query)
+    return {r["id"]: {"status": r["status"], "driver_id": r["driver_id"]} for r in rows}
+
+
+def _statuses(touched: dict[str, dict]) -> list[str]:
+    return [row["status"] for row in touched.values()]
+
+
+def _events(event_type: str, touched: dict[str, dict]) -> list[dict]:
+    return [make_event(event_type, post_id, driver_id=row["driver_id"]) for post_id, row in touched.items()]
+
+
+async def write_outbox(events: list[dict]):
+    """Queue the events for the other services; call it inside the transaction of the write."""
+    if not POST_OUTBOX_ENABLED or not events:
+        return
+    await database.execute(insert(PostOutbox).values([
+        {
+            "event_type": e["type"],
+            "post_id": e["post_id"],
+            "driver_id": e["driver_id"],
+            # JSON-safe copy (datetimes as ISO strings)
+            "payload": orjson.loads(orjson.dumps(e["post"], default=json_default)) if e["post"] else None,
+        }
+        for e in events
+    ]))
 
-logger = logging.getLogger(__name__)
 
 class DriverPostRepository:
     @staticmethod
+    @timed_query
     async def create_driver_post(driver_post: dict) -> str:
-        query = insert(DriverPost).values(**driver_post)
+        query = insert(DriverPost).values(**_with_coordinates(driver_post))
         try:
-            await database.execute(query)
+            events = [make_event("created", driver_post["id"], driver_post)]
+            async with database.transaction():
+                await database.execute(query)
+                await write_outbox(events)
+            await invalidate_posts()
+            status_counter.apply({driver_post.get("status", "open"): 1})
+            await post_event_bus.publish(events)
             return driver_post["id"]
         except Exception as e:
             raise HTTPException(
@@ -37,23 +187,76 @@ class DriverPostRepository:
             )
         
     @staticmethod
-    async def get_all_driver_posts():
+    def _all_posts_query(after: Optional[Cursor] = None, limit: Optional[int] = None):
         query = select(DriverPost).where(DriverPost.status == "open")
-        rows = await database.fetch_all(query)
-        return [dict(r) for r in rows]  # 轉成 list[dict]
+        return _keyset(query, DriverPost.departure_time, after, limit)
+
+    @staticmethod
+    def _admin_posts_query(after: Optional[Cursor] = None, limit: Optional[int] = None):
+        return _keyset(select(DriverPost), DriverPost.time_stamp, after, limit)
+
+    @staticmethod
+    async def _iterate(
+        page_query: Callable[[Optional[Cursor], int], Select],
+        sort_key: str,
+        after: Optional[Cursor] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Rows of a keyset-ordered query, STREAM_PAGE_SIZE per statement. The drivers
+        buffer a whole result set (aiomysql's default cursor too), so reading it in
+        pages is what keeps one page in memory; as with `cursor`, pages are not one
+        snapshot.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = STREAM_PAGE_SIZE if remaining is None else min(STREAM_PAGE_SIZE, remaining)
+            rows = await database.fetch_all(page_query(after, size))
+            for row in rows:
+                yield dict(row)
+            if len(rows) < size:
+                return
+            after = (rows[-1][sort_key], rows[-1]["id"])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    @staticmethod
+    @timed_query
+    async def get_all_driver_posts(after: Optional[Cursor] = None, limit: Optional[int] = None):
+        async def load():
+            query = DriverPostRepository._all_posts_query(after, limit)
+            rows = await database.fetch_all(query)
+            return [dict(r) for r in rows]  # 轉成 list[dict]
+
+        return await _cached(await _list_key("all", after, limit), load)
 
     @staticmethod
-    async def get_admin_driver_posts():
-        query = select(DriverPost)
+    def stream_all_driver_posts(after: Optional[Cursor] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        return DriverPostRepository._iterate(DriverPostRepository._all_posts_query, "departure_time", after, limit)
+
+    @staticmethod
+    @timed_query
+    async def get_admin_driver_posts(after: Optional[Cursor] = None, limit: Optional[int] = None):
+        query = DriverPostRepository._admin_posts_query(after, limit)
         rows = await database.fetch_all(query)
         return [dict(r) for r in rows]  # 轉成 list[dict]
+
+    @staticmethod
+    def stream_admin_driver_posts(after: Optional[Cursor] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        return DriverPostRepository._iterate(DriverPostRepository._admin_posts_query, "time_stamp", after, limit)
     
     @staticmethod
+    @timed_query
     async def get_post_by_id(post_id: str):
+        cached = await post_cache.get(_post_key(post_id))
+        if cached is not None:
+            return cached
         query = select(DriverPost).where(DriverPost.id == post_id)
         row = await database.fetch_one(query)
         if row:
-            return dict(row)
+            post = dict(row)
+            await post_cache.set(_post_key(post_id), post)
+            return post
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -61,6 +264,7 @@ class DriverPostRepository:
             )
         
     @staticmethod
+    @timed_query
     async def get_post_by_user_id(user_id: str):
         cond = or_(DriverPost.driver_id == user_id, DriverPost.client_id == user_id)
         query = select(DriverPost).where(cond)
@@ -75,84 +279,235 @@ class DriverPostRepository:
             )
         
     @staticmethod
-    async def search_destination(
+    @timed_query
+    async def get_dashboard(
+        user_id: str,
+        roles: Iterable[str] = tuple(DASHBOARD_ROLES),
+        post_status: Optional[str] = None,
+        after: Optional[dict[str, Cursor]] = None,
+        limit: Optional[int] = None,
+    ) -> dict:
+        """
+        A user's posts per role (newest departure first, keyset paginated per role)
+        and per-status counts for both roles. Each role is one arm of a UNION ALL
+        that MySQL serves from (driver_id, status) / (client_id, status), instead of
+        `driver_id = ? OR client_id = ?`, which tends to end in a full scan.
+        """
+        roles = list(roles)
+        after = after or {}
+        count_arms = [
+            select(literal(role).label("role"), DriverPost.status, func.count().label("n"))
+            .where(column == user_id)
+            .group_by(DriverPost.status)
+            for role, column in DASHBOARD_ROLES.items()
+        ]
+        post_arms = []
+        for role in roles:
+            query = select(DriverPost, literal(role).label("role")).where(DASHBOARD_ROLES[role] == user_id)
+            if post_status is not None:
+                query = query.where(DriverPost.status == post_status)
+            arm = _keyset(query, DriverPost.departure_time, after.get(role), limit, descending=True)
+            # a derived table per arm: SQLite rejects a parenthesized ORDER BY/LIMIT arm in a UNION,
+            # MySQL still serves the inner query from its index
+            post_arms.append(select(arm.subquery(f"{role}_arm")))
+        try:
+            count_rows = await database.fetch_all(union_all(*count_arms))
+            post_rows = await database.fetch_all(
+                union_all(*post_arms) if len(post_arms) > 1 else post_arms[0]
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get dashboard: {str(e)}"
+            )
+        counts = {role: dict.fromkeys(("open", "matched", "closed"), 0) for role in DASHBOARD_ROLES}
+        for row in count_rows:
+            counts[row["role"]][row["status"]] = row["n"]
+        posts = {role: [] for role in roles}
+        for row in post_rows:
+            posts[row["role"]].append(dict(row))
+        # UNION ALL does not keep each arm's ORDER BY
+        for rows in posts.values():
+            rows.sort(key=lambda r: (r["departure_time"], r["id"]), reverse=True)
+        return {"counts": counts, "posts": posts}
+
+    @staticmethod
+    def _search_query(
         start_point: Optional[str] = None,
         end_point: Optional[str] = None,
         time: Optional[datetime] = None,
         partial: bool = False,
+        after: Optional[Cursor] = None,
+        limit: Optional[int] = None,
+        q: Optional[str] = None,
     ):
-        # JSON extraction helpers
-        str_name = func.json_unquote(func.json_extract(DriverPost.start_point, '$.Name'))
-        str_address = func.json_unquote(func.json_extract(DriverPost.start_point, '$.Address'))
-        des_name = func.json_unquote(func.json_extract(DriverPost.destination, '$.Name'))
-        des_address = func.json_unquote(func.json_extract(DriverPost.destination, '$.Address'))
-
-        # helper to create match expressions for name/address
-        def _make_match(name_expr, address_expr, value: str):
+        # helper to create match expressions for name/address (indexed generated columns)
+        def _make_match(name_col, address_col, value: str):
             if value is None:
                 return None
             if partial:
-                lowered = value.lower()
-                return or_(
-                    func.lower(name_expr).like(f"%{lowered}%"),
-                    func.lower(address_expr).like(f"%{lowered}%"),
-                )
+                if len(value) < FULLTEXT_MIN_TOKEN:
+                    # shorter than the ngram token size, FULLTEXT can't find it
+                    return or_(name_col.contains(value, autoescape=True),
+                               address_col.contains(value, autoescape=True))
+                # ngram phrase search ~ substring match, served by the FULLTEXT index
+                phrase = '"' + value.replace('"', " ") + '"'
+                return match(name_col, address_col, against=phrase).in_boolean_mode()
             else:
-                return or_(name_expr == value, address_expr == value)
+                return or_(name_col == value, address_col == value)
 
-        if start_point is None and end_point is None and time is None:
+        if start_point is None and end_point is None and time is None and q is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="At least one search parameter (start_point, end_point, time) must be provided."
+                detail="At least one search parameter (start_point, end_point, time, q) must be provided."
             )
 
         filters = []
 
         # If all three params provided, combine them into a single AND filter
         if start_point and end_point and time:
-            start_match = _make_match(str_name, str_address, start_point)
-            end_match = _make_match(des_name, des_address, end_point)
+            start_match = _make_match(DriverPost.start_name, DriverPost.start_address, start_point)
+            end_match = _make_match(DriverPost.destination_name, DriverPost.destination_address, end_point)
             if start_match is not None:
                 filters.append(start_match)
             if end_match is not None:
                 filters.append(end_match)
             # time window: [time, time + 5 hours]
             filters.append(DriverPost.departure_time >= time)
-            filters.append(DriverPost.departure_time <= time + timedelta(hours=5))
+            filters.append(DriverPost.departure_time <= time + SEARCH_WINDOW)
         else:
             # handle individually to avoid duplicate/overlapping filters
             if start_point:
-                start_match = _make_match(str_name, str_address, start_point)
+                start_match = _make_match(DriverPost.start_name, DriverPost.start_address, start_point)
                 if start_match is not None:
                     filters.append(start_match)
 
             if end_point:
-                end_match = _make_match(des_name, des_address, end_point)
+                end_match = _make_match(DriverPost.destination_name, DriverPost.destination_address, end_point)
                 if end_match is not None:
                     filters.append(end_match)
 
             if time:
                 filters.append(DriverPost.departure_time >= time)
-                filters.append(DriverPost.departure_time <= time + timedelta(hours=5))
+                filters.append(DriverPost.departure_time <= time + SEARCH_WINDOW)
 
         filters.append(DriverPost.status == "open")
+
+        if q is not None and len(q) >= FULLTEXT_MIN_TOKEN:
+            # natural language mode: any ngram of q matches, rows sharing more of them rank higher
+            relevance = match(*TEXT_SEARCH_COLUMNS, against=q)
+            filters.append(relevance)
+            query = select(DriverPost, relevance.label("relevance")).where(and_(*filters))
+            return _keyset(query, relevance, after, limit, descending=True)
+        if q is not None:
+            # shorter than the ngram token size: substring scan, in departure order
+            filters.append(or_(*(col.contains(q, autoescape=True) for col in TEXT_SEARCH_COLUMNS)))
         cond = and_(*filters) if filters else true()
 
+        query = select(DriverPost).where(cond)
+        return _keyset(query, DriverPost.departure_time, after, limit)
+
+    @staticmethod
+    @timed_query
+    async def search_destination(
+        start_point: Optional[str] = None,
+        end_point: Optional[str] = None,
+        time: Optional[datetime] = None,
+        partial: bool = False,
+        after: Optional[Cursor] = None,
+        limit: Optional[int] = None,
+        q: Optional[str] = None,
+    ):
+        query = DriverPostRepository._search_query(start_point, end_point, time, partial, after, limit, q)
+        rows = await database.fetch_all(query)
+        return [dict(r) for r in rows]
+
+    @staticmethod
+    def stream_search_destination(
+        start_point: Optional[str] = None,
+        end_point: Optional[str] = None,
+        time: Optional[datetime] = None,
+        partial: bool = False,
+        after: Optional[Cursor] = None,
+        limit: Optional[int] = None,
+        q: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        ranked = q is not None and len(q) >= FULLTEXT_MIN_TOKEN
+        return DriverPostRepository._iterate(
+            lambda page_after, size: DriverPostRepository._search_query(
+                start_point, end_point, time, partial, page_after, size, q
+            ),
+            "relevance" if ranked else "departure_time",
+            after,
+            limit,
+        )
+
+    @staticmethod
+    @timed_query
+    async def search_nearby(
+        lat: float,
+        lng: float,
+        radius_km: float,
+        destination: Optional[Tuple[float, float, float]] = None,
+        time: Optional[datetime] = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """
+        Open posts starting within radius_km of (lat, lng), nearest first.
+        destination=(lat, lng, radius_km) additionally bounds where they go.
+        Each row gets a `distance_km` (from the start point).
+        """
+        filters = [DriverPost.status == "open", *_near("start", lat, lng, radius_km)]
+        if destination is not None:
+            filters += _near("destination", *destination)
+        if time:
+            filters.append(DriverPost.departure_time >= time)
+            filters.append(DriverPost.departure_time <= time + SEARCH_WINDOW)
+
+        # nearest first by a flat-earth approximation, so the cap drops the farthest candidates
+        # rather than an arbitrary subset of a crowded box
+        lng_scale = math.cos(math.radians(lat))
+        approx_distance = (
+            (DriverPost.start_lat - lat) * (DriverPost.start_lat - lat)
+            + (DriverPost.start_lng - lng) * lng_scale * (DriverPost.start_lng - lng) * lng_scale
+        )
         query = (
-            select(DriverPost)
-            .where(cond)
-            .order_by(DriverPost.id)
+            select(DriverPost).where(and_(*filters))
+            .order_by(approx_distance, DriverPost.id)
+            .limit(NEARBY_MAX_CANDIDATES)
         )
         rows = await database.fetch_all(query)
-        return [dict(r) for r in rows]
-    
 
+        # the geohash cells over-cover the circle; exact distance decides
+        results = []
+        for r in rows:
+            post = dict(r)
+            distance = geo.haversine_km(lat, lng, post["start_lat"], post["start_lng"])
+            if distance > radius_km:
+                continue
+            if destination is not None:
+                d_lat, d_lng, d_radius = destination
+                if geo.haversine_km(d_lat, d_lng, post["destination_lat"], post["destination_lng"]) > d_radius:
+                    continue
+            post["distance_km"] = round(distance, 3)
+            results.append(post)
+        results.sort(key=lambda p: p["distance_km"])
+        return results[:limit]
 
     @staticmethod
+    @timed_query
     async def delete_all_post():
         query = delete(DriverPost)
         try:
-            await database.execute(query)
+            events = [make_event("deleted", None)]
+            async with database.transaction():
+                await database.execute(query)
+                await write_outbox(events)
+            await post_cache.clear()
+            # clear() may drop the generation counter too; record the write after it
+            await invalidate_posts()
+            status_counter.reset()
+            await post_event_bus.publish(events)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -160,15 +515,24 @@ class DriverPostRepository:
             )
         
     @staticmethod
+    @timed_query
     async def delete_post_by_post_id(post_id: str):
-        query = delete(DriverPost).where(DriverPost.id == post_id)
+        cond = DriverPost.id == post_id
+        query = delete(DriverPost).where(cond)
         try:
-            result = await database.execute(query)
-            if result == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Driver post not found"
-                )
+            async with database.transaction():
+                before = await _touched(cond)
+                result = await database.execute(query)
+                if result == 0:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Driver post not found"
+                    )
+                events = _events("deleted", before)
+                await write_outbox(events)
+            await invalidate_posts(post_id)
+            status_counter.moved(_statuses(before), to=None)
+            await post_event_bus.publish(events)
         except HTTPException:
             raise
         except Exception as e:
@@ -178,15 +542,24 @@ class DriverPostRepository:
             )
 
     @staticmethod
+    @timed_query
     async def delete_post_by_driver_id(driver_id: str):
-        query = delete(DriverPost).where(DriverPost.driver_id == driver_id)
+        cond = DriverPost.driver_id == driver_id
+        query = delete(DriverPost).where(cond)
         try:
-            result = await database.execute(query)
-            if result == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Driver post not found"
-                )
+            async with database.transaction():
+                before = await _touched(cond)
+                result = await database.execute(query)
+                if result == 0:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Driver post not found"
+                    )
+                events = _events("deleted", before)
+                await write_outbox(events)
+            await invalidate_posts(*before)
+            status_counter.moved(_statuses(before), to=None)
+            await post_event_bus.publish(events)
         except HTTPException:
             raise
         except Exception as e:
@@ -196,6 +569,7 @@ class DriverPostRepository:
             )
 
     @staticmethod
+    @timed_query
     async def unmatch_posts_by_client_id(client_id: str):
         """
         尋找 client_id 吻合且 status 為 'matched' 的貼文，並將 status 改為 'open'。
@@ -210,11 +584,19 @@ class DriverPostRepository:
         query = (
             update(DriverPost)
             .where(cond)
-            .values(status="open", client_id=None) # 將 client_id 設為 None/Null
+            .values(status="open", client_id="unknown", version=DriverPost.version + 1) # client_id 為 NOT NULL，還原成預設值
         )
         
         try:
-            result = await database.execute(query) # result 是受影響的行數
+            async with database.transaction():
+                before = await _touched(cond)
+                result = await database.execute(query) # result 是受影響的行數
+                events = _events("unmatched", before)
+                await write_outbox(events)
+            if before:
+                await invalidate_posts(*before)
+                status_counter.moved(["matched"] * result, to="open")
+                await post_event_bus.publish(events)
             if result == 0:
                  # 雖然沒有貼文被修改，但不一定算 404，因為可能是沒有 matched 的貼文。
                  # 這裡可以返回受影響的行數，讓路由判斷。
@@ -227,17 +609,32 @@ class DriverPostRepository:
             )
         
     @staticmethod
-    async def s3_upload(contents: bytes, key: str, content_type: str, acl: str = "private", server_side_encryption: str = "AES256",) -> str:
+    async def s3_upload(contents: bytes | BinaryIO, key: str, content_type: str, acl: str = "private", server_side_encryption: str = "AES256",) -> str:
         logger.info(f"Uploading file to S3 with key: {key} and ACL: {acl}")
+        # a file object (e.g. UploadFile.file) is read in chunks, never fully loaded
+        fileobj = io.BytesIO(contents) if isinstance(contents, (bytes, bytearray)) else contents
+        start = fileobj.tell()
+        size = fileobj.seek(0, io.SEEK_END) - start
+        fileobj.seek(start)
+        started = time.perf_counter()
         try:
-            s3.put_object(
-                Bucket=os.getenv("s3_bucket_name"),
-                Key=key,
-                Body=contents,
-                ContentType=content_type,
-                ACL=acl,
-                ServerSideEncryption=server_side_encryption,
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                s3_executor,
+                lambda: get_s3_client().upload_fileobj(
+                    fileobj,
+                    os.getenv("s3_bucket_name"),
+                    key,
+                    ExtraArgs={
+                        "ContentType": content_type,
+                        "ACL": acl,
+                        "ServerSideEncryption": server_side_encryption,
+                    },
+                    Config=get_transfer_config(),
+                ),
             )
+            s3_upload_duration.observe(time.perf_counter() - started)
+            s3_upload_bytes.inc(size)
             logger.info(f"File successfully uploaded to S3 with key: {key}")
 
             bucket_name = os.getenv("s3_bucket_name")
@@ -247,6 +644,7 @@ class DriverPostRepository:
             return image_url
 
         except Exception as e:
+            s3_upload_errors.inc()
             logger.error(f"Failed to upload file to S3: {e}")
             raise HTTPException(
                 status_code=500,
@@ -254,40 +652,39 @@ class DriverPostRepository:
             )
 
     @staticmethod
+    @timed_query
     async def request_driver_post(post_id: str, client_id: str):
-        cond = and_(DriverPost.id == post_id)
-        prequery = (
-            select(DriverPost).where(cond)
-        )
-        result = await database.fetch_one(prequery)
-
-        if not result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Driver post not found"
-            )
-        if result['status'] != 'open':
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Driver post is not available for request"
-            )
-        
+        # single conditional UPDATE: the affected-row count decides who gets the post
+        cond = and_(DriverPost.id == post_id, DriverPost.status == "open")
         query = (
             update(DriverPost)
             .where(cond)
-            .values(status="matched", client_id=client_id)
+            .values(status="matched", client_id=client_id, version=DriverPost.version + 1)
         )
         try:
-            result = await database.execute(query) # Execute the update
-            if result == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Driver post not found"
-                )
-            # Fetch the updated post
-            select_query = select(DriverPost).where(cond) # Fetch the updated post
-            result = await database.fetch_one(select_query) 
-            return dict(result)
+            async with database.transaction():
+                result = await database.execute(query) # Execute the update
+                if result == 0:
+                    # not matched: tell a missing post apart from one that is already taken
+                    exists = await database.fetch_one(select(DriverPost.id).where(DriverPost.id == post_id))
+                    if not exists:
+                        raise HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Driver post not found"
+                        )
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Driver post is not available for request"
+                    )
+                # Fetch the updated post
+                select_query = select(DriverPost).where(DriverPost.id == post_id)
+                result = dict(await database.fetch_one(select_query))
+                events = [make_event("matched", post_id, result)]
+                await write_outbox(events)
+            await invalidate_posts(post_id)
+            status_counter.moved(["open"], to="matched")
+            await post_event_bus.publish(events)
+            return result
         except HTTPException:
             raise
         except Exception as e:
@@ -297,20 +694,30 @@ class DriverPostRepository:
             ) 
     
     @staticmethod
-    async def upload_image(post_id: str, image_url: str):
+    @timed_query
+    async def upload_image(post_id: str, image_url: str, thumbnail_url: Optional[str] = None, display_url: Optional[str] = None):
 
         query = (
             update(DriverPost)
             .where(DriverPost.id == post_id)
-            .values(image_url=image_url)
+            .values(
+                image_url=image_url, thumbnail_url=thumbnail_url, display_url=display_url,
+                version=DriverPost.version + 1,
+            )
         )
         try:
-            result = await database.execute(query)
-            if result == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Driver post not found"
-                )
+            async with database.transaction():
+                before = await _touched(DriverPost.id == post_id)
+                result = await database.execute(query)
+                if result == 0:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Driver post not found"
+                    )
+                events = _events("modified", before)
+                await write_outbox(events)
+            await invalidate_posts(post_id)
+            await post_event_bus.publish(events)
             return image_url
         except HTTPException:
             raise
@@ -321,24 +728,84 @@ class DriverPostRepository:
             )
         
     @staticmethod
-    async def modify_driver_post(post_id: str, updated_fields: dict):
-        query = (
-            update(DriverPost)
-            .where(DriverPost.id == post_id)
-            .values(**updated_fields)
-        )
+    @timed_query
+    async def modify_driver_post(post_id: str, updated_fields: dict, if_match: Optional[list[int]] = None):
+        """
+        Apply a partial update and return the new row. `if_match` lists the versions
+        the caller last saw (If-Match); a post at any other version raises 412.
+
+        The row comes back without a second query where possible: from RETURNING on
+        backends that have it, else from the cached row the update was checked
+        against (same version = no other write in between). Only a cache miss, or a
+        change to start_point/destination (MySQL computes their generated columns),
+        re-reads the row.
+        """
+        values = _with_coordinates(updated_fields) | {"version": DriverPost.version + 1}
+        cond = DriverPost.id == post_id
+        if if_match is not None:
+            cond = and_(cond, DriverPost.version.in_(if_match))
 
         try:
-            result = await database.execute(query)
-            if result == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Driver post not found"
-                )
-            # Fetch the updated post
-            select_query = select(DriverPost).where(DriverPost.id == post_id)
-            result = await database.fetch_one(select_query)
-            return dict(result)
+            cached = await post_cache.get(_post_key(post_id))
+            base = None
+            if (
+                not SUPPORTS_UPDATE_RETURNING
+                and cached is not None and "version" in cached
+                and (if_match is None or cached["version"] in if_match)
+                and not {"start_point", "destination"} & updated_fields.keys()
+            ):
+                base = cached
+                # pinned to the cached version, so every column not written here is still as cached
+                cond = and_(DriverPost.id == post_id, DriverPost.version == base["version"])
+                # set by us instead of ON UPDATE so the value is known without a read; naive UTC,
+                # the same clock as ON UPDATE since sessions run in UTC (see _pool_options)
+                values["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None)
+
+            query = update(DriverPost).where(cond).values(**values)
+            before = {}
+            result = None
+            stale = False
+            async with database.transaction():
+                if base is not None:
+                    before = {post_id: {"status": base["status"], "driver_id": base["driver_id"]}}
+                elif updated_fields.get("status") is not None:
+                    # the old status is only needed when this update changes it
+                    before = await _touched(DriverPost.id == post_id)
+                if SUPPORTS_UPDATE_RETURNING:
+                    row = await database.fetch_one(query.returning(*DriverPost.__table__.columns))
+                    result = dict(row) if row else None
+                elif await database.execute(query):
+                    if base is not None:
+                        result = base | values | {"version": base["version"] + 1}
+                    else:
+                        result = dict(await database.fetch_one(select(DriverPost).where(DriverPost.id == post_id)))
+                elif base is not None:
+                    stale = True
+
+                if result is None and not stale:
+                    current = await database.fetch_one(select(DriverPost.version).where(DriverPost.id == post_id))
+                    if current is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Driver post not found"
+                        )
+                    raise HTTPException(
+                        status_code=status.HTTP_412_PRECONDITION_FAILED,
+                        detail=f"Driver post was modified, current version is {current[0]}"
+                    )
+                events = [make_event("modified", post_id, result)] if result is not None else []
+                await write_outbox(events)
+
+            if stale:
+                # the cached row was out of date and nothing was written: retry against the database alone
+                await post_cache.delete(_post_key(post_id))
+                return await DriverPostRepository.modify_driver_post(post_id, updated_fields, if_match)
+
+            await invalidate_posts(post_id)
+            if before and updated_fields.get("status") is not None:
+                status_counter.moved(_statuses(before), to=updated_fields["status"])
+            await post_event_bus.publish(events)
+            return result
         except HTTPException:
             raise
         except Exception as e:
@@ -346,13 +813,237 @@ class DriverPostRepository:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to modify driver post: {str(e)}"
             )
-        
+
+    @staticmethod
+    @timed_query
+    async def bulk_create_driver_posts(driver_posts: list[dict]) -> list[str]:
+        # one multi-row INSERT
+        query = insert(DriverPost).values([_with_coordinates(post) for post in driver_posts])
+        try:
+            events = [make_event("created", post["id"], post) for post in driver_posts]
+            async with database.transaction():
+                await database.execute(query)
+                await write_outbox(events)
+            await invalidate_posts()
+            for post in driver_posts:
+                status_counter.apply({post.get("status", "open"): 1})
+            await post_event_bus.publish(events)
+            return [post["id"] for post in driver_posts]
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create driver posts: {str(e)}"
+            )
+
+    @staticmethod
+    @timed_query
+    async def bulk_modify_driver_posts(updates: list[tuple[str, dict]]) -> dict[str, bool]:
+        """Apply (post_id, updated_fields) pairs in one transaction; returns {post_id: found}."""
+        post_ids = [post_id for post_id, _ in updates]
+        try:
+            async with database.transaction():
+                before = await _touched(DriverPost.id.in_(post_ids), for_update=True)
+
+                # one UPDATE for the whole batch: each column is a CASE over the ids that change it
+                changes = {
+                    post_id: _with_coordinates(fields)
+                    for post_id, fields in updates if post_id in before and fields
+                }
+                if changes:
+                    columns = dict.fromkeys(c for fields in changes.values() for c in fields)
+                    values = {
+                        c: case(
+                            *(
+                                (DriverPost.id == post_id, literal(fields[c], DriverPost.__table__.c[c].type))
+                                for post_id, fields in changes.items() if c in fields
+                            ),
+                            else_=getattr(DriverPost, c),
+                        )
+                        for c in columns
+                    }
+                    await database.execute(
+                        update(DriverPost)
+                        .where(DriverPost.id.in_(list(changes)))
+                        .values(**values, version=DriverPost.version + 1)
+                    )
+                events = _events("modified", before)
+                await write_outbox(events)
+
+            if before:
+                await invalidate_posts(*before)
+            # per written row, so a repeated post_id cannot move its status twice
+            for post_id, fields in changes.items():
+                if fields.get("status") is not None:
+                    status_counter.moved([before[post_id]["status"]], to=fields["status"])
+            await post_event_bus.publish(events)
+            return {post_id: post_id in before for post_id in post_ids}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to modify driver posts: {str(e)}"
+            )
+
+    @staticmethod
+    @timed_query
+    async def bulk_delete_driver_posts(post_ids: list[str]) -> dict[str, bool]:
+        """Delete the given posts with one statement; returns {post_id: found}."""
+        cond = DriverPost.id.in_(post_ids)
+        try:
+            async with database.transaction():
+                before = await _touched(cond, for_update=True)
+                if before:
+                    await database.execute(delete(DriverPost).where(cond))
+                events = _events("deleted", before)
+                await write_outbox(events)
+            if before:
+                await invalidate_posts(*before)
+                status_counter.moved(_statuses(before), to=None)
+                await post_event_bus.publish(events)
+            return {post_id: post_id in before for post_id in post_ids}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete driver posts: {str(e)}"
+            )
+
     @staticmethod
+    async def _cascade_chunks(cond, chunk_size: int) -> AsyncIterator[list]:
+        # walk the matching rows by primary key, locking one chunk at a time
+        last_id = ""
+        while True:
+            rows = await database.fetch_all(
+                select(DriverPost.id, DriverPost.status, DriverPost.driver_id)
+                .where(cond, DriverPost.id > last_id)
+                .order_by(DriverPost.id)
+                .limit(chunk_size)
+                .with_for_update()
+            )
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    @timed_query
+    async def deactivate_user(user_id: str, driver_action: str = "close", chunk_size: int = CASCADE_CHUNK_SIZE) -> list[dict]:
+        """
+        Everything a deactivated user leaves behind, in one transaction:
+        posts they matched as client go back to open, posts they drive are
+        closed (driver_action="close") or deleted ("delete"). Rows are locked
+        and written by primary key in chunks of `chunk_size`, which keeps each
+        statement small; every lock taken is still held until the transaction
+        commits, so a user with many posts holds that many row locks for the
+        whole call. Returns one {post_id, role, previous_status, result}
+        per touched post; cache, counts and events are updated once at the end.
+        """
+        results: list[dict] = []
+        touched = {"unmatched": {}, "closed": {}, "deleted": {}}
+        delta: dict[str, int] = {}
+
+        def record(rows, role: str, result: str, to: Optional[str]):
+            for r in rows:
+                results.append({"post_id": r["id"], "role": role, "previous_status": r["status"], "result": result})
+                touched[result][r["id"]] = {"status": r["status"], "driver_id": r["driver_id"]}
+                delta[r["status"]] = delta.get(r["status"], 0) - 1
+                if to is not None:
+                    delta[to] = delta.get(to, 0) + 1
+
+        client_cond = and_(
+            DriverPost.client_id == user_id,
+            DriverPost.status == "matched",
+            # their own posts are handled as driver below
+            DriverPost.driver_id != user_id,
+        )
+        if driver_action == "delete":
+            driver_cond = DriverPost.driver_id == user_id
+        else:
+            driver_cond = and_(DriverPost.driver_id == user_id, DriverPost.status != "closed")
+        try:
+            async with database.transaction():
+                async for rows in DriverPostRepository._cascade_chunks(client_cond, chunk_size):
+                    ids = [r["id"] for r in rows]
+                    await database.execute(
+                        update(DriverPost).where(DriverPost.id.in_(ids))
+                        .values(status="open", client_id="unknown", version=DriverPost.version + 1)
+                    )
+                    record(rows, "client", "unmatched", to="open")
+                async for rows in DriverPostRepository._cascade_chunks(driver_cond, chunk_size):
+                    ids = [r["id"] for r in rows]
+                    if driver_action == "delete":
+                        await database.execute(delete(DriverPost).where(DriverPost.id.in_(ids)))
+                        record(rows, "driver", "deleted", to=None)
+                    else:
+                        await database.execute(
+                            update(DriverPost).where(DriverPost.id.in_(ids))
+                            .values(status="closed", version=DriverPost.version + 1)
+                        )
+                        record(rows, "driver", "closed", to="closed")
+                events = (
+                    _events("unmatched", touched["unmatched"])
+                    + [make_event("modified", pid, {"status": "closed"}, driver_id=row["driver_id"])
+                       for pid, row in touched["closed"].items()]
+                    + _events("deleted", touched["deleted"])
+                )
+                await write_outbox(events)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to deactivate user: {str(e)}"
+            )
+        if results:
+            await invalidate_posts(*(r["post_id"] for r in results))
+            status_counter.apply(delta)
+            await post_event_bus.publish(events)
+        return results
+
+    @staticmethod
+    def subscribe(post_ids: list[str] = (), driver_ids: list[str] = ()):
+        return post_event_bus.subscribe(post_ids, driver_ids)
+
+    @staticmethod
+    def unsubscribe(subscription):
+        post_event_bus.unsubscribe(subscription)
+
+    @staticmethod
+    def event_stats() -> dict:
+        return post_event_bus.stats()
+
+    @staticmethod
+    async def list_version() -> Tuple[int, float]:
+        """(change counter, epoch seconds of the last write) of the posts table, as seen through post_cache."""
+        generation = await post_cache.counter(POSTS_GENERATION_KEY)
+        last_write = await post_cache.get(POSTS_LAST_WRITE_KEY)
+        if last_write is None:
+            # unknown (first request, evicted or flushed): assume it changed just now
+            last_write = time.time()
+            await post_cache.set(POSTS_LAST_WRITE_KEY, last_write, ttl=POSTS_LAST_WRITE_TTL)
+        if not post_cache.shared:
+            # writes of other workers are invisible here; roll over as often as the cached lists expire
+            last_write = max(last_write, time.time() // POST_CACHE_TTL * POST_CACHE_TTL)
+        return generation, last_write
+
+    @staticmethod
+    async def cache_stats() -> dict:
+        return await post_cache.stats()
+
+    @staticmethod
+    @timed_query
+    async def post_quantities() -> dict:
+        try:
+            return await status_counter.counts()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get post quantities: {str(e)}"
+            )
+
+    @staticmethod
+    @timed_query
     async def open_post_quantity():
-        query = select(func.count(DriverPost.id)).where(DriverPost.status == "open")
         try:
-            result = await database.fetch_one(query)
-            return result[0] if result else 0
+            return await status_counter.get("open")
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -360,13 +1051,12 @@ class DriverPostRepository:
             )
     
     @staticmethod
+    @timed_query
     async def matched_post_quantity():
-        query = select(func.count(DriverPost.id)).where(DriverPost.status == "matched")
         try:
-            result = await database.fetch_one(query)
-            return result[0] if result else 0
+            return await status_counter.get("matched")
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get matched post quantity: {str(e)}"
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,162 @@
+from sqlalchemy import and_, delete, insert, select, update, null
+from datetime import datetime, timedelta
+from typing import Any, Tuple
+from fastapi import HTTPException, status
+from infrastructure.database import database
+from infrastructure.cache import MemoryCache, json_default
+from domain.driverPost import IdempotencyKey
+import asyncio
+import hashlib
+import logging
+import os
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+# a key whose first request has not finished after this long is assumed abandoned (worker died)
+IDEMPOTENCY_LOCK_TIMEOUT = timedelta(seconds=int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60")))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "4096"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))
+IDEMPOTENCY_PURGE_BATCH = int(os.getenv("IDEMPOTENCY_PURGE_BATCH", "1000"))
+MAX_KEY_LENGTH = 255
+
+# completed outcomes in front of the table; only finished requests are cached
+_completed = MemoryCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL.total_seconds())
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of the request, to reject a key reused for a different request."""
+    return hashlib.sha256(
+        orjson.dumps(payload, default=json_default, option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+
+
+def _cache_key(scope: str, key: str) -> str:
+    return f"{scope}:{key}"
+
+
+def _check(record_hash: str, request_hash: str):
+    if record_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+
+class IdempotencyRepository:
+    @staticmethod
+    async def begin(scope: str, key: str, request_hash: str) -> Tuple[bool, Any]:
+        """
+        Claim `key` for this request. Returns (False, None) when the caller owns
+        the key and must run the operation, then call complete() or release();
+        (True, response) when the request already ran and its response is replayed.
+        """
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+            )
+        cached = await _completed.get(_cache_key(scope, key))
+        if cached is not None:
+            _check(cached["request_hash"], request_hash)
+            return True, cached["response"]
+
+        now = datetime.now()
+        try:
+            await database.execute(insert(IdempotencyKey).values(
+                scope=scope, key=key, request_hash=request_hash,
+                created_at=now, expires_at=now + IDEMPOTENCY_TTL,
+            ))
+            return False, None
+        except Exception as e:
+            # duplicate primary key: someone used this key before (or is using it right now)
+            cond = and_(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            record = await database.fetch_one(select(IdempotencyKey).where(cond))
+            if record is None:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to store idempotency key: {str(e)}"
+                )
+
+        if record["expires_at"] <= now:
+            # expired but not purged yet: start over under the same key
+            result = await database.execute(
+                update(IdempotencyKey)
+                .where(cond, IdempotencyKey.expires_at == record["expires_at"])
+                .values(request_hash=request_hash, response=null(), created_at=now, expires_at=now + IDEMPOTENCY_TTL)
+            )
+            if result:
+                return False, None
+        _check(record["request_hash"], request_hash)
+        if record["response"] is not None:
+            await _completed.set(_cache_key(scope, key), {"request_hash": request_hash, "response": record["response"]})
+            return True, record["response"]
+        if record["created_at"] <= now - IDEMPOTENCY_LOCK_TIMEOUT:
+            # take over an abandoned claim; the conditional UPDATE lets only one retry win
+            result = await database.execute(
+                update(IdempotencyKey)
+                .where(cond, IdempotencyKey.created_at == record["created_at"], IdempotencyKey.response.is_(None))
+                .values(created_at=now)
+            )
+            if result:
+                return False, None
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+
+    @staticmethod
+    async def complete(scope: str, key: str, request_hash: str, response: Any) -> Any:
+        """Store the response of a claimed key; returns it in its JSON form."""
+        response = orjson.loads(orjson.dumps(response, default=json_default))
+        query = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(response=response)
+        )
+        try:
+            await database.execute(query)
+        except Exception as e:
+            # the operation itself succeeded; a retry will only see the key as in progress
+            logger.error(f"Failed to store response for idempotency key {scope}:{key}: {e}")
+            return response
+        await _completed.set(_cache_key(scope, key), {"request_hash": request_hash, "response": response})
+        return response
+
+    @staticmethod
+    async def release(scope: str, key: str):
+        """Give up a claim after the operation failed, so the client can retry."""
+        query = delete(IdempotencyKey).where(
+            IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.response.is_(None)
+        )
+        try:
+            await database.execute(query)
+        except Exception as e:
+            logger.error(f"Failed to release idempotency key {scope}:{key}: {e}")
+
+    @staticmethod
+    async def purge_expired(batch_size: int = IDEMPOTENCY_PURGE_BATCH) -> int:
+        total = 0
+        while True:
+            query = (
+                delete(IdempotencyKey)
+                .where(IdempotencyKey.expires_at < datetime.now())
+                .with_dialect_options(mysql_limit=batch_size)
+            )
+            deleted = await database.execute(query)
+            total += deleted or 0
+            if not deleted or deleted < batch_size:
+                return total
+
+    @staticmethod
+    async def run_purge(interval: float = IDEMPOTENCY_PURGE_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                deleted = await IdempotencyRepository.purge_expired()
+                if deleted:
+                    logger.info(f"Purged {deleted} expired idempotency key(s)")
+            except Exception as e:
+                logger.error(f"Failed to purge idempotency keys: {e}")
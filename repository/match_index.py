@@ -0,0 +1,285 @@
+from sqlalchemy import and_, select
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+from infrastructure.database import database
+from infrastructure.event_bus import post_event_bus
+from domain.driverPost import DriverPost
+from domain import geo
+import asyncio
+import itertools
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+MATCH_SLOT_MINUTES = int(os.getenv("MATCH_SLOT_MINUTES", "30"))  # width of one departure-time bucket
+MATCH_CELL_PRECISION = int(os.getenv("MATCH_CELL_PRECISION", "5"))  # geohash cells of start / destination, ~4.9km
+MATCH_INDEX_HORIZON = timedelta(days=int(os.getenv("MATCH_INDEX_HORIZON_DAYS", "14")))  # posts departing later are not indexed
+MATCH_INDEX_REBUILD_INTERVAL = float(os.getenv("MATCH_INDEX_REBUILD_INTERVAL", "300"))
+MATCH_INDEX_QUEUE_SIZE = int(os.getenv("MATCH_INDEX_QUEUE_SIZE", "10000"))
+MATCH_REFRESH_BATCH = 500  # post ids per refresh query
+MAX_TOLERANCE = timedelta(hours=12)  # the furthest back a rider's tolerance can reach
+
+# score = sum of weight * (component / its limit); 0 is a perfect match
+MATCH_WEIGHTS = {
+    "origin": float(os.getenv("MATCH_WEIGHT_ORIGIN", "1")),
+    "destination": float(os.getenv("MATCH_WEIGHT_DESTINATION", "1")),
+    "time": float(os.getenv("MATCH_WEIGHT_TIME", "1")),
+}
+
+
+@dataclass(slots=True)
+class _Entry:
+    post: dict
+    bucket: tuple[int, str, str]
+    departure: float
+    start_lat: float
+    start_lng: float
+    destination_lat: float
+    destination_lng: float
+
+
+def _utc(value: datetime) -> datetime:
+    # naive datetimes from MySQL are taken as UTC, as API.conditional.as_utc does
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _slot(timestamp: float) -> int:
+    return int(timestamp // (MATCH_SLOT_MINUTES * 60))
+
+
+def _entry(post: dict) -> Optional[_Entry]:
+    """None for posts that cannot be matched (not open, or missing coordinates)."""
+    if post.get("status") != "open" or post.get("departure_time") is None:
+        return None
+    coords = (post.get("start_lat"), post.get("start_lng"), post.get("destination_lat"), post.get("destination_lng"))
+    if any(c is None for c in coords):
+        return None
+    departure = _utc(post["departure_time"]).timestamp()
+    bucket = (
+        _slot(departure),
+        geo.encode(coords[0], coords[1], MATCH_CELL_PRECISION),
+        geo.encode(coords[2], coords[3], MATCH_CELL_PRECISION),
+    )
+    return _Entry(post, bucket, departure, *coords)
+
+
+class MatchIndex:
+    """
+    Open posts held in memory, bucketed by (departure slot, start geohash cell,
+    destination geohash cell), so a rider's recommendation is a few dozen dict
+    lookups plus exact scoring of the candidates, without a query. Wide queries,
+    whose cells x slots outnumber the non-empty buckets, scan those buckets
+    instead, so no request costs more than one pass over them.
+
+    The index follows the post event bus: every event re-reads the touched posts
+    by id (events only carry partial rows), batched per drain of the queue. Each
+    worker only hears its own writes unless POST_EVENTS_URL is set, and events can
+    be dropped, so the whole index is rebuilt every MATCH_INDEX_REBUILD_INTERVAL
+    seconds, and at once after a drop.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._buckets: Dict[tuple[int, str, str], Dict[str, _Entry]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+        self.refreshed = 0
+        self.last_rebuild_ms = 0.0
+        self.last_rebuild_at: Optional[datetime] = None
+
+    def _add(self, entry: _Entry):
+        self._remove(entry.post["id"])
+        self._entries[entry.post["id"]] = entry
+        self._buckets.setdefault(entry.bucket, {})[entry.post["id"]] = entry
+
+    def _remove(self, post_id: str):
+        entry = self._entries.pop(post_id, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is not None:
+            bucket.pop(post_id, None)
+            if not bucket:
+                del self._buckets[entry.bucket]
+
+    @staticmethod
+    def _window() -> tuple[datetime, datetime]:
+        now = datetime.now(timezone.utc)
+        return now - MAX_TOLERANCE, now + MATCH_INDEX_HORIZON
+
+    async def rebuild(self):
+        async with self._lock:
+            started = time.perf_counter()
+            lower, upper = self._window()
+            query = select(DriverPost).where(and_(
+                DriverPost.status == "open",
+                # the column holds naive UTC
+                DriverPost.departure_time >= lower.replace(tzinfo=None),
+                DriverPost.departure_time <= upper.replace(tzinfo=None),
+            ))
+            entries: Dict[str, _Entry] = {}
+            buckets: Dict[tuple[int, str, str], Dict[str, _Entry]] = {}
+            async for row in database.iterate(query):
+                entry = _entry(dict(row))
+                if entry is not None:
+                    entries[entry.post["id"]] = entry
+                    buckets.setdefault(entry.bucket, {})[entry.post["id"]] = entry
+            # swapped in one step: readers never see a half-built index
+            self._entries, self._buckets = entries, buckets
+            self._loaded = True
+            self.rebuilds += 1
+            self.last_rebuild_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.last_rebuild_at = datetime.now()
+
+    async def refresh(self, post_ids: Iterable[str]):
+        """Re-read the posts and (re)index the ones that are still matchable."""
+        post_ids = list(dict.fromkeys(post_ids))
+        async with self._lock:
+            lower, upper = self._window()
+            for start in range(0, len(post_ids), MATCH_REFRESH_BATCH):
+                chunk = post_ids[start:start + MATCH_REFRESH_BATCH]
+                rows = await database.fetch_all(select(DriverPost).where(DriverPost.id.in_(chunk)))
+                found = {}
+                for row in rows:
+                    post = dict(row)
+                    found[post["id"]] = post
+                for post_id in chunk:
+                    post = found.get(post_id)
+                    entry = _entry(post) if post is not None else None
+                    if entry is None or not lower.timestamp() <= entry.departure <= upper.timestamp():
+                        self._remove(post_id)
+                    else:
+                        self._add(entry)
+            self.refreshed += len(post_ids)
+
+    async def apply(self, events: list[dict]):
+        if any(event["post_id"] is None for event in events):
+            await self.rebuild()  # delete_all_post
+            return
+        deleted = {e["post_id"] for e in events if e["type"] == "deleted"}
+        for post_id in deleted:
+            self._remove(post_id)
+        await self.refresh(e["post_id"] for e in events if e["post_id"] not in deleted)
+
+    def _probe_buckets(self, slots: range, origin_cells: list[str], destination_cells: list[str]) -> list[dict]:
+        return [
+            self._buckets[key]
+            for key in itertools.product(slots, origin_cells, destination_cells)
+            if key in self._buckets
+        ]
+
+    def _scan_buckets(self, slots: range, origin_cells: list[str], destination_cells: list[str]) -> list[dict]:
+        origin_cells, destination_cells = set(origin_cells), set(destination_cells)
+        return [
+            bucket for (slot, o, d), bucket in self._buckets.items()
+            if slot in slots and o in origin_cells and d in destination_cells
+        ]
+
+    async def recommend(
+        self,
+        origin: tuple[float, float],
+        destination: tuple[float, float],
+        departure: datetime,
+        tolerance: timedelta,
+        origin_radius_km: float,
+        destination_radius_km: float,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Open posts starting within origin_radius_km of `origin`, ending within
+        destination_radius_km of `destination` and departing within `tolerance`
+        of `departure` (naive means UTC), best score first. Each row gets origin_km, destination_km,
+        time_delta_minutes and score.
+        """
+        if not self._loaded:
+            await self.rebuild()
+        target = _utc(departure).timestamp()
+        tolerance_s = max(tolerance.total_seconds(), 1.0)
+        origin_cells = geo.grid_cells(*geo.bounding_box(*origin, origin_radius_km), MATCH_CELL_PRECISION)
+        destination_cells = geo.grid_cells(
+            *geo.bounding_box(*destination, destination_radius_km), MATCH_CELL_PRECISION
+        )
+        slots = range(_slot(target - tolerance_s), _slot(target + tolerance_s) + 1)
+        if len(slots) * len(origin_cells) * len(destination_cells) <= len(self._buckets):
+            buckets = self._probe_buckets(slots, origin_cells, destination_cells)
+        else:
+            # wide radii and tolerance (20 km, 12 h: ~320k keys): fewer buckets exist than keys to probe
+            buckets = self._scan_buckets(slots, origin_cells, destination_cells)
+
+        scored = []
+        for bucket in buckets:
+            for entry in bucket.values():
+                delta = abs(entry.departure - target)
+                if delta > tolerance_s:
+                    continue
+                origin_km = geo.haversine_km(*origin, entry.start_lat, entry.start_lng)
+                if origin_km > origin_radius_km:
+                    continue
+                destination_km = geo.haversine_km(*destination, entry.destination_lat, entry.destination_lng)
+                if destination_km > destination_radius_km:
+                    continue
+                score = (
+                    MATCH_WEIGHTS["origin"] * origin_km / origin_radius_km
+                    + MATCH_WEIGHTS["destination"] * destination_km / destination_radius_km
+                    + MATCH_WEIGHTS["time"] * delta / tolerance_s
+                )
+                scored.append((score, origin_km, destination_km, entry.departure - target, entry.post))
+
+        scored.sort(key=lambda s: s[0])
+        results = []
+        for score, origin_km, destination_km, delta, post in scored[:limit]:
+            results.append(post | {
+                "origin_km": round(origin_km, 3),
+                "destination_km": round(destination_km, 3),
+                "time_delta_minutes": round(delta / 60, 1),
+                "score": round(score, 4),
+            })
+        return results
+
+    async def run(self, interval: float = MATCH_INDEX_REBUILD_INTERVAL):
+        subscription = post_event_bus.subscribe(maxsize=MATCH_INDEX_QUEUE_SIZE)
+        dropped = 0
+        next_rebuild = 0.0  # build at once on startup
+        try:
+            while True:
+                try:
+                    if subscription.dropped != dropped or time.monotonic() >= next_rebuild:
+                        dropped = subscription.dropped
+                        await self.rebuild()
+                        next_rebuild = time.monotonic() + interval
+                    try:
+                        event = await asyncio.wait_for(subscription.get(), next_rebuild - time.monotonic())
+                    except asyncio.TimeoutError:
+                        continue
+                    events = [event]
+                    while not subscription.queue.empty():
+                        events.append(subscription.queue.get_nowait())
+                    await self.apply(events)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # whatever the failed update missed is picked up by the next rebuild
+                    logger.error(f"Failed to update the match index: {e}")
+                    next_rebuild = time.monotonic() + interval
+        finally:
+            post_event_bus.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "posts": len(self._entries),
+            "buckets": len(self._buckets),
+            "rebuilds": self.rebuilds,
+            "refreshed": self.refreshed,
+            "last_rebuild_ms": self.last_rebuild_ms,
+            "last_rebuild_at": self.last_rebuild_at,
+        }
+
+
+match_index = MatchIndex()
@@ -0,0 +1,168 @@
+from sqlalchemy import delete, func, literal_column, or_, select, update
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from infrastructure.database import database
+from infrastructure.outbox import OutboxSink, build_sink, POST_OUTBOX_ENABLED
+from infrastructure.metrics import outbox_published, outbox_publish_errors, outbox_batch_duration
+from domain.driverPost import PostOutbox
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+POST_OUTBOX_BATCH_SIZE = int(os.getenv("POST_OUTBOX_BATCH_SIZE", "500"))
+POST_OUTBOX_INTERVAL = float(os.getenv("POST_OUTBOX_INTERVAL", "1"))  # seconds between polls of an empty outbox
+# how long a claimed batch is left to its publisher; keep it well above POST_OUTBOX_WEBHOOK_TIMEOUT
+POST_OUTBOX_CLAIM_SECONDS = float(os.getenv("POST_OUTBOX_CLAIM_SECONDS", "60"))
+
+
+@dataclass
+class OutboxStats:
+    published: int = 0
+    batches: int = 0
+    failures: int = 0
+    pending: Optional[int] = None  # upper bound, see measure_lag
+    lag_seconds: Optional[float] = None  # age of the oldest undelivered event
+    last_batch_size: int = 0
+    last_batch_ms: float = 0.0
+    last_published_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+def _event(row) -> dict:
+    # the shape of infrastructure.event_bus.make_event, plus the outbox id consumers dedupe on
+    return {
+        "id": row["id"],
+        "type": row["event_type"],
+        "post_id": row["post_id"],
+        "driver_id": row["driver_id"],
+        "post": row["payload"],
+        "at": row["created_at"],
+    }
+
+
+class OutboxPublisher:
+    """
+    Drains post_outbox to the sink in id order, `batch_size` events at a time.
+
+    A batch is claimed in a short transaction (FOR UPDATE SKIP LOCKED, then
+    claimed_until set and committed), sent with no transaction or row lock open,
+    and deleted afterwards in a statement of its own. An event is removed only
+    after the sink accepted it: a sink error releases the claim at once, a crash
+    leaves it to expire after `claim_for`, and either way the batch is sent again
+    (at-least-once, consumers dedupe on `id`). Several workers can run the
+    publisher; each claims different rows, so ordering then holds per batch
+    rather than globally.
+
+    Without a sink (no POST_OUTBOX_WEBHOOK_URL) nothing is claimed or deleted:
+    the rows wait in the outbox for one to be configured.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[OutboxSink] = None,
+        batch_size: int = POST_OUTBOX_BATCH_SIZE,
+        claim_for: timedelta = timedelta(seconds=POST_OUTBOX_CLAIM_SECONDS),
+    ):
+        self.sink = sink if sink is not None else build_sink()
+        self.batch_size = batch_size
+        self.claim_for = claim_for
+        self._stats = OutboxStats()
+
+    @property
+    def enabled(self) -> bool:
+        return POST_OUTBOX_ENABLED and self.sink is not None
+
+    async def _claim(self) -> list:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with database.transaction():
+            # walks the primary key; rows claimed by other workers are few (one batch each) and just skipped
+            rows = await database.fetch_all(
+                select(PostOutbox)
+                .where(or_(PostOutbox.claimed_until.is_(None), PostOutbox.claimed_until < now))
+                .order_by(PostOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            if rows:
+                await database.execute(
+                    update(PostOutbox)
+                    .where(PostOutbox.id.in_([r["id"] for r in rows]))
+                    .values(claimed_until=now + self.claim_for)
+                )
+        return rows
+
+    async def publish_batch(self) -> int:
+        if self.sink is None:
+            return 0
+        started = time.perf_counter()
+        rows = await self._claim()
+        if not rows:
+            return 0
+        ids = [r["id"] for r in rows]
+        try:
+            await self.sink.send([_event(r) for r in rows])
+        except Exception:
+            outbox_publish_errors.inc()
+            try:
+                await database.execute(update(PostOutbox).where(PostOutbox.id.in_(ids)).values(claimed_until=None))
+            except Exception as e:
+                # the claim then simply expires
+                logger.error(f"Failed to release claimed outbox rows: {e}")
+            raise
+        await database.execute(delete(PostOutbox).where(PostOutbox.id.in_(ids)))
+
+        elapsed = time.perf_counter() - started
+        outbox_published.inc(len(rows))
+        outbox_batch_duration.observe(elapsed)
+        self._stats.published += len(rows)
+        self._stats.batches += 1
+        self._stats.last_batch_size = len(rows)
+        self._stats.last_batch_ms = round(elapsed * 1000, 3)
+        self._stats.last_published_at = datetime.now()
+        return len(rows)
+
+    async def measure_lag(self):
+        # primary key lookups only, so a large backlog costs nothing extra; both timestamps from the database clock
+        oldest = select(PostOutbox.created_at).order_by(PostOutbox.id).limit(1).scalar_subquery()
+        row = await database.fetch_one(select(
+            func.min(PostOutbox.id),
+            func.max(PostOutbox.id),
+            func.timestampdiff(literal_column("MICROSECOND"), oldest, func.now(6)),
+        ))
+        first_id, last_id, lag_us = row[0], row[1], row[2]
+        # id gaps (rolled back writes) make this an upper bound
+        self._stats.pending = last_id - first_id + 1 if first_id is not None else 0
+        self._stats.lag_seconds = lag_us / 1_000_000 if lag_us is not None else 0.0
+
+    async def run(self, interval: float = POST_OUTBOX_INTERVAL):
+        try:
+            while True:
+                try:
+                    published = await self.publish_batch()
+                    await self.measure_lag()
+                    self._stats.last_error = None
+                    if published == self.batch_size:
+                        continue  # more waiting: drain without sleeping
+                except Exception as e:
+                    self._stats.failures += 1
+                    self._stats.last_error = str(e)
+                    logger.error(f"Failed to publish post outbox: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            if self.sink is not None:
+                await self.sink.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sink": type(self.sink).__name__ if self.sink is not None else None,
+            "batch_size": self.batch_size,
+            **asdict(self._stats),
+        }
+
+
+outbox_publisher = OutboxPublisher()
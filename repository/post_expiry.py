@@ -0,0 +1,176 @@
+from sqlalchemy import and_, delete, insert, select, update
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from infrastructure.database import database
+from infrastructure.event_bus import post_event_bus, make_event
+from domain.driverPost import DriverPost, DriverPostArchive
+from repository.status_counter import status_counter
+from repository.driverPost_repository import invalidate_posts, write_outbox
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+POST_EXPIRY_ENABLED = os.getenv("POST_EXPIRY_ENABLED", "true").lower() in ("1", "true", "yes")
+POST_EXPIRY_INTERVAL = float(os.getenv("POST_EXPIRY_INTERVAL", "300"))  # seconds between runs
+POST_EXPIRY_BATCH_SIZE = int(os.getenv("POST_EXPIRY_BATCH_SIZE", "500"))  # rows per statement / transaction
+# open posts are closed this long after their departure time
+POST_EXPIRY_GRACE = timedelta(minutes=int(os.getenv("POST_EXPIRY_GRACE_MINUTES", "30")))
+# closed/matched posts are moved to driver_posts_archive this long after their departure time
+POST_ARCHIVE_AFTER = timedelta(days=int(os.getenv("POST_ARCHIVE_AFTER_DAYS", "7")))
+
+# every stored column of driver_posts that the archive keeps (generated columns are left out)
+ARCHIVED_COLUMNS = [c.name for c in DriverPostArchive.__table__.columns if c.name != "archived_at"]
+
+
+def utc_now() -> datetime:
+    # naive UTC, the way departure_time is stored
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class ExpiryStats:
+    runs: int = 0
+    failures: int = 0
+    closed: int = 0
+    archived: int = 0
+    last_closed: int = 0
+    last_archived: int = 0
+    last_run_at: Optional[datetime] = None
+    last_duration_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+class PostExpiry:
+    """
+    Closes open posts whose departure time has passed and moves old
+    closed/matched posts into driver_posts_archive.
+
+    Work is done in batches of `batch_size` rows so each statement (and lock)
+    stays short. Rows are picked with FOR UPDATE SKIP LOCKED, so several
+    workers running the scheduler do not step on each other. `clock` returns
+    "now" as naive UTC, like departure_time, and can be replaced, e.g. by a
+    fixed time.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], datetime] = utc_now,
+        batch_size: int = POST_EXPIRY_BATCH_SIZE,
+        grace: timedelta = POST_EXPIRY_GRACE,
+        archive_after: timedelta = POST_ARCHIVE_AFTER,
+    ):
+        self.clock = clock
+        self.batch_size = batch_size
+        self.grace = grace
+        self.archive_after = archive_after
+        self._stats = ExpiryStats()
+        self._lock = asyncio.Lock()
+
+    async def close_expired(self) -> int:
+        cutoff = self.clock() - self.grace
+        total = 0
+        while True:
+            async with database.transaction():
+                rows = await database.fetch_all(
+                    select(DriverPost.id, DriverPost.driver_id)
+                    .where(DriverPost.status == "open", DriverPost.departure_time < cutoff)
+                    .order_by(DriverPost.departure_time, DriverPost.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                if not rows:
+                    break
+                ids = [r["id"] for r in rows]
+                await database.execute(
+                    update(DriverPost)
+                    .where(and_(DriverPost.id.in_(ids), DriverPost.status == "open"))
+                    .values(status="closed", version=DriverPost.version + 1)
+                )
+                events = [make_event("modified", r["id"], {"status": "closed"}, driver_id=r["driver_id"]) for r in rows]
+                await write_outbox(events)
+            await invalidate_posts(*ids)
+            status_counter.moved(["open"] * len(ids), to="closed")
+            await post_event_bus.publish(events)
+            total += len(ids)
+            if len(rows) < self.batch_size:
+                break
+        return total
+
+    async def archive_old(self) -> int:
+        cutoff = self.clock() - self.archive_after
+        source = [getattr(DriverPost, name) for name in ARCHIVED_COLUMNS]
+        total = 0
+        while True:
+            async with database.transaction():
+                rows = await database.fetch_all(
+                    select(DriverPost.id, DriverPost.status, DriverPost.driver_id)
+                    .where(DriverPost.status.in_(("closed", "matched")), DriverPost.departure_time < cutoff)
+                    .order_by(DriverPost.departure_time, DriverPost.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                if not rows:
+                    break
+                ids = [r["id"] for r in rows]
+                # copy and delete in the same transaction: a row is either live or archived
+                await database.execute(
+                    insert(DriverPostArchive).from_select(
+                        ARCHIVED_COLUMNS, select(*source).where(DriverPost.id.in_(ids))
+                    )
+                )
+                await database.execute(delete(DriverPost).where(DriverPost.id.in_(ids)))
+                events = [make_event("deleted", r["id"], driver_id=r["driver_id"]) for r in rows]
+                await write_outbox(events)
+            await invalidate_posts(*ids)
+            status_counter.moved([r["status"] for r in rows], to=None)
+            await post_event_bus.publish(events)
+            total += len(ids)
+            if len(rows) < self.batch_size:
+                break
+        return total
+
+    async def run_once(self) -> dict:
+        async with self._lock:
+            started = time.perf_counter()
+            self._stats.runs += 1
+            self._stats.last_run_at = self.clock()
+            try:
+                closed = await self.close_expired()
+                archived = await self.archive_old()
+            except Exception as e:
+                self._stats.failures += 1
+                self._stats.last_error = str(e)
+                raise
+            finally:
+                self._stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            self._stats.closed += closed
+            self._stats.archived += archived
+            self._stats.last_closed = closed
+            self._stats.last_archived = archived
+            self._stats.last_error = None
+            if closed or archived:
+                logger.info(f"Post expiry closed {closed} and archived {archived} post(s)")
+            return {"closed": closed, "archived": archived}
+
+    async def run(self, interval: float = POST_EXPIRY_INTERVAL):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Post expiry run failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": POST_EXPIRY_ENABLED,
+            "interval": POST_EXPIRY_INTERVAL,
+            "batch_size": self.batch_size,
+            **asdict(self._stats),
+        }
+
+
+post_expiry = PostExpiry()
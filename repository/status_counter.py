@@ -0,0 +1,75 @@
+from sqlalchemy import func, select
+from typing import Dict, Iterable, Optional
+from infrastructure.database import database
+from domain.driverPost import DriverPost
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("open", "matched", "closed")
+RECONCILE_INTERVAL = float(os.getenv("STATUS_COUNT_RECONCILE_INTERVAL", "60"))
+
+
+class StatusCounter:
+    """
+    Per-status post totals kept in memory and updated by the repository writes.
+
+    Each worker only sees its own writes, and a reconcile racing a write can miss
+    that write's delta, so the counts are re-read from MySQL every
+    STATUS_COUNT_RECONCILE_INTERVAL seconds to bound the drift.
+    """
+
+    def __init__(self):
+        self._counts: Optional[Dict[str, int]] = None
+        self._lock = asyncio.Lock()
+
+    async def counts(self) -> Dict[str, int]:
+        if self._counts is None:
+            await self.reconcile()
+        return dict(self._counts)
+
+    async def get(self, post_status: str) -> int:
+        return (await self.counts())[post_status]
+
+    def apply(self, delta: Dict[str, int]):
+        # not loaded yet: the next counts() call reads the real numbers anyway
+        if self._counts is None:
+            return
+        for post_status, n in delta.items():
+            self._counts[post_status] = max(0, self._counts.get(post_status, 0) + n)
+
+    def moved(self, statuses: Iterable[str], to: Optional[str]):
+        """Record rows leaving `statuses` (one per row) and entering `to` (None = deleted)."""
+        delta: Dict[str, int] = {}
+        for post_status in statuses:
+            delta[post_status] = delta.get(post_status, 0) - 1
+            if to is not None:
+                delta[to] = delta.get(to, 0) + 1
+        self.apply(delta)
+
+    def reset(self):
+        self._counts = {s: 0 for s in STATUSES}
+
+    async def reconcile(self):
+        async with self._lock:
+            query = select(DriverPost.status, func.count(DriverPost.id)).group_by(DriverPost.status)
+            rows = await database.fetch_all(query)
+            counts = {s: 0 for s in STATUSES}
+            for row in rows:
+                counts[row[0]] = row[1]
+            if self._counts is not None and counts != self._counts:
+                logger.info(f"Status counts drifted, reconciled {self._counts} -> {counts}")
+            self._counts = counts
+
+    async def run(self, interval: float = RECONCILE_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Failed to reconcile status counts: {e}")
+
+
+status_counter = StatusCounter()
@@ -0,0 +1,134 @@
+# tests/conftest.py
+# The suite runs against a throwaway SQLite file (aiosqlite), so it needs no
+# MySQL server. DB_URL is forced before any app module is imported: every
+# test drops and recreates the tables.
+import os
+import re
+import tempfile
+import time
+
+_DB_DIR = tempfile.mkdtemp(prefix="post-serv-tests-")
+os.environ["DB_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # tests/test_rate_limiting.py builds its own limiters
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("aws_region", "us-east-1")
+os.environ.setdefault("s3_bucket_name", "post-serv-test")
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import Integer, MetaData, create_engine, text
+from sqlalchemy.schema import DefaultClause
+
+from domain.driverPost import Base
+from infrastructure.cache import post_cache
+from infrastructure.database import database, sync_url
+from repository import idempotency_repository
+from repository.status_counter import status_counter
+
+# MySQL generated column expression (domain.driverPost._json_text) -> SQLite
+_JSON_TEXT = re.compile(r"left\(json_unquote\(json_extract\(`(\w+)`, '(\$\.\w+)'\)\), (\d+)\)")
+
+
+_SQLITE_NOW = "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+def _is_now(default) -> bool:
+    # func.now() or text("CURRENT_TIMESTAMP(6) ...")
+    return getattr(default, "name", None) == "now" or "CURRENT_TIMESTAMP" in str(default)
+
+
+def sqlite_metadata() -> MetaData:
+    """The models' schema with the MySQL-only parts replaced by SQLite equivalents."""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            if column.computed is not None:
+                column.computed.sqltext = text(
+                    _JSON_TEXT.sub(r"substr(json_extract(\1, '\2'), 1, \3)", str(column.computed.sqltext))
+                )
+            elif column.server_default is not None and _is_now(column.server_default.arg):
+                # no fractional precision argument, no ON UPDATE; written the way SQLAlchemy
+                # stores datetimes, so keyset cursors on these columns compare correctly
+                column.server_default = DefaultClause(text(_SQLITE_NOW))
+            if column.primary_key and column.autoincrement is True:
+                # only INTEGER PRIMARY KEY is a rowid alias in SQLite
+                column.type = Integer()
+    return metadata
+
+
+@pytest.fixture(scope="session")
+def engine():
+    engine = create_engine(sync_url())
+    yield engine
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    """An empty schema and a connected `database`; caches and counters start cold."""
+    metadata = sqlite_metadata()
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    await post_cache.clear()
+    await idempotency_repository._completed.clear()
+    status_counter._counts = None
+    await database.connect()
+    yield database
+    await database.disconnect()
+
+
+@pytest_asyncio.fixture
+async def client(db):
+    from main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def _post_body(**overrides) -> dict:
+    start = {"Name": "海大", "Address": "基隆市中正區北寧路2號", "Lat": 25.1504, "Lng": 121.7797}
+    body = {
+        "driver_id": "driver-1",
+        "vehicle_info": "機車",
+        "starting_point": start,
+        "destination": {"Name": "基隆火車站", "Address": "基隆市仁愛區港西街5號", "Lat": 25.1319, "Lng": 121.7392},
+        "meet_point": start,
+        "departure_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "notes": "順路",
+        "contact_info": {"phone": "0912345678"},
+    }
+    return body | overrides
+
+
+@pytest.fixture
+def post_body():
+    """Request body for POST /api/posts/ (field aliases as the API expects); keyword arguments override it."""
+    return _post_body
+
+
+@pytest.fixture
+def make_post(db):
+    """Insert a post through the repository; keyword arguments override DriverPostDTO fields."""
+    from API.dto.driver_post import DriverPostDTO
+    from repository.driverPost_repository import DriverPostRepository
+
+    async def make(**overrides) -> str:
+        data = DriverPostDTO(**_post_body()).model_dump() | {"id": str(uuid4())} | overrides
+        return await DriverPostRepository.create_driver_post(data)
+
+    return make
+
+
+@pytest.fixture
+def local_time_is_not_utc(monkeypatch):
+    """Run with the process in UTC+8, so naive local and naive UTC times differ."""
+    monkeypatch.setenv("TZ", "Asia/Taipei")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,103 @@
+# tests/test_bulk.py
+import pytest
+
+from repository.driverPost_repository import DriverPostRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def get_post(client, post_id: str) -> dict:
+    r = await client.get(f"/api/posts/getpost/{post_id}")
+    assert r.status_code == 200
+    return r.json()
+
+
+async def test_bulk_create_then_delete(client, post_body):
+    r = await client.post("/api/posts/bulk", json=[post_body(driver_id=f"driver-{i}") for i in range(3)])
+
+    assert r.status_code == 200
+    ids = [item["post_id"] for item in r.json()]
+    assert [item["result"] for item in r.json()] == ["created"] * 3
+    assert (await client.get("/api/posts/count/open")).json() == 3
+
+    r = await client.post("/api/posts/bulk/delete", json=[ids[0], "missing", ids[2]])
+
+    assert [item["result"] for item in r.json()] == ["deleted", "not_found", "deleted"]
+    assert (await client.get(f"/api/posts/getpost/{ids[0]}")).status_code == 404
+    assert (await get_post(client, ids[1]))["id"] == ids[1]
+
+
+async def test_bulk_update_applies_each_posts_own_changes(client, make_post):
+    first, second, third = [await make_post() for _ in range(3)]
+    destination = {"Name": "台北車站", "Address": "台北市中正區北平西路3號", "Lat": 25.0478, "Lng": 121.5170}
+
+    r = await client.patch("/api/posts/bulk", json=[
+        {"post_id": first, "changes": {"notes": "first", "status": "closed"}},
+        {"post_id": "missing", "changes": {"notes": "nobody"}},
+        {"post_id": second, "changes": {"notes": "second", "destination": destination}},
+        {"post_id": third, "changes": {"helmet": True}},
+    ])
+
+    assert r.status_code == 200
+    assert [(item["post_id"], item["result"]) for item in r.json()] == [
+        (first, "updated"), ("missing", "not_found"), (second, "updated"), (third, "updated"),
+    ]
+    posts = {post_id: await get_post(client, post_id) for post_id in (first, second, third)}
+    assert (posts[first]["notes"], posts[first]["status"]) == ("first", "closed")
+    assert (posts[second]["notes"], posts[second]["status"]) == ("second", "open")
+    assert posts[second]["destination"] == destination
+    assert (posts[third]["notes"], posts[third]["helmet"]) == ("順路", True)
+    # columns a post did not change keep their value, and every changed post moves on one version
+    assert posts[first]["destination"]["Name"] == "基隆火車站"
+    assert [p["version"] for p in posts.values()] == [2, 2, 2]
+    assert (await client.get("/api/posts/count")).json() == {"open": 2, "matched": 0, "closed": 1}
+
+
+async def test_bulk_update_keeps_coordinates_in_step(client, make_post, db):
+    from sqlalchemy import select
+    from domain.driverPost import DriverPost
+
+    post_id = await make_post()
+    destination = {"Name": "南港車站", "Address": "台北市南港區南港路一段313號", "Lat": 25.0522, "Lng": 121.6068}
+
+    r = await client.patch("/api/posts/bulk", json=[{"post_id": post_id, "changes": {"destination": destination}}])
+
+    assert r.json()[0]["result"] == "updated"
+    row = await db.fetch_one(select(DriverPost).where(DriverPost.id == post_id))
+    assert (row["destination_lat"], row["destination_lng"]) == (25.0522, 121.6068)
+    assert row["destination_name"] == "南港車站"
+
+
+async def test_bulk_update_with_no_existing_post(client):
+    r = await client.patch("/api/posts/bulk", json=[{"post_id": "missing", "changes": {"notes": "x"}}])
+
+    assert r.status_code == 200
+    assert r.json() == [{"post_id": "missing", "result": "not_found"}]
+
+
+async def test_bulk_update_rejects_a_post_listed_twice(client, make_post):
+    post_id = await make_post()
+
+    r = await client.patch("/api/posts/bulk", json=[
+        {"post_id": post_id, "changes": {"status": "matched"}},
+        {"post_id": post_id, "changes": {"status": "matched", "notes": "again"}},
+    ])
+
+    assert r.status_code == 400
+    assert post_id in r.json()["detail"]
+    assert (await get_post(client, post_id))["status"] == "open"
+    assert (await client.get("/api/posts/count")).json() == {"open": 1, "matched": 0, "closed": 0}
+
+
+async def test_repeated_post_id_moves_the_status_count_once(client, make_post):
+    post_id = await make_post()
+    assert (await client.get("/api/posts/count")).json() == {"open": 1, "matched": 0, "closed": 0}
+
+    found = await DriverPostRepository.bulk_modify_driver_posts([
+        (post_id, {"status": "closed"}),
+        (post_id, {"status": "matched"}),
+    ])
+
+    assert found == {post_id: True}
+    assert (await get_post(client, post_id))["status"] == "matched"
+    assert (await client.get("/api/posts/count")).json() == {"open": 0, "matched": 1, "closed": 0}
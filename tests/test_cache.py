@@ -0,0 +1,144 @@
+# tests/test_cache.py
+import asyncio
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from infrastructure.cache import MemoryCache, RedisCache
+from repository import driverPost_repository
+from repository.driverPost_repository import POSTS_GENERATION_KEY, _cached, _list_key, _post_key, invalidate_posts
+
+pytestmark = pytest.mark.asyncio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, clock, redis_client, monkeypatch):
+    """Each backend, also installed as the repository's post_cache."""
+    if request.param == "memory":
+        backend = MemoryCache(maxsize=3, ttl=30, clock=clock)
+    else:
+        backend = RedisCache(redis_client, ttl=30)
+    monkeypatch.setattr(driverPost_repository, "post_cache", backend)
+    return backend
+
+
+async def test_memory_cache_evicts_the_least_recently_used_entry(clock):
+    cache = MemoryCache(maxsize=2, ttl=30, clock=clock)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.get("a") == 1  # "b" is now the least recently used
+
+    await cache.set("c", 3)
+
+    assert (await cache.get("a"), await cache.get("b"), await cache.get("c")) == (1, None, 3)
+    assert (await cache.stats())["evictions"] == 1
+
+
+async def test_memory_cache_never_evicts_counters(clock):
+    cache = MemoryCache(maxsize=1, ttl=30, clock=clock)
+    await cache.incr("generation")
+    for i in range(5):
+        await cache.set(f"k{i}", i)
+    clock.now += 3600
+
+    assert await cache.counter("generation") == 1
+
+
+async def test_redis_cache_leaves_counters_out_of_volatile_lru(redis_client):
+    cache = RedisCache(redis_client, ttl=30, prefix="t:")
+    await cache.set("entry", {"a": 1})
+    await cache.incr("generation")
+
+    # volatile-lru only evicts keys that carry a TTL
+    assert 0 < await redis_client.pttl("t:entry") <= 30_000
+    assert await redis_client.pttl("t:generation") == -1
+
+
+async def test_memory_cache_expires_entries_after_their_ttl(clock):
+    cache = MemoryCache(ttl=30, clock=clock)
+    await cache.set("default", 1)
+    await cache.set("short", 2, ttl=5)
+
+    clock.now = 10
+    assert (await cache.get("default"), await cache.get("short")) == (1, None)
+    clock.now = 30
+    assert await cache.get("default") is None
+    assert (await cache.stats())["expirations"] == 2
+
+
+async def test_redis_cache_expires_entries_after_their_ttl(redis_client):
+    cache = RedisCache(redis_client, ttl=30)
+    await cache.set("default", 1)
+    await cache.set("short", 2, ttl=0.05)
+
+    await asyncio.sleep(0.1)
+
+    assert (await cache.get("default"), await cache.get("short")) == (1, None)
+
+
+async def test_values_round_trip(cache):
+    row = {"id": "p1", "departure_time": datetime(2026, 1, 10, 8, 30), "contact": {"line": "abc"}}
+
+    await cache.set("row", row)
+
+    got = await cache.get("row")
+    # Redis stores JSON, so datetimes come back as ISO strings, as in a response body
+    assert str(got["departure_time"]).replace(" ", "T") == "2026-01-10T08:30:00"
+    assert (got["id"], got["contact"]) == ("p1", {"line": "abc"})
+
+
+async def test_a_write_bumps_the_generation_and_orphans_cached_lists(cache):
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return [len(loads)]
+
+    key = await _list_key("count", "open")
+    assert await _cached(key, load) == [1]
+    assert await _cached(await _list_key("count", "open"), load) == [1]
+
+    await invalidate_posts()
+
+    assert await cache.counter(POSTS_GENERATION_KEY) == 1
+    assert await _list_key("count", "open") != key
+    assert await _cached(await _list_key("count", "open"), load) == [2]
+    assert len(loads) == 2
+
+
+async def test_a_write_drops_the_cached_rows_it_touched(cache):
+    await cache.set(_post_key("p1"), {"id": "p1"})
+    await cache.set(_post_key("p2"), {"id": "p2"})
+
+    await invalidate_posts("p1")
+
+    assert await cache.get(_post_key("p1")) is None
+    assert await cache.get(_post_key("p2")) == {"id": "p2"}
+
+
+async def test_clear_drops_entries(cache):
+    await cache.set("a", 1)
+
+    await cache.clear()
+
+    assert await cache.get("a") is None
+    assert cache.misses == 1
@@ -0,0 +1,86 @@
+# tests/test_dashboard.py
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+
+
+@pytest.fixture
+def seed(make_post):
+    """User "u" drives three posts and rides in two; other users' posts are noise."""
+    async def seed() -> dict[str, list[str]]:
+        driving = [
+            await make_post(driver_id="u", departure_time=START + timedelta(minutes=i), status=s)
+            for i, s in enumerate(("open", "matched", "closed"))
+        ]
+        riding = [
+            await make_post(driver_id=f"d{i}", client_id="u", departure_time=START + timedelta(minutes=i), status="matched")
+            for i in range(2)
+        ]
+        await make_post(driver_id="other", client_id="rider")
+        return {"driver": driving, "client": riding}
+    return seed
+
+
+def ids(body: dict, role: str) -> list[str]:
+    grouped = body[role]
+    return [p["id"] for s in ("open", "matched", "closed") for p in grouped[s]]
+
+
+async def test_both_roles_with_counts(client, seed):
+    posts = await seed()
+
+    r = await client.get("/api/posts/dashboard/u")
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["counts"] == {
+        "driver": {"open": 1, "matched": 1, "closed": 1},
+        "client": {"open": 0, "matched": 2, "closed": 0},
+    }
+    assert sorted(ids(body, "driver")) == sorted(posts["driver"])
+    assert [p["id"] for p in body["driver"]["matched"]] == [posts["driver"][1]]
+    # newest departure first
+    assert [p["id"] for p in body["client"]["matched"]] == posts["client"][::-1]
+    assert body["next_cursor"] == {"driver": None, "client": None}
+
+
+@pytest.mark.parametrize("role", ["driver", "client"])
+async def test_one_role(client, seed, role):
+    posts = await seed()
+    other = "client" if role == "driver" else "driver"
+
+    body = (await client.get("/api/posts/dashboard/u", params={"role": role})).json()
+
+    assert sorted(ids(body, role)) == sorted(posts[role])
+    assert body[other] is None
+    # counts always cover both roles
+    assert sum(body["counts"][other].values()) == len(posts[other])
+
+
+async def test_limit_pages_each_role_with_its_own_cursor(client, seed):
+    posts = await seed()
+
+    first = (await client.get("/api/posts/dashboard/u", params={"limit": 1})).json()
+    driver_page = (await client.get(
+        "/api/posts/dashboard/u",
+        params={"limit": 1, "role": "driver", "driver_cursor": first["next_cursor"]["driver"]},
+    )).json()
+
+    assert ids(first, "driver") == [posts["driver"][2]]
+    assert ids(first, "client") == [posts["client"][1]]
+    assert first["next_cursor"]["driver"] and first["next_cursor"]["client"]
+    assert ids(driver_page, "driver") == [posts["driver"][1]]
+
+
+async def test_status_filter_applies_to_posts_not_counts(client, seed):
+    posts = await seed()
+
+    body = (await client.get("/api/posts/dashboard/u", params={"status": "open"})).json()
+
+    assert ids(body, "driver") == [posts["driver"][0]]
+    assert ids(body, "client") == []
+    assert body["counts"]["client"]["matched"] == 2
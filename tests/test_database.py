@@ -0,0 +1,165 @@
+# tests/test_database.py
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from domain.driverPost import DriverPost
+from infrastructure import database as database_module
+from infrastructure.database import (
+    DB_POOL_MIN_SIZE, DB_POOL_PRE_PING_IDLE, DB_STATEMENT_TIMEOUT_MS, PoolStats,
+    _pool_options, database, instrument_pool, pool_ready,
+)
+from infrastructure.metrics import db_statement_duration
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_mysql_sessions_run_in_utc():
+    options = _pool_options("mysql+aiomysql://u:p@db/posts")
+
+    # one SET statement: init_command is sent without multi-statement support
+    assert options["init_command"] == f"SET SESSION max_execution_time={DB_STATEMENT_TIMEOUT_MS}, time_zone='+00:00'"
+
+
+async def test_sqlite_takes_no_pool_options():
+    assert _pool_options("sqlite:///posts.db") == {}
+
+
+def statements(kind: str) -> int:
+    series = db_statement_duration._values.get((kind,))
+    return sum(series[:-1]) if series else 0
+
+
+@pytest.fixture
+def slow_log(monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger=database_module.__name__)
+    return caplog
+
+
+async def test_iterate_is_timed_and_counted(make_post):
+    for _ in range(3):
+        await make_post()
+    before = statements("SELECT")
+
+    rows = [r async for r in database.iterate(select(DriverPost.id))]
+
+    assert len(rows) == 3
+    assert statements("SELECT") == before + 1
+
+
+async def test_iterate_leaves_the_callers_time_out(make_post, monkeypatch, slow_log):
+    for _ in range(3):
+        await make_post()
+    monkeypatch.setattr(database_module, "DB_SLOW_QUERY_MS", 50)
+
+    async for _ in database.iterate(select(DriverPost.id)):
+        await asyncio.sleep(0.03)
+
+    assert "Slow query" not in slow_log.text
+
+
+class FakeConnection:
+    def __init__(self, idle: float, fail: bool = False):
+        self.last_usage = asyncio.get_running_loop().time() - idle
+        self.fail = fail
+        self.pings = 0
+
+    async def ping(self, reconnect: bool = False):
+        self.pings += 1
+        if self.fail:
+            raise ConnectionError("gone away")
+
+
+class FakePool:
+    """aiomysql-style pool: size/freesize attributes, acquire() hands out the queued connections."""
+
+    def __init__(self, size: int, connections: tuple = ()):
+        self.size = size
+        self.freesize = size
+        self.connections = list(connections)
+
+    async def acquire(self):
+        return self.connections.pop(0)
+
+
+class FakeDatabase:
+    def __init__(self, pool=None, connected: bool = True):
+        self.is_connected = connected
+        self._backend = SimpleNamespace(_pool=pool) if pool is not None else SimpleNamespace()
+
+
+@pytest.fixture
+def fake_database(monkeypatch):
+    monkeypatch.setattr(database_module, "pool_stats", PoolStats())
+
+    def install(*args, **kwargs) -> FakeDatabase:
+        fake = FakeDatabase(*args, **kwargs)
+        monkeypatch.setattr(database_module, "database", fake)
+        return fake
+
+    return install
+
+
+async def test_pool_ready_waits_for_the_connection_and_min_size(fake_database):
+    assert not (fake_database(FakePool(DB_POOL_MIN_SIZE), connected=False), pool_ready())[1]
+    assert not (fake_database(FakePool(DB_POOL_MIN_SIZE - 1)), pool_ready())[1]
+    assert (fake_database(FakePool(DB_POOL_MIN_SIZE)), pool_ready())[1]
+
+
+async def test_pool_ready_reads_asyncpg_size(fake_database):
+    pool = SimpleNamespace(get_size=lambda: DB_POOL_MIN_SIZE - 1)
+    fake_database(pool)
+    assert not pool_ready()
+    pool.get_size = lambda: DB_POOL_MIN_SIZE
+    assert pool_ready()
+
+
+async def test_pool_ready_without_a_pool_once_connected(fake_database):
+    fake_database()
+    assert pool_ready()
+
+
+async def test_only_long_idle_connections_are_pinged(fake_database):
+    idle, fresh = FakeConnection(idle=DB_POOL_PRE_PING_IDLE + 5), FakeConnection(idle=1)
+    fake_database(FakePool(2, (idle, fresh)))
+    instrument_pool()
+
+    assert await database_module._backend_pool().acquire() is idle
+    assert await database_module._backend_pool().acquire() is fresh
+
+    assert (idle.pings, fresh.pings) == (1, 0)
+    assert (database_module.pool_stats.checkouts, database_module.pool_stats.pings) == (2, 1)
+
+
+async def test_a_failed_ping_is_counted_and_the_connection_still_handed_out(fake_database, slow_log):
+    conn = FakeConnection(idle=DB_POOL_PRE_PING_IDLE + 5, fail=True)
+    fake_database(FakePool(1, (conn,)))
+    instrument_pool()
+
+    assert await database_module._backend_pool().acquire() is conn
+    assert database_module.pool_stats.ping_failures == 1
+    assert "Pre-ping failed" in slow_log.text
+
+
+async def test_pre_ping_can_be_turned_off(fake_database, monkeypatch):
+    monkeypatch.setattr(database_module, "DB_POOL_PRE_PING", False)
+    conn = FakeConnection(idle=DB_POOL_PRE_PING_IDLE + 5)
+    fake_database(FakePool(1, (conn,)))
+    instrument_pool()
+
+    await database_module._backend_pool().acquire()
+
+    assert conn.pings == 0
+
+
+async def test_instrumenting_twice_wraps_acquire_once(fake_database):
+    fake_database(FakePool(1, (FakeConnection(idle=1),)))
+    instrument_pool()
+    instrument_pool()
+
+    await database_module._backend_pool().acquire()
+
+    assert database_module.pool_stats.checkouts == 1
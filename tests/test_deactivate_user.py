@@ -0,0 +1,109 @@
+# tests/test_deactivate_user.py
+import pytest
+from sqlalchemy import select
+
+from domain.driverPost import DriverPost
+from repository.driverPost_repository import DriverPostRepository
+from repository.status_counter import status_counter
+
+pytestmark = pytest.mark.asyncio
+
+
+async def rows(db) -> dict[str, dict]:
+    result = await db.fetch_all(select(DriverPost.id, DriverPost.status, DriverPost.client_id, DriverPost.version))
+    return {r["id"]: {"status": r["status"], "client_id": r["client_id"], "version": r["version"]} for r in result}
+
+
+@pytest.fixture
+def seed(make_post):
+    """Posts around user "u": as driver (open, matched, closed) and as client of other drivers."""
+    async def seed() -> dict[str, str]:
+        return {
+            "driving_open": await make_post(driver_id="u"),
+            "driving_matched": await make_post(driver_id="u", status="matched", client_id="rider"),
+            "driving_closed": await make_post(driver_id="u", status="closed"),
+            "riding": await make_post(driver_id="other", status="matched", client_id="u"),
+            "riding_closed": await make_post(driver_id="other", status="closed", client_id="u"),
+            "unrelated": await make_post(driver_id="other", status="matched", client_id="rider"),
+        }
+    return seed
+
+
+async def test_close_unmatches_rides_and_closes_driven_posts(db, seed):
+    posts = await seed()
+    await status_counter.counts()
+
+    results = await DriverPostRepository.deactivate_user("u")
+
+    assert sorted(results, key=lambda r: r["post_id"]) == sorted([
+        {"post_id": posts["riding"], "role": "client", "previous_status": "matched", "result": "unmatched"},
+        {"post_id": posts["driving_open"], "role": "driver", "previous_status": "open", "result": "closed"},
+        {"post_id": posts["driving_matched"], "role": "driver", "previous_status": "matched", "result": "closed"},
+    ], key=lambda r: r["post_id"])
+    after = await rows(db)
+    assert after[posts["riding"]] == {"status": "open", "client_id": "unknown", "version": 2}
+    assert after[posts["driving_open"]]["status"] == "closed"
+    assert after[posts["driving_matched"]]["status"] == "closed"
+    # already closed, or not the user's: untouched
+    for name in ("driving_closed", "riding_closed", "unrelated"):
+        assert after[posts[name]]["version"] == 1
+    assert await status_counter.counts() == {"open": 1, "matched": 1, "closed": 4}
+
+
+async def test_delete_removes_every_driven_post(db, seed):
+    posts = await seed()
+
+    results = await DriverPostRepository.deactivate_user("u", driver_action="delete")
+
+    assert {(r["post_id"], r["result"]) for r in results} == {
+        (posts["riding"], "unmatched"),
+        (posts["driving_open"], "deleted"),
+        (posts["driving_matched"], "deleted"),
+        (posts["driving_closed"], "deleted"),
+    }
+    after = await rows(db)
+    assert set(after) == {posts["riding"], posts["riding_closed"], posts["unrelated"]}
+    assert after[posts["riding"]]["status"] == "open"
+
+
+async def test_own_post_matched_to_themselves_is_handled_once_as_driver(db, make_post):
+    post_id = await make_post(driver_id="u", status="matched", client_id="u")
+
+    results = await DriverPostRepository.deactivate_user("u")
+
+    assert results == [{"post_id": post_id, "role": "driver", "previous_status": "matched", "result": "closed"}]
+
+
+async def test_chunks_cover_every_post(db, make_post):
+    driven = {await make_post(driver_id="u") for _ in range(5)}
+    ridden = {await make_post(driver_id=f"d{i}", status="matched", client_id="u") for i in range(3)}
+
+    results = await DriverPostRepository.deactivate_user("u", chunk_size=2)
+
+    assert {r["post_id"] for r in results if r["result"] == "closed"} == driven
+    assert {r["post_id"] for r in results if r["result"] == "unmatched"} == ridden
+    assert len(results) == 8
+
+
+async def test_user_without_posts(db, make_post):
+    await make_post(driver_id="other")
+
+    assert await DriverPostRepository.deactivate_user("nobody") == []
+
+
+async def test_route_reports_totals_and_per_post_results(client, seed):
+    posts = await seed()
+
+    r = await client.post("/api/posts/users/u/deactivate", params={"driver_action": "delete"})
+
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["user_id"], body["unmatched"], body["closed"], body["deleted"]) == ("u", 1, 0, 3)
+    assert {p["post_id"]: p["result"] for p in body["posts"]} == {
+        posts["riding"]: "unmatched",
+        posts["driving_open"]: "deleted",
+        posts["driving_matched"]: "deleted",
+        posts["driving_closed"]: "deleted",
+    }
+    assert (await client.get(f"/api/posts/getpost/{posts['driving_open']}")).status_code == 404
+    assert (await client.get(f"/api/posts/getpost/{posts['riding']}")).json()["status"] == "open"
@@ -0,0 +1,109 @@
+# tests/test_match_index.py
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from domain import geo
+from repository.match_index import MATCH_CELL_PRECISION, MatchIndex, _entry, _slot
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.usefixtures("local_time_is_not_utc")]
+
+TAIPEI = timezone(timedelta(hours=8))
+ORIGIN = (25.1504, 121.7797)  # 海大
+DESTINATION = (25.1319, 121.7392)  # 基隆火車站
+
+
+def utc_now() -> datetime:
+    # naive UTC, as the column stores it
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+async def recommend(index: MatchIndex, departure: datetime) -> list[dict]:
+    return await index.recommend(ORIGIN, DESTINATION, departure, timedelta(minutes=30), 3.0, 3.0)
+
+
+async def test_query_time_with_an_offset_matches_posts_stored_in_utc(db, make_post):
+    departure = utc_now() + timedelta(hours=2)
+    post_id = await make_post(departure_time=departure)
+    index = MatchIndex()
+    await index.rebuild()
+
+    local = departure.replace(tzinfo=timezone.utc).astimezone(TAIPEI)
+    [match] = await recommend(index, local)
+
+    assert (match["id"], match["time_delta_minutes"]) == (post_id, 0)
+    assert [p["id"] for p in await recommend(index, departure)] == [post_id]  # naive means UTC
+    assert await recommend(index, departure.replace(tzinfo=TAIPEI)) == []  # 8 hours earlier
+
+
+async def test_refresh_indexes_posts_inside_the_utc_window(db, make_post):
+    upcoming = await make_post(departure_time=utc_now() + timedelta(hours=1))
+    past = await make_post(departure_time=utc_now() - timedelta(days=1))
+    index = MatchIndex()
+
+    await index.refresh([upcoming, past])
+
+    assert index.stats()["posts"] == 1
+    assert upcoming in index._entries
+
+
+async def test_entry_reads_naive_departures_as_utc():
+    departure = datetime(2026, 1, 10, 12, 0)
+    post = {
+        "id": "p", "status": "open", "departure_time": departure,
+        "start_lat": ORIGIN[0], "start_lng": ORIGIN[1],
+        "destination_lat": DESTINATION[0], "destination_lng": DESTINATION[1],
+    }
+
+    naive = _entry(post)
+    aware = _entry(post | {"departure_time": departure.replace(tzinfo=timezone.utc).astimezone(TAIPEI)})
+
+    assert naive.departure == aware.departure == departure.replace(tzinfo=timezone.utc).timestamp()
+    assert naive.bucket == aware.bucket
+
+
+def filled_index(posts: int) -> MatchIndex:
+    rng = random.Random(0)
+    index = MatchIndex()
+    start = datetime(2026, 1, 10, 12, 0)
+    for i in range(posts):
+        index._add(_entry({
+            "id": f"p{i}", "status": "open", "departure_time": start + timedelta(minutes=rng.randint(0, 3 * 24 * 60)),
+            "start_lat": ORIGIN[0] + rng.uniform(-0.3, 0.3), "start_lng": ORIGIN[1] + rng.uniform(-0.3, 0.3),
+            "destination_lat": DESTINATION[0] + rng.uniform(-0.3, 0.3),
+            "destination_lng": DESTINATION[1] + rng.uniform(-0.3, 0.3),
+        }))
+    index._loaded = True
+    return index
+
+
+@pytest.mark.parametrize("radius_km, tolerance_h", [(1.0, 0.5), (5.0, 2), (20.0, 12)])
+async def test_probing_and_scanning_find_the_same_buckets(radius_km, tolerance_h):
+    index = filled_index(2000)
+    target = datetime(2026, 1, 11, 12, 0, tzinfo=timezone.utc).timestamp()
+    tolerance_s = tolerance_h * 3600
+    slots = range(_slot(target - tolerance_s), _slot(target + tolerance_s) + 1)
+    origin_cells = geo.grid_cells(*geo.bounding_box(*ORIGIN, radius_km), MATCH_CELL_PRECISION)
+    destination_cells = geo.grid_cells(*geo.bounding_box(*DESTINATION, radius_km), MATCH_CELL_PRECISION)
+
+    probed = index._probe_buckets(slots, origin_cells, destination_cells)
+    scanned = index._scan_buckets(slots, origin_cells, destination_cells)
+
+    assert sorted(map(id, probed)) == sorted(map(id, scanned))
+
+
+async def test_widest_query_scans_the_buckets_instead_of_probing(monkeypatch):
+    index = filled_index(2000)
+
+    def probe(*args):
+        raise AssertionError("probed ~320k keys")
+
+    monkeypatch.setattr(index, "_probe_buckets", probe)
+    departure = datetime(2026, 1, 11, 12, 0)
+    posts = await index.recommend(ORIGIN, DESTINATION, departure, timedelta(hours=12), 20.0, 20.0, limit=500)
+
+    assert posts
+    assert all(p["origin_km"] <= 20 and p["destination_km"] <= 20 for p in posts)
+    assert all(abs(p["time_delta_minutes"]) <= 12 * 60 for p in posts)
+    assert [p["score"] for p in posts] == sorted(p["score"] for p in posts)
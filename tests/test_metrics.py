@@ -0,0 +1,53 @@
+# tests/test_metrics.py
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from domain.driverPost import DriverPost
+from infrastructure import database as database_module
+from infrastructure.database import database
+from infrastructure.metrics import Counter, Histogram, _registry
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def registered(monkeypatch):
+    """Metrics created by a test are dropped from the process-wide registry afterwards."""
+    monkeypatch.setattr("infrastructure.metrics._registry", list(_registry))
+
+
+async def test_label_values_are_escaped(registered):
+    counter = Counter("test_requests_total", "Test.", ("route",))
+    counter.inc(route='/a\\b"c"\nd')
+
+    assert list(counter.render())[-1] == 'test_requests_total{route="/a\\\\b\\"c\\"\\nd"} 1'
+
+
+async def test_histogram_label_values_are_escaped(registered):
+    histogram = Histogram("test_duration_seconds", "Test.", ("route",), buckets=(1.0,))
+    histogram.observe(0.5, route='say "hi"')
+
+    lines = list(histogram.render())
+
+    assert 'test_duration_seconds_bucket{route="say \\"hi\\"",le="1.0"} 1' in lines
+    assert 'test_duration_seconds_count{route="say \\"hi\\""} 1' in lines
+
+
+@pytest.fixture
+def every_query_is_slow(monkeypatch, caplog):
+    monkeypatch.setattr(database_module, "DB_SLOW_QUERY_MS", 0)
+    caplog.set_level(logging.WARNING, logger=database_module.__name__)
+    return caplog
+
+
+async def test_slow_query_log_leaves_out_bound_values(make_post, every_query_is_slow):
+    await make_post(contact={"phone": "0987654321"}, notes="my secret note")
+    await database.fetch_all(select(DriverPost.id).where(DriverPost.driver_id == "driver-secret"))
+
+    logged = every_query_is_slow.text
+    assert "Slow query" in logged
+    assert "INSERT INTO" in logged and "driver_id = ?" in logged
+    for value in ("0987654321", "my secret note", "driver-secret"):
+        assert value not in logged
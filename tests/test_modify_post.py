@@ -0,0 +1,64 @@
+# tests/test_modify_post.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from repository import driverPost_repository
+
+pytestmark = pytest.mark.asyncio
+
+COLUMN_KEYS = {"id", "driver_id", "client_id", "status", "start_point", "destination", "meet_point",
+               "departure_time", "contact", "time_stamp", "updated_at", "version"}
+ALIASES = {"starting_point", "contact_info", "timestamp"}
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["read-back", "cached-row"])
+async def test_patch_answers_with_column_names(client, make_post, cached):
+    post_id = await make_post()
+    if cached:
+        await client.get(f"/api/posts/getpost/{post_id}")
+
+    r = await client.patch(f"/api/posts/driver_posts/{post_id}", json={"notes": "改時間", "contact_info": {"line": "abc"}})
+
+    assert r.status_code == 200
+    body = r.json()
+    assert COLUMN_KEYS <= body.keys()
+    assert not ALIASES & body.keys()
+    assert (body["notes"], body["contact"], body["version"]) == ("改時間", {"line": "abc"}, 2)
+    assert body["start_point"]["Name"] == "海大"
+    assert r.headers["etag"] == '"2"'
+    assert "last-modified" in r.headers
+
+
+async def test_if_match_turns_patch_into_compare_and_set(client, make_post):
+    post_id = await make_post()
+    etag = (await client.get(f"/api/posts/getpost/{post_id}")).headers["etag"]
+
+    first = await client.patch(f"/api/posts/driver_posts/{post_id}", json={"notes": "a"}, headers={"If-Match": etag})
+    stale = await client.patch(f"/api/posts/driver_posts/{post_id}", json={"notes": "b"}, headers={"If-Match": etag})
+
+    assert first.status_code == 200
+    assert stale.status_code == 412
+    assert (await client.get(f"/api/posts/getpost/{post_id}")).json()["notes"] == "a"
+
+
+async def test_patch_of_a_missing_post_is_404(client, db):
+    r = await client.patch("/api/posts/driver_posts/missing", json={"notes": "x"})
+
+    assert r.status_code == 404
+
+
+@pytest.mark.usefixtures("local_time_is_not_utc")
+@pytest.mark.parametrize("cached", [False, True], ids=["read-back", "cached-row"])
+async def test_updated_at_is_utc_on_both_paths_without_returning(client, make_post, monkeypatch, cached):
+    # MySQL: no UPDATE ... RETURNING, so a cached row is patched in Python and anything else read back
+    monkeypatch.setattr(driverPost_repository, "SUPPORTS_UPDATE_RETURNING", False)
+    post_id = await make_post()
+    if cached:
+        await client.get(f"/api/posts/getpost/{post_id}")
+
+    r = await client.patch(f"/api/posts/driver_posts/{post_id}", json={"notes": "改時間"})
+
+    updated_at = datetime.fromisoformat(r.json()["updated_at"])
+    assert updated_at.tzinfo is None
+    assert abs(updated_at - datetime.now(timezone.utc).replace(tzinfo=None)) < timedelta(minutes=1)
@@ -0,0 +1,47 @@
+# tests/test_nearby_search.py
+import pytest
+
+from repository import driverPost_repository
+from repository.driverPost_repository import DriverPostRepository
+
+pytestmark = pytest.mark.asyncio
+
+ORIGIN = (25.1504, 121.7797)
+
+
+def point(north_km: float) -> dict:
+    # ~0.009 degrees of latitude per km
+    return {"Name": f"{north_km}km", "Address": "", "Lat": ORIGIN[0] + north_km * 0.009, "Lng": ORIGIN[1]}
+
+
+async def test_nearby_returns_nearest_first_with_distances(make_post):
+    far, near, outside = [await make_post(start_point=point(km)) for km in (1.5, 0.5, 4.0)]
+
+    posts = await DriverPostRepository.search_nearby(*ORIGIN, radius_km=2)
+
+    assert [p["id"] for p in posts] == [near, far]
+    assert posts[0]["distance_km"] == pytest.approx(0.5, abs=0.01)
+    assert outside not in {p["id"] for p in posts}
+
+
+async def test_candidate_cap_keeps_the_nearest_posts(make_post, monkeypatch):
+    # more candidates in the box than the cap: the ones cut must be the farthest
+    ids = {km: await make_post(start_point=point(km)) for km in (1.8, 0.2, 1.2, 0.6, 1.6)}
+    monkeypatch.setattr(driverPost_repository, "NEARBY_MAX_CANDIDATES", 2)
+
+    posts = await DriverPostRepository.search_nearby(*ORIGIN, radius_km=2)
+
+    assert [p["id"] for p in posts] == [ids[0.2], ids[0.6]]
+
+
+async def test_nearby_route_filters_by_destination(client, make_post):
+    taipei = {"Name": "台北車站", "Address": "", "Lat": 25.0478, "Lng": 121.5170}
+    to_keelung = await make_post(start_point=point(0.3))
+    await make_post(start_point=point(0.1), destination=taipei)
+
+    r = await client.get("/api/posts/search/nearby", params={
+        "lat": ORIGIN[0], "lng": ORIGIN[1], "radius_km": 1, "dest_lat": 25.1319, "dest_lng": 121.7392,
+    })
+
+    assert r.status_code == 200
+    assert [p["id"] for p in r.json()] == [to_keelung]
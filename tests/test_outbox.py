@@ -0,0 +1,120 @@
+# tests/test_outbox.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from domain.driverPost import PostOutbox
+from infrastructure.outbox import QueueSink
+from repository import driverPost_repository
+from repository.outbox_publisher import OutboxPublisher
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def outbox_enabled(monkeypatch):
+    monkeypatch.setattr(driverPost_repository, "POST_OUTBOX_ENABLED", True)
+
+
+class FailingSink:
+    async def send(self, events: list[dict]):
+        raise RuntimeError("receiver down")
+
+    async def close(self):
+        pass
+
+
+async def outbox_rows(db) -> list[dict]:
+    return [dict(r) for r in await db.fetch_all(select(PostOutbox.id, PostOutbox.claimed_until).order_by(PostOutbox.id))]
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def drain(sink: QueueSink) -> list[dict]:
+    events = []
+    while not sink.queue.empty():
+        events.append(sink.queue.get_nowait())
+    return events
+
+
+async def test_publishes_in_id_order_and_deletes_what_was_sent(db, make_post):
+    post_ids = [await make_post() for _ in range(3)]
+    sink = QueueSink()
+    publisher = OutboxPublisher(sink, batch_size=2)
+
+    assert await publisher.publish_batch() == 2
+    assert len(await outbox_rows(db)) == 1
+    assert await publisher.publish_batch() == 1
+    assert await publisher.publish_batch() == 0
+
+    events = drain(sink)
+    assert [(e["type"], e["post_id"]) for e in events] == [("created", p) for p in post_ids]
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+    assert await outbox_rows(db) == []
+    assert publisher.stats()["published"] == 3
+
+
+async def test_a_failed_send_keeps_the_rows_and_releases_the_claim(db, make_post):
+    await make_post()
+
+    with pytest.raises(RuntimeError):
+        await OutboxPublisher(FailingSink()).publish_batch()
+
+    assert [r["claimed_until"] for r in await outbox_rows(db)] == [None]
+    sink = QueueSink()
+    assert await OutboxPublisher(sink).publish_batch() == 1
+    assert len(drain(sink)) == 1
+
+
+async def test_the_claim_is_committed_before_sending(db, make_post):
+    await make_post()
+    seen_by_other = []
+    other = OutboxPublisher(QueueSink())
+
+    class PeekingSink(QueueSink):
+        async def send(self, events):
+            # no transaction is open here: another worker sees the claim and skips the rows
+            seen_by_other.append(await other._claim())
+            await super().send(events)
+
+    assert await OutboxPublisher(PeekingSink()).publish_batch() == 1
+    assert seen_by_other == [[]]
+    assert await outbox_rows(db) == []
+
+
+async def test_an_expired_claim_is_sent_again(db, make_post):
+    await make_post()
+    await db.execute(update(PostOutbox).values(claimed_until=utc_now() + timedelta(minutes=1)))
+    sink = QueueSink()
+    publisher = OutboxPublisher(sink)
+
+    assert await publisher.publish_batch() == 0
+    await db.execute(update(PostOutbox).values(claimed_until=utc_now() - timedelta(seconds=1)))
+    assert await publisher.publish_batch() == 1
+    assert len(drain(sink)) == 1
+
+
+async def test_without_a_sink_nothing_is_published_or_deleted(db, make_post):
+    await make_post()
+    publisher = OutboxPublisher()  # no POST_OUTBOX_WEBHOOK_URL in tests
+
+    assert publisher.sink is None
+    assert not publisher.enabled
+    assert await publisher.publish_batch() == 0
+    assert [r["claimed_until"] for r in await outbox_rows(db)] == [None]
+
+
+async def test_a_full_queue_fails_the_batch_instead_of_dropping_events(db, make_post):
+    for _ in range(3):
+        await make_post()
+    sink = QueueSink(maxsize=2)
+
+    with pytest.raises(asyncio.QueueFull):
+        await OutboxPublisher(sink).publish_batch()
+
+    assert sink.queue.empty()
+    assert len(await outbox_rows(db)) == 3
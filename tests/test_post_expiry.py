@@ -0,0 +1,107 @@
+# tests/test_post_expiry.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from domain.driverPost import DriverPost, DriverPostArchive
+from repository.driverPost_repository import DriverPostRepository
+from repository.post_expiry import PostExpiry, utc_now
+from repository.status_counter import status_counter
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2026, 1, 10, 12, 0)
+
+
+class FakeClock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def expiry(clock: FakeClock, batch_size: int = 2) -> PostExpiry:
+    return PostExpiry(clock=clock, batch_size=batch_size, grace=timedelta(minutes=30), archive_after=timedelta(days=7))
+
+
+async def statuses(db) -> dict[str, str]:
+    rows = await db.fetch_all(select(DriverPost.id, DriverPost.status))
+    return {r["id"]: r["status"] for r in rows}
+
+
+async def test_close_expired_closes_open_posts_past_the_grace_period(db, make_post):
+    expired = [await make_post(departure_time=NOW - timedelta(hours=h)) for h in (1, 2, 5)]
+    in_grace = await make_post(departure_time=NOW - timedelta(minutes=10))
+    upcoming = await make_post(departure_time=NOW + timedelta(hours=1))
+    matched = await make_post(departure_time=NOW - timedelta(hours=3), status="matched")
+
+    # three expired posts with batches of two: the pass keeps going until a short batch
+    closed = await expiry(FakeClock(NOW)).close_expired()
+
+    assert closed == 3
+    assert await statuses(db) == {
+        **dict.fromkeys(expired, "closed"), in_grace: "open", upcoming: "open", matched: "matched",
+    }
+    post = await DriverPostRepository.get_post_by_id(expired[0])
+    assert (post["status"], post["version"]) == ("closed", 2)
+    assert await status_counter.counts() == {"open": 2, "matched": 1, "closed": 3}
+
+
+async def test_close_expired_follows_the_clock(db, make_post):
+    post_id = await make_post(departure_time=NOW + timedelta(hours=1))
+    clock = FakeClock(NOW)
+    job = expiry(clock)
+
+    assert await job.close_expired() == 0
+    clock.now = NOW + timedelta(hours=1, minutes=31)
+    assert await job.close_expired() == 1
+    assert (await statuses(db))[post_id] == "closed"
+
+
+async def test_archive_old_moves_old_closed_and_matched_posts(db, make_post):
+    old = [
+        await make_post(departure_time=NOW - timedelta(days=8), status=s, notes=f"old {s}")
+        for s in ("closed", "matched", "closed")
+    ]
+    recent = await make_post(departure_time=NOW - timedelta(days=6), status="closed")
+    old_open = await make_post(departure_time=NOW - timedelta(days=9))
+
+    archived = await expiry(FakeClock(NOW)).archive_old()
+
+    assert archived == 3
+    assert set(await statuses(db)) == {recent, old_open}
+    rows = await db.fetch_all(select(DriverPostArchive).order_by(DriverPostArchive.notes))
+    assert sorted(r["id"] for r in rows) == sorted(old)
+    assert [(r["status"], r["notes"]) for r in rows] == [("closed", "old closed"), ("closed", "old closed"), ("matched", "old matched")]
+    assert rows[0]["start_point"]["Name"] == "海大"
+    assert await status_counter.counts() == {"open": 1, "matched": 0, "closed": 1}
+
+
+async def test_run_once_closes_then_archives_as_time_passes(db, make_post):
+    post_id = await make_post(departure_time=NOW - timedelta(hours=1))
+    clock = FakeClock(NOW)
+    job = expiry(clock)
+
+    assert await job.run_once() == {"closed": 1, "archived": 0}
+    clock.now = NOW + timedelta(days=7)
+    assert await job.run_once() == {"closed": 0, "archived": 1}
+
+    assert await db.fetch_val(select(func.count()).select_from(DriverPost)) == 0
+    assert await db.fetch_val(select(DriverPostArchive.status).where(DriverPostArchive.id == post_id)) == "closed"
+    stats = job.stats()
+    assert (stats["runs"], stats["closed"], stats["archived"]) == (2, 1, 1)
+    assert stats["last_run_at"] == NOW + timedelta(days=7)
+
+
+@pytest.mark.usefixtures("local_time_is_not_utc")
+async def test_default_clock_is_utc_like_departure_time(db, make_post):
+    # departure_time is naive UTC: a local clock 8 hours ahead would close and archive these early
+    upcoming = await make_post(departure_time=utc_now() + timedelta(hours=1))
+    departed = await make_post(departure_time=utc_now() - timedelta(hours=1))
+    recent = await make_post(departure_time=utc_now() - timedelta(days=7) + timedelta(hours=1), status="closed")
+    job = PostExpiry(batch_size=2, grace=timedelta(minutes=30), archive_after=timedelta(days=7))
+
+    assert await job.run_once() == {"closed": 1, "archived": 0}
+    assert await statuses(db) == {upcoming: "open", departed: "closed", recent: "closed"}
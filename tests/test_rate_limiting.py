@@ -0,0 +1,174 @@
+# tests/test_rate_limiting.py
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Request, Response
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIMiddleware
+
+import rate_limiting
+from rate_limiting import PARTIAL_SEARCH_COST, limiter, rate_limit_key, search_cost
+
+pytestmark = pytest.mark.asyncio
+
+LIMIT = "6/minute"
+
+
+def build_app() -> FastAPI:
+    limiter = Limiter(key_func=rate_limit_key, key_style="endpoint", default_limits=[LIMIT], headers_enabled=True)
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(SlowAPIMiddleware)
+
+    @app.middleware("http")
+    async def authenticate(request: Request, call_next):
+        # stands in for an authentication layer
+        if "x-test-user" in request.headers:
+            request.state.user_id = request.headers["x-test-user"]
+        return await call_next(request)
+
+    @app.get("/plain")
+    async def plain():
+        return {"ok": True}
+
+    @app.get("/limited/{user_id}")
+    @limiter.limit(LIMIT)
+    async def limited(request: Request, response: Response, user_id: str):
+        return {"ok": True}
+
+    @app.get("/search")
+    @limiter.limit(LIMIT, cost=search_cost)
+    async def search(request: Request, response: Response, partial: bool = False, q: str | None = None):
+        return {"ok": True}
+
+    return app
+
+
+def client_for(app: FastAPI, ip: str = "10.0.0.1") -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(ip, 1234))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def statuses(client: httpx.AsyncClient, n: int, path: str, **kwargs) -> list[int]:
+    return [(await client.get(path, **kwargs)).status_code for _ in range(n)]
+
+
+async def test_route_limit_answers_429_with_headers():
+    async with client_for(build_app()) as client:
+        assert await statuses(client, 7, "/limited/a") == [200] * 6 + [429]
+        blocked = await client.get("/limited/a")
+
+    assert blocked.status_code == 429
+    assert "retry-after" in blocked.headers
+    assert blocked.headers["x-ratelimit-limit"] == "6"
+
+
+async def test_ids_in_path_or_query_do_not_get_a_fresh_bucket():
+    async with client_for(build_app()) as client:
+        codes = [
+            (await client.get(f"/limited/user-{i}", params={"user_id": f"u{i}", "client_id": f"c{i}"})).status_code
+            for i in range(7)
+        ]
+
+    assert codes == [200] * 6 + [429]
+
+
+async def test_each_client_ip_has_its_own_bucket():
+    app = build_app()
+    async with client_for(app, "10.0.0.1") as first, client_for(app, "10.0.0.2") as second:
+        assert await statuses(first, 7, "/limited/a") == [200] * 6 + [429]
+        assert await statuses(second, 1, "/limited/a") == [200]
+
+
+async def test_authenticated_users_behind_one_ip_are_limited_separately():
+    app = build_app()
+    async with client_for(app) as client:
+        assert await statuses(client, 7, "/limited/a", headers={"x-test-user": "alice"}) == [200] * 6 + [429]
+        assert await statuses(client, 1, "/limited/a", headers={"x-test-user": "bob"}) == [200]
+
+
+async def test_forwarded_for_is_ignored_unless_trusted(monkeypatch):
+    app = build_app()
+    async with client_for(app) as client:
+        codes = [
+            (await client.get("/limited/a", headers={"x-forwarded-for": f"192.0.2.{i}"})).status_code
+            for i in range(7)
+        ]
+        assert codes == [200] * 6 + [429]
+
+        monkeypatch.setattr(rate_limiting, "RATE_LIMIT_TRUST_FORWARDED", True)
+        assert await statuses(client, 1, "/limited/a", headers={"x-forwarded-for": "192.0.2.1, 10.0.0.1"}) == [200]
+
+
+@pytest.mark.parametrize("params", [{"partial": "true"}, {"q": "順路"}])
+async def test_expensive_search_spends_several_units(params):
+    allowed = 6 // PARTIAL_SEARCH_COST
+    async with client_for(build_app()) as client:
+        assert await statuses(client, allowed + 1, "/search", params=params) == [200] * allowed + [429]
+
+
+async def test_undecorated_routes_fall_under_the_default_limit():
+    async with client_for(build_app()) as client:
+        assert (await statuses(client, 7, "/plain"))[-1] == 429
+
+
+@pytest_asyncio.fixture
+async def app_limiter(client):
+    """The app's own limiter, switched on for one test."""
+    enabled = limiter.enabled
+    limiter.reset()
+    limiter.enabled = True
+    yield limiter
+    limiter.enabled = enabled
+    limiter.reset()
+
+
+async def test_app_admin_limit_holds_when_user_id_rotates(client, app_limiter):
+    codes = [
+        (await client.delete("/api/posts/deleteall", params={"user_id": f"rotated-{i}"})).status_code
+        for i in range(3)
+    ]
+
+    assert codes == [200, 200, 429]
+
+
+async def test_app_bulk_limit_holds_when_the_path_id_rotates(client, app_limiter):
+    limit = int(rate_limiting.BULK_LIMIT.split("/")[0])
+
+    codes = [(await client.post(f"/api/posts/users/user-{i}/deactivate")).status_code for i in range(limit + 1)]
+
+    assert codes == [200] * limit + [429]
+
+
+async def test_app_write_limit_holds_when_client_id_rotates(client, app_limiter, make_post):
+    limit = int(rate_limiting.WRITE_LIMIT.split("/")[0])
+    post_ids = [await make_post() for _ in range(limit + 1)]
+
+    codes = [
+        (await client.patch("/api/posts/request", params={"post_id": post_id, "client_id": f"rider-{i}"})).status_code
+        for i, post_id in enumerate(post_ids)
+    ]
+
+    assert codes == [200] * limit + [429]
+
+
+@pytest.mark.parametrize("path", ["/api/posts/count", "/api/posts/count/open", "/api/posts/all?limit=5"])
+async def test_app_polled_reads_outlast_the_default_limit(client, app_limiter, path):
+    # one more than RATE_LIMIT_DEFAULT allows: many pages behind one NAT address poll these
+    n = int(rate_limiting.DEFAULT_LIMIT.split("/")[0]) + 1
+
+    codes = await statuses(client, n, path)
+
+    assert codes == [200] * n
+    assert (await client.get(path)).headers["x-ratelimit-limit"] == rate_limiting.POLL_LIMIT.split("/")[0]
+
+
+async def test_app_getpost_uses_the_poll_limit(client, app_limiter, make_post):
+    post_id = await make_post()
+
+    r = await client.get(f"/api/posts/getpost/{post_id}")
+
+    assert r.status_code == 200
+    assert r.headers["x-ratelimit-limit"] == rate_limiting.POLL_LIMIT.split("/")[0]
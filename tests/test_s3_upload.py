@@ -0,0 +1,129 @@
+# tests/test_s3_upload.py
+import io
+import os
+import tempfile
+
+import boto3
+import pytest
+from moto import mock_aws
+from PIL import Image
+
+from API import post_route
+from infrastructure import image_processing, s3
+from repository.driverPost_repository import DriverPostRepository
+
+pytestmark = pytest.mark.asyncio
+
+BUCKET = os.environ["s3_bucket_name"]
+
+
+@pytest.fixture
+def bucket():
+    """A moto S3 bucket; the app's lazily built client is created inside the mock."""
+    with mock_aws():
+        s3._client = None
+        client = boto3.client("s3", region_name=os.environ["aws_region"])
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        s3._client = None
+    image_processing.shutdown()
+
+
+def png(size=(640, 480)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+def stored(client) -> dict[str, bytes]:
+    keys = [o["Key"] for o in client.list_objects_v2(Bucket=BUCKET).get("Contents", [])]
+    return {key: client.get_object(Bucket=BUCKET, Key=key)["Body"].read() for key in keys}
+
+
+async def test_s3_upload_streams_file_object(bucket):
+    data = os.urandom(256 * 1024)
+    with tempfile.TemporaryFile() as f:
+        f.write(b"skipped" + data)
+        f.seek(len(b"skipped"))  # uploads from the current position
+        url = await DriverPostRepository.s3_upload(f, "driver_posts/raw.bin", "application/octet-stream")
+
+    assert url == f"https://{BUCKET}.s3.{os.environ['aws_region']}.amazonaws.com/driver_posts/raw.bin"
+    assert stored(bucket) == {"driver_posts/raw.bin": data}
+    head = bucket.head_object(Bucket=BUCKET, Key="driver_posts/raw.bin")
+    assert head["ContentType"] == "application/octet-stream"
+    assert head["ServerSideEncryption"] == "AES256"
+
+
+async def test_upload_image_stores_original_and_variants(bucket, client, make_post):
+    post_id = await make_post()
+    image = png()
+
+    r = await client.patch(
+        "/api/posts/upload_image", params={"post_id": post_id},
+        files={"file": ("photo.png", image, "image/png")},
+    )
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["message"] == "Image uploaded successfully."
+    objects = stored(bucket)
+    assert len(objects) == 3
+    original = body["image_url"].split(".amazonaws.com/", 1)[1]
+    assert objects[original] == image
+    for name in ("thumbnail_url", "display_url"):
+        key = body[name].split(".amazonaws.com/", 1)[1]
+        with Image.open(io.BytesIO(objects[key])) as variant:
+            assert max(variant.size) <= image_processing.VARIANTS[name.removesuffix("_url")][0]
+
+    post = (await client.get(f"/api/posts/getpost/{post_id}")).json()
+    assert (post["image_url"], post["thumbnail_url"], post["display_url"]) == (
+        body["image_url"], body["thumbnail_url"], body["display_url"]
+    )
+
+
+async def test_upload_image_rejects_unsupported_type(bucket, client, make_post):
+    post_id = await make_post()
+
+    r = await client.patch(
+        "/api/posts/upload_image", params={"post_id": post_id},
+        files={"file": ("notes.png", b"not an image at all", "image/png")},
+    )
+
+    assert r.json() == {"message": "Unsupported file type.", "image_url": None, "thumbnail_url": None, "display_url": None}
+    assert stored(bucket) == {}
+
+
+async def test_upload_image_retry_with_same_key_is_replayed(bucket, client, make_post):
+    post_id = await make_post()
+    image = png()
+
+    def upload():
+        return client.patch(
+            "/api/posts/upload_image", params={"post_id": post_id},
+            files={"file": ("photo.png", image, "image/png")}, headers={"Idempotency-Key": "upload-1"},
+        )
+
+    first = await upload()
+    retry = await upload()
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(stored(bucket)) == 3
+
+
+@pytest.mark.parametrize("key, hashed", [(None, 0), ("upload-1", 1)])
+async def test_upload_is_hashed_only_with_an_idempotency_key(bucket, client, make_post, monkeypatch, key, hashed):
+    calls = []
+    sha256 = post_route._sha256
+    monkeypatch.setattr(post_route, "_sha256", lambda f: calls.append(1) or sha256(f))
+    post_id = await make_post()
+
+    r = await client.patch(
+        "/api/posts/upload_image", params={"post_id": post_id},
+        files={"file": ("photo.png", png(), "image/png")}, headers={"Idempotency-Key": key} if key else {},
+    )
+
+    assert r.status_code == 200
+    assert r.json()["message"] == "Image uploaded successfully."
+    assert len(calls) == hashed
@@ -0,0 +1,78 @@
+# tests/test_streaming.py
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from infrastructure.database import database
+from repository import driverPost_repository
+
+pytestmark = pytest.mark.asyncio
+
+PAGE = 2
+
+
+@pytest.fixture
+def statement_sizes(monkeypatch):
+    """Rows returned by each statement, with streams reading PAGE rows at a time."""
+    monkeypatch.setattr(driverPost_repository, "STREAM_PAGE_SIZE", PAGE)
+    sizes = []
+    fetch_all = database.fetch_all
+
+    async def counting_fetch_all(query, values=None):
+        rows = await fetch_all(query, values)
+        sizes.append(len(rows))
+        return rows
+
+    monkeypatch.setattr(database, "fetch_all", counting_fetch_all)
+    return sizes
+
+
+async def stream(client, path: str, **params) -> list[dict]:
+    r = await client.get(path, params={"stream": "true", **params})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+async def test_all_streams_every_open_post_a_page_per_statement(client, make_post, statement_sizes):
+    start = datetime.now() + timedelta(hours=1)
+    ids = [await make_post(departure_time=start + timedelta(minutes=i)) for i in range(5)]
+    await make_post(status="closed")
+
+    rows = await stream(client, "/api/posts/all")
+
+    assert [r["id"] for r in rows] == ids
+    assert {"starting_point", "contact_info", "timestamp"} <= rows[0].keys()
+    assert statement_sizes == [2, 2, 1]
+
+
+async def test_stream_honours_limit_and_cursor(client, make_post, statement_sizes):
+    start = datetime.now() + timedelta(hours=1)
+    ids = [await make_post(departure_time=start + timedelta(minutes=i)) for i in range(6)]
+    cursor = (await client.get("/api/posts/all", params={"limit": 1})).headers["x-next-cursor"]
+    statement_sizes.clear()
+
+    rows = await stream(client, "/api/posts/all", limit=3, cursor=cursor)
+
+    assert [r["id"] for r in rows] == ids[1:4]
+    assert statement_sizes == [2, 1]
+
+
+async def test_allpost_stream_pages_through_rows_created_in_the_same_second(client, make_post, statement_sizes):
+    ids = {await make_post(status=s) for s in ("open", "matched", "closed", "open", "closed")}
+
+    rows = await stream(client, "/api/posts/allpost")
+
+    assert sorted(r["id"] for r in rows) == sorted(ids)
+    assert len(rows) == len(ids)
+
+
+async def test_search_stream_pages_in_departure_order(client, make_post, statement_sizes):
+    start = datetime.now() + timedelta(hours=1)
+    ids = [await make_post(departure_time=start + timedelta(minutes=i), notes=f"順路 {i}") for i in range(3)]
+
+    rows = await stream(client, "/api/posts/search", start_point="海大")
+
+    assert [r["id"] for r in rows] == ids
+    assert max(statement_sizes) <= PAGE